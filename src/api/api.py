@@ -2,36 +2,42 @@ import json
 from collections import defaultdict, namedtuple
 from functools import cache, cached_property
 
-from src.api.db_base import DBBase
+from src.api.db_base import DBBase, PageCursor, PageRows
+from src.api.json_stream import JSONStreamWriter
 from src.db.workout import models
-import swagger_server.models as api_models
 from src.utils import log
 
 
 class API:
-    def __init__(self, db, logger=None):
+    writer = JSONStreamWriter()
+
+    def __init__(self, db, logger=None, cache=None):
         self.logger = logger
         if self.logger is None:
             self.logger = log.new_logger(is_dev=False)
         self.db = db
+        self.cache = cache
 
     @cached_property
     def db_api(self):
-        return DBBase(self.db, self.logger, False)
+        return DBBase(self.db, self.logger, False, stream=True)
 
-    def error(self, msg=None):
+    def error(self, msg=None, logger=None):
         if msg is None:
             msg = "Invalid request parameters"
-        self.logger.info("User error", msg=msg, status_code=400)
+        (logger or self.logger).info("User error", msg=msg, status_code=400)
         return json.dumps({"statusCode": 400, "message": msg})
 
-    def empty_result(self):
-        self.logger.info("Empty results", status_code=204)
+    def empty_result(self, logger=None):
+        (logger or self.logger).info("Empty results", status_code=204)
         return json.dumps({"statusCode": 204})
 
     def success(self, data):
-        self.logger.info("Success", status_code=200)
-        return json.dumps({"statusCode": 200, "body": data}, indent=4)
+        return "".join(self.success_stream(data))
+
+    def success_stream(self, data, logger=None):
+        (logger or self.logger).info("Success", status_code=200)
+        return self.writer.iter_encode({"statusCode": 200, "body": data})
 
     @property
     def methods(self):
@@ -44,27 +50,136 @@ class API:
     def _result(self, vals, func=None):
         return vals, func if func is not None else self.success
 
+    def _db_result(self, func, *args, **kwargs):
+        try:
+            return self._result(func(*args, **kwargs))
+        except ValueError as e:
+            return self._result(str(e), self.error)
+
+    def _parse_cursor(self, cursor):
+        # "true" starts a cursor paginated run, anything else is a cursor
+        # handed back to the client as nextPage
+        if cursor.lower() == "true":
+            return PageCursor()
+        return PageCursor.decode(cursor)
+
     def parse(self, request, model, get_query_params={}):
-        l = self.logger
-        self.logger = self.logger.bind(
+        return "".join(self.parse_stream(request, model, get_query_params))
+
+    def parse_stream(self, request, model, get_query_params={}):
+        """Yields the response in chunks as rows are read from the db"""
+        # Bound locally, the API is shared between concurrent requests
+        log = self.logger.bind(
             url=request.base_url, method=request.method, model=model.__name__
         )
-        self.logger.info("Starting request")
+        log.info("Starting request")
         if request.method not in self.methods:
-            return self.error(
-                f"Endpoint does not support {request.method} requests. Try: {self.methods.keys()}"
+            yield self.error(
+                f"Endpoint does not support {request.method} requests. Try: {self.methods.keys()}",
+                logger=log,
             )
-
-        results, res_func = self.methods[request.method](
-            request, model, get_query_params
-        )
-
-        self.logger = l
-        if res_func == self.success and (
-            results is None or len(results) == 0 or len(results["data"]) == 0
-        ):
-            return self.empty_result()
-        return res_func(results)
+            return
+
+        cache_key = self._cache_key(request, model)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                log.info("Returning cached response", cache="hit")
+                yield cached
+                return
+
+        results, res_func = self.results(request, model, get_query_params)
+
+        if res_func == self.success and self._is_empty(results):
+            response = [self.empty_result(logger=log)]
+        elif res_func == self.success:
+            response = self.success_stream(results, logger=log)
+        elif res_func == self.error:
+            response = [self.error(results, logger=log)]
+        else:
+            response = [res_func(results)]
+
+        if cache_key is not None and res_func != self.error:
+            response = self._cache_stream(cache_key, response)
+        yield from response
+
+    def parse_many_stream(self, request, endpoints):
+        """Yields one response holding the results of several endpoints.
+
+        endpoints maps each name in the body to (api, model, get_query_params).
+        The whole body is cached under a single key, so a repeat request is
+        served without any of the endpoints going to the db.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key("many", request.method, sorted(endpoints.keys()))
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.logger.info("Returning cached response", cache="hit")
+                yield cached
+                return
+
+        data = {}
+        for name, (endpoint_api, model, params) in endpoints.items():
+            results, res_func = endpoint_api.results(request, model, params)
+            if res_func != endpoint_api.success:
+                yield res_func(results)
+                return
+            data[name] = results
+
+        response = self.success_stream(data)
+        if cache_key is not None:
+            # Every client starts with this, so it's kept whatever its size
+            response = self._cache_stream(cache_key, response, max_body_size=None)
+        yield from response
+
+    def results(self, request, model, get_query_params={}):
+        """The unserialized results of a request and the function to send them"""
+        return self.methods[request.method](request, model, get_query_params)
+
+    def _is_empty(self, results):
+        if results is None or len(results) == 0:
+            return True
+        if isinstance(results["data"], PageRows):
+            # Only read as far as the first row, the rest are streamed later
+            return results["data"].is_empty()
+        return len(results["data"]) == 0
+
+    def _cache_stream(self, cache_key, chunks, max_body_size=-1):
+        # Big responses are streamed through without being cached, holding on
+        # to them would defeat the point of streaming. None keeps any size
+        if max_body_size == -1:
+            max_body_size = self.cache.max_body_size
+        kept = []
+        size = 0
+        for chunk in chunks:
+            if kept is not None:
+                size += len(chunk)
+                if max_body_size is not None and size > max_body_size:
+                    kept = None
+                else:
+                    kept.append(chunk)
+            yield chunk
+        if kept is not None:
+            self.cache.set(cache_key, "".join(kept))
+
+    def _endpoint_name(self, model):
+        return f"{self.__class__.__name__}.{model.__name__}"
+
+    def _cache_key(self, request, model):
+        if self.cache is None:
+            return None
+        if request.method == "GET":
+            params = sorted(
+                (k, sorted(v)) for k, v in self._flatten_args(request.args).items()
+            )
+        else:
+            try:
+                params = json.loads(request.data)
+            except (TypeError, json.decoder.JSONDecodeError):
+                # Invalid requests aren't worth caching
+                return None
+        return self.cache.key(self._endpoint_name(model), request.method, params)
 
     def _flatten_args(self, args):
         data = defaultdict(list)
@@ -80,7 +195,13 @@ class API:
 
         paginate = data.get("paginate", [""])[0].lower() == "true"
         pagination_id = data.get("paginationId", [None])[0]
-        if pagination_id is None and (
+        cursor = data.get("cursor", [None])[0]
+        if cursor is not None:
+            try:
+                pagination_id = self._parse_cursor(cursor)
+            except ValueError as e:
+                return self._result(str(e), self.error)
+        elif pagination_id is None and (
             paginate or model.__name__ in self._paginate_by_default
         ):
             pagination_id = 1
@@ -97,23 +218,41 @@ class API:
         is_invalid_arg = lambda arg: arg not in data or len(data[arg]) == 0
 
         if len(data) == 0 or all(is_invalid_arg(i) for i in get_query_params.keys()):
-            return self._result(self.db_api.get_all(model, pagination_id))
+            return self._db_result(
+                self.db_api.get_all,
+                model,
+                pagination_id,
+                include_samples=self._include_samples(data),
+            )
 
         return self._parse_get(data, model, get_query_params, pagination_id)
 
+    def _include_samples(self, data):
+        return data.get("includeSamples", [""])[0].lower() == "true"
+
     def _parse_get(self, data, model, get_query_params, pagination_id):
         params = {}
         for name, typ in get_query_params.items():
             if name in data:
                 params[getattr(model, name)] = [typ(i) for i in data[name]]
-        return self._result(self.db_api.by_id(model, params, pagination_id))
+        return self._db_result(
+            self.db_api.by_id,
+            model,
+            params,
+            pagination_id,
+            include_samples=self._include_samples(data),
+        )
 
 
 class TagAPI(API):
-    def __init__(self, db, tag_types, logger):
-        super().__init__(db, logger=logger)
+    def __init__(self, db, tag_types, logger, cache=None):
+        super().__init__(db, logger=logger, cache=cache)
         self.tag_types = tag_types
 
+    def _endpoint_name(self, model):
+        tag_types = ",".join(sorted(str(t.value) for t in self.tag_types))
+        return f"{super()._endpoint_name(model)}[{tag_types}]"
+
     def _get(self, request, model, get_query_params):
         return self._result(
             self.db_api.by_id(models.Tags, {models.Tags.tagtype: self.tag_types},)
@@ -126,10 +265,18 @@ class QueryAPI(API):
         return {"GET": self._get, "POST": self._post}
 
     def _validate_api_enum_fields(self, query):
+        import swagger_server.models as api_models
+
         return [
             self._validate_enum_field(
                 query, ("sources_attributes", "source_type"), api_models.SourceType
             ),
+        ] + self._validate_workout_enum_fields(query)
+
+    def _validate_workout_enum_fields(self, query):
+        import swagger_server.models as api_models
+
+        return [
             self._validate_enum_field(
                 query,
                 ("workouts_attributes", "equipment"),
@@ -193,6 +340,10 @@ class QueryAPI(API):
         return self._parse_post(data, model)
 
     def _parse_post(self, data, model):
+        # The swagger models are only needed to parse a POST body, importing
+        # them lazily takes them off the cold start of every GET
+        import swagger_server.models as api_models
+
         query = api_models.Query.from_dict(data)
         # Should prob enable typing to validate all API types
         errs = self._validate_api_enum_fields(query)
@@ -202,7 +353,32 @@ class QueryAPI(API):
 
         paginate = bool(query.paginate)
         pagination_id = query.pagination_id
-        if paginate and pagination_id is None:
+        if query.cursor is not None:
+            try:
+                pagination_id = self._parse_cursor(query.cursor)
+            except ValueError as e:
+                return self._result(str(e), self.error)
+        elif paginate and pagination_id is None:
             pagination_id = 1
 
-        return self._result(self.db_api.query(model, query, pagination_id))
+        return self._db_result(self.db_api.query, model, query, pagination_id)
+
+
+class StatsAPI(QueryAPI):
+    def _get(self, request, model, get_query_params):
+        data = self._flatten_args(request.args)
+        bucket = data.get("bucket", [None])[0]
+        return self._db_result(self.db_api.stats, None, bucket)
+
+    def _parse_post(self, data, model):
+        import swagger_server.models as api_models
+
+        query = api_models.StatsQuery.from_dict(data)
+        errs = self._validate_workout_enum_fields(query)
+        for i in errs:
+            if i is not None:
+                return self._result(i, self.error)
+
+        return self._db_result(
+            self.db_api.stats, query.workouts_attributes, query.bucket
+        )
@@ -5,10 +5,9 @@ from functools import cache, cached_property
 from datetime import datetime, timedelta
 import isodate
 
-from peewee import prefetch, fn
+from peewee import JOIN, prefetch, fn
 
 from src.db.workout import models
-from swagger_server.models.equipment_type import EquipmentType as APIEquipmentType
 
 
 class ComplexQuery:
@@ -26,6 +25,13 @@ class ComplexQuery:
         wrk_model = wrkouts.model
         expressions = None
 
+        if query.date_range is not None:
+            # Backed by the starttime indexes on workouts and workouts_materialized
+            if query.date_range.start is not None:
+                wrkouts = wrkouts.where(wrk_model.starttime >= query.date_range.start)
+            if query.date_range.end is not None:
+                wrkouts = wrkouts.where(wrk_model.starttime <= query.date_range.end)
+
         if query.sport is not None and len(query.sport) > 0:
 
             wrkouts = wrkouts.where(self._in_or_equal(wrk_model.sport, query.sport))
@@ -46,6 +52,17 @@ class ComplexQuery:
                 wrkouts = wrkouts.where(wrk_model.avghr >= query.avg_hr_range.min)
             if query.avg_hr_range.max is not None:
                 wrkouts = wrkouts.where(wrk_model.avghr <= query.avg_hr_range.max)
+
+        if query.training_load_range is not None:
+            if query.training_load_range.min is not None:
+                wrkouts = wrkouts.where(
+                    wrk_model.trainingload >= query.training_load_range.min
+                )
+            if query.training_load_range.max is not None:
+                wrkouts = wrkouts.where(
+                    wrk_model.trainingload <= query.training_load_range.max
+                )
+
         if query.in_hr_zone is not None and len(query.in_hr_zone) > 0:
             wrkouts = self._build_hr_zones_query(
                 query.in_hr_zone,
@@ -158,6 +175,11 @@ class ComplexQuery:
         )
 
     def _build_equipment_query(self, query):
+        # Only POST queries get here, keep the swagger models off the cold start
+        from swagger_server.models.equipment_type import (
+            EquipmentType as APIEquipmentType,
+        )
+
         through = models.Workouts.equipment.get_through_model()
         equipment = (
             through.select(through.workouts)
@@ -217,16 +239,18 @@ class ComplexQuery:
         src_model = srcs.model
         source_tags_to_filter = set()
 
-        if query.creator is not None:
-            srcs = srcs.where(src_model.creator == query.creator)
+        if query.creator is not None and len(query.creator) > 0:
+            srcs = srcs.where(self._in_or_equal(src_model.creator, list(query.creator)))
 
         if query.length_min is not None:
             srcs = srcs.where(src_model.length >= timedelta(seconds=query.length_min))
         if query.length_max is not None:
             srcs = srcs.where(src_model.length <= timedelta(seconds=query.length_max))
 
-        if query.source_type() is not None:
-            srcs = srcs.where(src_model.sourcettype == query.source_type())
+        if query.source_type is not None and len(query.source_type) > 0:
+            srcs = srcs.where(
+                self._in_or_equal(src_model.sourcetype, list(query.source_type))
+            )
 
         if query.exercises is not None:
             source_tags_to_filter.update(set(query.exercises))
@@ -271,6 +295,15 @@ class ComplexQuery:
         if model.__name__ == "WorkoutsMaterialized" and not q1.samples:
             self.logger.debug("Excluding samples")
             mm_select = self._exclude_samples()
+        elif (
+            model.__name__ == "WorkoutsMaterialized"
+            and q1.samples_resolution is not None
+        ):
+            resolution = q1.samples_resolution
+            mm_select = self._downsampled_samples(
+                resolution.method or models.DownsampleMethod.LTTB.value,
+                models.DownsampledSamples.tier(resolution.points),
+            )
 
         one = None
         if q1 is not None:
@@ -298,6 +331,26 @@ class ComplexQuery:
         self.logger.info("Generated DB query", db_query=str(one))
         return one
 
+    @cache
+    def _downsampled_samples(self, method, points):
+        # The full series is swapped for the stored copy at the requested
+        # resolution, which is returned as samplesdownsampled
+        self.logger.debug("Downsampling samples", method=method, points=points)
+        tiers = models.DownsampledSamples
+        return (
+            self._exclude_samples()
+            .select_extend(tiers.data.alias("samplesdownsampled"))
+            .join(
+                tiers,
+                JOIN.LEFT_OUTER,
+                on=(
+                    (tiers.workout == models.WorkoutsMaterialized.id)
+                    & (tiers.method == method)
+                    & (tiers.points == points)
+                ),
+            )
+        )
+
     @cache
     def _exclude_samples(self):
         fields = []
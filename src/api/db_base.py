@@ -1,25 +1,142 @@
+import base64
+import hashlib
 import json
 from datetime import datetime, timedelta
 import isodate
 
 from peewee import fn
+from playhouse.postgres_ext import ServerSide
 
 from src.db.workout import models
 from src.utils import log
 from src.utils.db_utils import DBConnection
 from src.api.complex_query import ComplexQuery
+from src.api.stats import WorkoutStats
+from src.api.json_stream import Deferred
+
+
+class PageCursor:
+    """Opaque keyset pagination token.
+
+    Holds the id of the last row returned plus a hash of the query it was
+    generated for, so the next page can be fetched with `WHERE id > last_id`
+    instead of an ever growing OFFSET.
+    """
+
+    def __init__(self, last_id=None, filter_hash=None):
+        self.last_id = last_id
+        self.filter_hash = filter_hash
+
+    @property
+    def is_first_page(self):
+        return self.last_id is None
+
+    @staticmethod
+    def hash_query(model_select):
+        return hashlib.sha1(str(model_select).encode("utf-8")).hexdigest()[:16]
+
+    def encode(self):
+        raw = json.dumps([self.last_id, self.filter_hash]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token):
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            last_id, filter_hash = json.loads(base64.urlsafe_b64decode(padded))
+            if not isinstance(last_id, int) or not isinstance(filter_hash, str):
+                raise ValueError()
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid cursor: {token}")
+        return cls(last_id, filter_hash)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, PageCursor)
+            and self.last_id == other.last_id
+            and self.filter_hash == other.filter_hash
+        )
+
+
+class PageRows:
+    """Rows of a query, serialized one at a time as they're read.
+
+    Iterating pulls rows through a server side cursor, so neither postgres'
+    client nor python ever holds more than a batch of them. It can only be
+    iterated once; len() and indexing read whatever's left into a list first.
+    count and last_id track what's been read so far, which is all nextPage
+    needs.
+    """
+
+    # Rows fetched from the server side cursor at a time
+    BATCH_SIZE = 100
+
+    def __init__(self, db, model_select, serialize):
+        self.db = db
+        self.model_select = model_select
+        self.serialize = serialize
+        self.count = 0
+        self.last_id = None
+        self._reader = None
+        self._peeked = []
+        self._rows = None
+
+    def _read(self):
+        with self.db.atomic():
+            for m in ServerSide(self.model_select, array_size=self.BATCH_SIZE):
+                row = self.serialize(m)
+                self.count += 1
+                self.last_id = row.get("id")
+                yield row
+
+    def __iter__(self):
+        if self._rows is not None:
+            yield from self._rows
+            return
+        if self._reader is None:
+            self._reader = self._read()
+        while len(self._peeked) > 0:
+            yield self._peeked.pop()
+        yield from self._reader
+
+    def is_empty(self):
+        if self._rows is not None:
+            return len(self._rows) == 0
+        if len(self._peeked) == 0:
+            if self._reader is None:
+                self._reader = self._read()
+            try:
+                self._peeked.append(next(self._reader))
+            except StopIteration:
+                return True
+        return False
+
+    def _materialize(self):
+        if self._rows is None:
+            self._rows = list(iter(self))
+        return self._rows
+
+    def __len__(self):
+        return len(self._materialize())
+
+    def __getitem__(self, i):
+        return self._materialize()[i]
 
 
 class DBBase:
     PAGINATION_STEP = 25
 
-    def __init__(self, db, logger=None, is_dev=False):
+    def __init__(self, db, logger=None, is_dev=False, stream=False):
         self.db = db
+        # Hand back paginated rows as PageRows to be streamed out, rather
+        # than reading them all into a list up front
+        self.stream = stream
         self.logger = logger
         if self.logger == None:
             self.logger = log.new_logger(is_dev=is_dev)
         self._is_dev = is_dev
         self.cq = ComplexQuery(self.logger, self._is_dev)
+        self.workout_stats = WorkoutStats(self.cq, self.logger)
 
     def _fetch_from_model(self, model_select, pagination_id):
         model_to_func = {
@@ -30,18 +147,33 @@ class DBBase:
         }
         if model_select.model.__name__ not in model_to_func:
             return {"data": [], "nextPage": -1}
-        if pagination_id is not None:
+        if isinstance(pagination_id, PageCursor):
+            model_select, pagination_id = self._apply_cursor(
+                model_select, pagination_id
+            )
+        elif pagination_id is not None:
             model_select = model_select.order_by(model_select.model.id).paginate(
                 pagination_id, self.PAGINATION_STEP
             )
         return model_to_func[model_select.model.__name__](model_select, pagination_id)
 
-    def _remove_none_lists(self, dicts):
-        for i in dicts:
-            for field_name, data in i.items():
-                if isinstance(data, list) and len(data) == 1 and data[0] is None:
-                    i[field_name] = []
-        return dicts
+    def _apply_cursor(self, model_select, cursor):
+        filter_hash = PageCursor.hash_query(model_select)
+        if not cursor.is_first_page and cursor.filter_hash != filter_hash:
+            raise ValueError("Cursor does not match the query it is being used with")
+
+        model = model_select.model
+        if not cursor.is_first_page:
+            model_select = model_select.where(model.id > cursor.last_id)
+        model_select = model_select.order_by(model.id).limit(self.PAGINATION_STEP)
+        return model_select, PageCursor(cursor.last_id, filter_hash)
+
+    def _next_page(self, rows, pagination_id):
+        if pagination_id is None or rows.count != self.PAGINATION_STEP:
+            return -1
+        if isinstance(pagination_id, PageCursor):
+            return PageCursor(rows.last_id, pagination_id.filter_hash).encode()
+        return pagination_id + 1
 
     def _tags(self, model_select, pagination_id):
         with self.db.atomic():
@@ -52,21 +184,53 @@ class DBBase:
             return self._pag_result([m.json_friendly() for m in model_select])
 
     def _paginated_object(self, model_select, pagination_id):
-        with self.db.atomic():
-            data = self._remove_none_lists([m.json_friendly() for m in model_select])
-        results = {}
-        if pagination_id is not None and len(data) == self.PAGINATION_STEP:
-            pagination_id += 1
-        else:
-            pagination_id = -1
-        return self._pag_result(data, pagination_id)
+        # Rows come back as tuples and go straight to their json_friendly
+        # form, no model instance is built for them
+        names = tuple(f.name for f in model_select._returning)
+        rows = PageRows(
+            self.db,
+            model_select.tuples(),
+            model_select.model.row_serializer(names),
+        )
+        if not self.stream:
+            data = list(rows)
+            return self._pag_result(data, self._next_page(rows, pagination_id))
+        # nextPage depends on the rows, so it's only known once they're written
+        return self._pag_result(
+            rows, Deferred(lambda: self._next_page(rows, pagination_id))
+        )
 
     def _pag_result(self, data, next_page=-1):
+        # data goes first so a Deferred nextPage is written after the rows
         return {
-            "nextPage": next_page,
             "data": data,
+            "nextPage": next_page,
         }
 
+    def _expand_samples(self, model, results, include_samples):
+        # Samples are left out of the workouts embedded in each source as a
+        # popular source would otherwise carry every one of its workouts' heart
+        # rate series. Fetch them in one go only when they're asked for.
+        if not include_samples or model is not models.SourcesMaterialized:
+            return results
+        # Every source is needed to batch their workouts' samples up
+        results["data"] = list(results["data"])
+        workouts = [
+            w for s in results.get("data", []) for w in s["workouts"] if w is not None
+        ]
+        if len(workouts) == 0:
+            return results
+
+        with self.db.atomic():
+            samples = dict(
+                models.Workouts.select(models.Workouts.id, models.Workouts.samples)
+                .where(models.Workouts.id << list({w["id"] for w in workouts}))
+                .tuples()
+            )
+        for w in workouts:
+            w["samples"] = samples.get(w["id"])
+        return results
+
     def query(self, model, query, pagination_id=None):
         model_select = self.cq.execute(query, model)
         self.logger.debug(
@@ -75,9 +239,14 @@ class DBBase:
 
         if model_select is None:
             return {}
-        return self._fetch_from_model(model_select, pagination_id)
+        include_samples = (
+            query.sources_attributes is not None and query.sources_attributes.samples
+        )
+        return self._expand_samples(
+            model, self._fetch_from_model(model_select, pagination_id), include_samples
+        )
 
-    def by_id(self, model, identifiers, pagination_id=None):
+    def by_id(self, model, identifiers, pagination_id=None, include_samples=False):
         model_select = model.select()
         for field, ids in identifiers.items():
             model_select = model_select.orwhere(field << ids)
@@ -86,11 +255,36 @@ class DBBase:
             "SQL Query", method="by_id", model=model.__name__, query=str(model_select)
         )
 
-        return self._fetch_from_model(model_select, pagination_id)
+        return self._expand_samples(
+            model, self._fetch_from_model(model_select, pagination_id), include_samples
+        )
 
-    def get_all(self, model, pagination_id=None):
+    def get_all(self, model, pagination_id=None, include_samples=False):
         model_select = model.select().order_by(model.id)
         self.logger.debug(
             "SQL Query", method="get_all", model=model.__name__, query=str(model_select)
         )
-        return self._fetch_from_model(model_select, pagination_id)
+        return self._expand_samples(
+            model, self._fetch_from_model(model_select, pagination_id), include_samples
+        )
+
+    def _stats_friendly(self, row):
+        j = {}
+        for k, v in row.items():
+            if isinstance(v, datetime):
+                v = v.isoformat()
+            elif isinstance(v, timedelta):
+                v = isodate.duration_isoformat(v)
+            j[k] = v
+        # The zone totals as the spec's list of HRZone
+        j["hrZones"] = [
+            {"zoneType": zone, "duration": j.pop(f"zone_{zone}_duration")}
+            for zone in self.workout_stats.ZONES
+        ]
+        return j
+
+    def stats(self, query=None, bucket=None):
+        model_select = self.workout_stats.execute(query, bucket)
+        with self.db.atomic():
+            data = [self._stats_friendly(r) for r in model_select.dicts()]
+        return self._pag_result(data)
@@ -0,0 +1,76 @@
+import json
+from collections.abc import Iterable
+
+
+class Deferred:
+    """A value that's only worked out when the writer reaches it.
+
+    Used for things like nextPage that depend on the rows written before it.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def resolve(self):
+        return self.func()
+
+
+class JSONStreamWriter:
+    """Writes compact JSON in chunks rather than building one big string.
+
+    Dicts are walked key by key. Any other iterable that isn't a list or tuple,
+    such as rows read straight off a db cursor, is written out as an array one
+    element at a time, so only the element being encoded is held in memory.
+    Everything else, including the elements themselves, goes through
+    json.JSONEncoder in one go. Output is buffered into chunks of roughly
+    chunk_size characters.
+    """
+
+    def __init__(self, chunk_size=16 * 1024):
+        self.chunk_size = chunk_size
+        self._encoder = json.JSONEncoder(separators=(",", ":"))
+
+    def encode(self, value):
+        return "".join(self.iter_encode(value))
+
+    def iter_encode(self, value):
+        buf = []
+        size = 0
+        for piece in self._encode(value):
+            buf.append(piece)
+            size += len(piece)
+            if size >= self.chunk_size:
+                yield "".join(buf)
+                buf = []
+                size = 0
+        if len(buf) > 0:
+            yield "".join(buf)
+
+    def _encode(self, value):
+        if isinstance(value, Deferred):
+            value = value.resolve()
+
+        if isinstance(value, dict):
+            yield "{"
+            first = True
+            for k, v in value.items():
+                if not first:
+                    yield ","
+                first = False
+                yield self._encoder.encode(str(k))
+                yield ":"
+                yield from self._encode(v)
+            yield "}"
+        elif isinstance(value, (str, bytes, list, tuple)) or not isinstance(
+            value, Iterable
+        ):
+            yield self._encoder.encode(value)
+        else:
+            yield "["
+            first = True
+            for v in value:
+                if not first:
+                    yield ","
+                first = False
+                yield self._encoder.encode(v)
+            yield "]"
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Caches serialized API responses until the materialized data changes.
+
+    Entries are tagged with the generation counter that
+    refresh_materialized_views bumps, so a refresh invalidates everything at
+    once. The generation itself is only re-read every generation_ttl seconds,
+    which means repeated requests inside that window never reach postgres.
+
+    There's a bounded in-process LRU, plus an optional sqlite file that
+    outlives the process so a cold started function can skip the db too.
+    """
+
+    def __init__(
+        self,
+        fetch_generation,
+        max_entries=256,
+        path=None,
+        generation_ttl=30,
+        max_body_size=1024 * 1024,
+        logger=None,
+    ):
+        self._fetch_generation = fetch_generation
+        self.max_entries = max_entries
+        self.path = path
+        self.generation_ttl = generation_ttl
+        # Responses bigger than this, in characters, aren't cached
+        self.max_body_size = max_body_size
+        self.logger = logger
+        self._entries = OrderedDict()
+        self._generation = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._db = None
+
+    @staticmethod
+    def key(*parts):
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @property
+    def _sqlite(self):
+        if self.path is None:
+            return None
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, generation INTEGER, body TEXT)"
+            )
+        return self._db
+
+    def generation(self):
+        now = time.monotonic()
+        if (
+            self._generation is not None
+            and now - self._checked_at < self.generation_ttl
+        ):
+            return self._generation
+
+        generation = self._fetch_generation()
+        with self._lock:
+            if generation != self._generation:
+                if self.logger is not None:
+                    self.logger.debug(
+                        "Response cache invalidated",
+                        old_generation=self._generation,
+                        generation=generation,
+                    )
+                self._entries.clear()
+                if self._sqlite is not None:
+                    with self._sqlite:
+                        self._sqlite.execute(
+                            "DELETE FROM responses WHERE generation != ?",
+                            (generation,),
+                        )
+            self._generation = generation
+            self._checked_at = now
+        return generation
+
+    def get(self, key):
+        generation = self.generation()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            if self._sqlite is None:
+                return None
+            row = self._sqlite.execute(
+                "SELECT body FROM responses WHERE key = ? AND generation = ?",
+                (key, generation),
+            ).fetchone()
+        if row is None:
+            return None
+        self._set_lru(key, row[0])
+        return row[0]
+
+    def set(self, key, body):
+        generation = self.generation()
+        self._set_lru(key, body)
+        with self._lock:
+            if self._sqlite is not None:
+                with self._sqlite:
+                    self._sqlite.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                        (key, generation, body),
+                    )
+
+    def _set_lru(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
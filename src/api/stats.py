@@ -0,0 +1,63 @@
+from peewee import SQL, NodeList, fn
+
+from src.db.workout import models
+
+
+class WorkoutStats:
+    """Builds the aggregate query behind /stats.
+
+    Workouts are grouped into date_trunc buckets and summed in postgres, so a
+    chart of weekly load or time in each zone costs one row per bucket rather
+    than a download of every workout. The filters are the same
+    WorkoutQueryParams handled by ComplexQuery.
+    """
+
+    BUCKETS = ["day", "week", "month", "year"]
+    DEFAULT_BUCKET = "week"
+    ZONES = ["below_50", "50_60", "60_70", "70_80", "80_90", "90_100"]
+
+    def __init__(self, complex_query, logger=None):
+        self.cq = complex_query
+        self.logger = logger
+
+    def _percentile(self, fraction, field):
+        # percentile_cont(f) WITHIN GROUP (ORDER BY field)
+        return NodeList(
+            (
+                fn.percentile_cont(fraction),
+                SQL("WITHIN GROUP"),
+                NodeList((SQL("ORDER BY"), field), parens=True),
+            )
+        )
+
+    def _aggregates(self, bucket):
+        wrk = models.Workouts
+        period = fn.date_trunc(bucket, wrk.starttime)
+        fields = [
+            period.alias("period"),
+            fn.COUNT(wrk.id).alias("workouts"),
+            fn.SUM(wrk.calories).alias("calories"),
+            fn.SUM(wrk.endtime - wrk.starttime).alias("duration"),
+            self._percentile(0.5, wrk.avghr).alias("avgHRMedian"),
+        ]
+        for zone in self.ZONES:
+            field = getattr(wrk, f"zone_{zone}_duration")
+            fields.append(fn.SUM(field).alias(f"zone_{zone}_duration"))
+        return models.Workouts.select(*fields).group_by(period).order_by(period)
+
+    def execute(self, query=None, bucket=None):
+        if bucket is None:
+            bucket = self.DEFAULT_BUCKET
+        if bucket not in self.BUCKETS:
+            raise ValueError(
+                f"Invalid bucket {bucket}. Valid options are: {self.BUCKETS}"
+            )
+
+        stats = self._aggregates(bucket)
+        if query is not None:
+            filtered = self.cq._gen_workouts_query(query, stats)
+            if filtered is not None:
+                stats = filtered
+
+        self.logger.info("Generated stats query", bucket=bucket, db_query=str(stats))
+        return stats
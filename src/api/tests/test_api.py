@@ -7,7 +7,10 @@ import src.db.workout.models as models
 from src.utils import log
 from src.utils.test_base import TestBase
 from src.workout_sources.video_source import VideoSource
-from src.api.api import API, QueryAPI
+from src.api.api import API, QueryAPI, StatsAPI
+from src.api.db_base import PageCursor
+from src.api.json_stream import JSONStreamWriter
+from src.api.response_cache import ResponseCache
 import swagger_server.models as api_models
 
 
@@ -147,10 +150,94 @@ class TestAPI(TestBase):
         self.api.parse(self.request, models.SourcesMaterialized, {"id": str})
         self.api._parse_get.assert_called_with(ANY, ANY, ANY, 2)
 
+    def test_cursor_parsing(self):
+        self.api._parse_get = MagicMock(
+            return_value=self.api._result({"data": ["something"], "nextPage": 2})
+        )
+
+        self.request.args = MagicMock(
+            keys=MagicMock(return_value=["id", "cursor"]),
+            getlist=MagicMock(side_effect=[["1"], ["true"]]),
+        )
+        self.api.parse(self.request, self.model, {"id": str})
+        self.api._parse_get.assert_called_with(ANY, ANY, ANY, PageCursor())
+
+        cursor = PageCursor(4, "abc")
+        self.request.args.keys.return_value = ["id", "paginationId", "cursor"]
+        self.request.args.getlist.side_effect = [["1"], ["2"], [cursor.encode()]]
+        self.api.parse(self.request, self.model, {"id": str})
+        self.api._parse_get.assert_called_with(ANY, ANY, ANY, cursor)
+
+        self.request.args.keys.return_value = ["id", "cursor"]
+        self.request.args.getlist.side_effect = [["1"], ["invalid"]]
+        res = json.loads(self.api.parse(self.request, self.model, {"id": str}))
+        self.assertEqual(res["statusCode"], 400)
+
+    def test_parse_stream_logger(self):
+        self.api.db_api.by_id.return_value = {"data": ["aa"], "nextPage": -1}
+        other = MagicMock(method="POST", args=self.request.args)
+        first = self.api.parse_stream(self.request, self.model, {"a": str})
+        second = self.api.parse_stream(other, self.model, {"a": str})
+        # Interleaved streams each keep their own bound logger
+        chunks = [next(first)]
+        next(second)
+        self.assertIs(self.api.logger, self.logger)
+        chunks.extend(first)
+        self.assertEqual(json.loads("".join(chunks))["statusCode"], 200)
+        self.assertIs(self.api.logger, self.logger)
+
+    def test_cache(self):
+        self.api.cache = ResponseCache(MagicMock(return_value=1))
+        self.api.db_api.by_id.return_value = {"data": ["aa"], "nextPage": -1}
+        first = self.api.parse(self.request, self.model, {"a": str})
+        second = self.api.parse(self.request, self.model, {"a": str})
+        self.assertEqual(first, second)
+        self.api.db_api.by_id.assert_called_once()
+
+        # Errors aren't cached
+        self.request.args.getlist.return_value = ["0"]
+        self.request.args.keys.return_value = ["paginationId"]
+        self.api.parse(self.request, self.model, {"a": str})
+        self.assertEqual(len(self.api.cache), 1)
+
+    def test_cache_large_response(self):
+        self.api.cache = ResponseCache(MagicMock(return_value=1), max_body_size=100)
+        self.api.writer = JSONStreamWriter(chunk_size=10)
+        self.api.db_api.by_id.return_value = {"data": ["a" * 200], "nextPage": -1}
+        first = self.api.parse(self.request, self.model, {"a": str})
+        self.assertEqual(json.loads(first)["body"]["data"], ["a" * 200])
+        # Too big to cache, so it's fetched again
+        self.api.parse(self.request, self.model, {"a": str})
+        self.assertEqual(self.api.db_api.by_id.call_count, 2)
+        self.assertEqual(len(self.api.cache), 0)
+
+    def test_parse_many_cache(self):
+        self.api.cache = ResponseCache(MagicMock(return_value=1), max_body_size=10)
+        self.api.db_api.get_all.return_value = {"data": ["aa"], "nextPage": -1}
+        self.request.args.keys.return_value = []
+        endpoints = {
+            "tags": (self.api, self.model, {}),
+            "equipment": (self.api, self.model, {}),
+        }
+        first = "".join(self.api.parse_many_stream(self.request, endpoints))
+        self.assertEqual(
+            json.loads(first)["body"],
+            {
+                "tags": {"data": ["aa"], "nextPage": -1},
+                "equipment": {"data": ["aa"], "nextPage": -1},
+            },
+        )
+        self.assertEqual(self.api.db_api.get_all.call_count, 2)
+
+        # Served whole from the cache, even though it's over max_body_size
+        second = "".join(self.api.parse_many_stream(self.request, endpoints))
+        self.assertEqual(first, second)
+        self.assertEqual(self.api.db_api.get_all.call_count, 2)
+
     def test_parse_get(self):
         self.api.parse(self.request, self.model, {"a": str})
         self.api.db_api.by_id.assert_called_with(
-            self.model, {self.model.a: ["aa", "bb"]}, None
+            self.model, {self.model.a: ["aa", "bb"]}, None, include_samples=False
         )
 
         self.api.get_query_params = {"c": str}
@@ -223,6 +310,31 @@ class TestQueryAPI(TestBase):
             pagination_id=2,
         )
 
+    def test_cursor_post(self):
+        self.mock_db_return.query.return_value = {
+            "data": {"something": "yup"},
+            "nextPage": -1,
+        }
+        self._run(
+            200,
+            query={"cursor": "true", "workoutsAttributes": {"sport": ["sport1"]}},
+            pagination_id=PageCursor(),
+        )
+        self._run(
+            400, query={"cursor": "invalid", "workoutsAttributes": {"sport": ["sport1"]}},
+        )
+
+        # Raised when the cursor doesn't match the query
+        self.mock_db_return.query.side_effect = ValueError("Mismatched cursor")
+        self._run(
+            400,
+            query={
+                "cursor": PageCursor(2, "abc").encode(),
+                "workoutsAttributes": {"sport": ["sport1"]},
+            },
+        )
+        self.mock_db_return.query.side_effect = None
+
     def test_parse_post(self):
         # didn't define a return so this should give us a 204
         self._run(204)
@@ -253,3 +365,41 @@ class TestQueryAPI(TestBase):
         query = {"sourcesAttributes": {"sourceType": ["youtube", "invalid"]}}
         self.mock_db_return.query.return_value = {"something": "yup"}
         self._run(400, query=query)
+
+
+class TestStatsAPI(TestBase):
+    def setUp(self):
+        self.api = StatsAPI(MagicMock(), logger=self.logger)
+        self.api.db_api = MagicMock(
+            stats=MagicMock(return_value={"data": [{"workouts": 1}], "nextPage": -1})
+        )
+
+    def test_get(self):
+        request = MagicMock(method="GET")
+        request.args = MagicMock(
+            keys=MagicMock(return_value=["bucket"]),
+            getlist=MagicMock(return_value=["month"]),
+        )
+        loaded = json.loads(self.api.parse(request, models.Workouts))
+        self.assertEqual(loaded["statusCode"], 200)
+        self.api.db_api.stats.assert_called_with(None, "month")
+
+        self.api.db_api.stats.side_effect = ValueError("Invalid bucket")
+        loaded = json.loads(self.api.parse(request, models.Workouts))
+        self.assertEqual(loaded["statusCode"], 400)
+
+    def test_post(self):
+        query = {"workoutsAttributes": {"sport": ["sport1"]}, "bucket": "day"}
+        request = MagicMock(
+            method="POST", mimetype="application/json", data=json.dumps(query)
+        )
+        loaded = json.loads(self.api.parse(request, models.Workouts))
+        self.assertEqual(loaded["statusCode"], 200)
+        self.api.db_api.stats.assert_called_with(
+            api_models.WorkoutQueryParams.from_dict(query["workoutsAttributes"]), "day"
+        )
+
+        query = {"workoutsAttributes": {"inHRZone": [{"zoneType": "invalid"}]}}
+        request.data = json.dumps(query)
+        loaded = json.loads(self.api.parse(request, models.Workouts))
+        self.assertEqual(loaded["statusCode"], 400)
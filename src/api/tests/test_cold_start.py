@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from src.utils.test_base import TestBase
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+# Cumulative import time of the api_functions entry point, in microseconds.
+# It's around 200ms on a dev machine, up from 370ms with numpy and the swagger
+# models imported eagerly.
+IMPORT_BUDGET_US = 300_000
+
+# Modules that are only needed once a request actually uses them
+DEFERRED_MODULES = [
+    "numpy",
+    "swagger_server.models",
+    "google.cloud",
+    "src.db.sources.models",
+]
+
+
+class TestColdStart(TestBase):
+    @staticmethod
+    def import_times(module="src.api_functions.main"):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Importing main reads the app config from the working directory
+            with open(os.path.join(tmp, "app_config.json"), "w") as f:
+                json.dump({"debug_logging": False}, f)
+            env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                cwd=tmp,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+
+        # import time: self [us] | cumulative | imported package
+        times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            _, cumulative, name = line[len("import time:") :].split("|")
+            times[name.strip()] = int(cumulative)
+        return times
+
+    def test_deferred_imports(self):
+        times = self.import_times()
+        self.assertIn("src.api_functions.main", times)
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, times)
+
+    def test_import_budget(self):
+        # Best of a few runs, the first one may also be compiling bytecode
+        best = min(self.import_times()["src.api_functions.main"] for _ in range(3))
+        self.assertLess(best, IMPORT_BUDGET_US)
@@ -1,6 +1,6 @@
 import unittest
 import json
-from datetime import timedelta
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, Mock, PropertyMock, patch
 import testing.postgresql
 
@@ -9,7 +9,7 @@ from src.utils.test_base import TestBase
 from src.api.complex_query import ComplexQuery
 from swagger_server.models import *
 from src.db.workout import models
-from src.api.db_base import DBBase
+from src.api.db_base import DBBase, PageCursor
 
 
 class TestComplexQuery(TestBase):
@@ -77,6 +77,51 @@ class TestComplexQuery(TestBase):
         quer = self.base.query(models.WorkoutsMaterialized, cq)
         self.assertEqual(len(quer["data"]), 3)
 
+    def test_query_workouts_date_range(self):
+        cq = self._gen_query(
+            {},
+            {
+                "date_range": DateRange(
+                    start=datetime(2022, 10, 11), end=datetime(2022, 10, 12, 12)
+                )
+            },
+        )
+        quer = self.base.query(models.WorkoutsMaterialized, cq)
+        self.assertEqual(len(quer["data"]), 2)
+
+        cq = self._gen_query(
+            {}, {"date_range": DateRange(start=datetime(2022, 10, 11))}
+        )
+        quer = self.base.query(models.WorkoutsMaterialized, cq)
+        self.assertEqual(len(quer["data"]), 3)
+
+        cq = self._gen_query(
+            {}, {"date_range": DateRange(end=datetime(2022, 10, 11, 12))}
+        )
+        quer = self.base.query(models.WorkoutsMaterialized, cq)
+        self.assertEqual(len(quer["data"]), 2)
+
+        # Filtering sources goes through workouts rather than the materialized table
+        cq = self._gen_query(
+            {}, {"date_range": DateRange(start=datetime(2022, 10, 12))}
+        )
+        quer = self.base.query(models.SourcesMaterialized, cq)
+        self.assertEqual(len(quer["data"]), 2)
+
+    def test_query_workouts_date_range_pagination(self):
+        self.base.PAGINATION_STEP = 2
+        date_range = DateRange(start=datetime(2022, 10, 11))
+        cq = self._gen_query({}, {"date_range": date_range})
+        quer = self.base.query(models.WorkoutsMaterialized, cq, PageCursor())
+        self.assertEqual(len(quer["data"]), 2)
+
+        cq = self._gen_query({}, {"date_range": date_range})
+        quer = self.base.query(
+            models.WorkoutsMaterialized, cq, PageCursor.decode(quer["nextPage"])
+        )
+        self.assertEqual(len(quer["data"]), 1)
+        self.assertEqual(quer["nextPage"], -1)
+
     def test_query_workouts_samples(self):
         cq = self._gen_query({}, {"sport": ["sport1"], "samples": True})
         quer = self.base.query(models.WorkoutsMaterialized, cq)
@@ -88,6 +133,48 @@ class TestComplexQuery(TestBase):
         for i in quer["data"]:
             self.assertTrue("samples" not in i)
 
+    def test_query_workouts_samples_resolution(self):
+        cq = self._gen_query(
+            {},
+            {
+                "sport": ["sport1"],
+                "samples": True,
+                "samples_resolution": SamplesResolution(method="buckets", points=50),
+            },
+        )
+        quer = self.base.query(models.WorkoutsMaterialized, cq)
+        self.assertGreater(len(quer["data"]), 0)
+        for i in quer["data"]:
+            self.assertTrue("samples" not in i)
+            self.assertEqual(i["samplesdownsampled"]["method"], "buckets")
+            self.assertEqual(i["samplesdownsampled"]["interval"], 1)
+            self.assertEqual(
+                i["samplesdownsampled"]["max"], [100, 102, 101, 99, 150, None, 180]
+            )
+
+        # lttb is the default
+        cq = self._gen_query(
+            {},
+            {
+                "sport": ["sport1"],
+                "samples": True,
+                "samples_resolution": SamplesResolution(),
+            },
+        )
+        quer = self.base.query(models.WorkoutsMaterialized, cq)
+        for i in quer["data"]:
+            self.assertEqual(i["samplesdownsampled"]["t"], [0, 1, 2, 3, 4, 6])
+
+        # Only used alongside samples
+        cq = self._gen_query(
+            {},
+            {"sport": ["sport1"], "samples_resolution": SamplesResolution()},
+        )
+        quer = self.base.query(models.WorkoutsMaterialized, cq)
+        for i in quer["data"]:
+            self.assertTrue("samples" not in i)
+            self.assertTrue("samplesdownsampled" not in i)
+
     def test_query_workouts_in_hr_zones(self):
         cq = self._gen_query(
             {},
@@ -222,3 +309,19 @@ class TestComplexQuery(TestBase):
         )
         quer = self.base.query(models.WorkoutsMaterialized, cq)
         self.assertEqual(len(quer["data"]), 3)
+
+    def test_query_workouts_training_load(self):
+        loads = {w.id: w.trainingload for w in models.Workouts.select()}
+        # Workout 3's samples are the only ones that differ
+        self.assertGreater(loads[3], max(v for k, v in loads.items() if k != 3))
+        bound = loads[3] - 1
+
+        cq = self._gen_query({}, {"training_load_range": LoadRange(min=bound)})
+        quer = self.base.query(models.WorkoutsMaterialized, cq)
+        self.assertEqual([w["id"] for w in quer["data"]], [3])
+
+        cq = self._gen_query({}, {"training_load_range": LoadRange(max=bound)})
+        quer = self.base.query(models.WorkoutsMaterialized, cq)
+        self.assertEqual(sorted(w["id"] for w in quer["data"]), [1, 2, 4])
+        for w in quer["data"]:
+            self.assertLessEqual(w["trainingload"], bound)
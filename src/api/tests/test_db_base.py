@@ -6,7 +6,8 @@ from unittest.mock import MagicMock, Mock, PropertyMock, patch
 import src.db.workout.models as models
 from src.utils import log
 from src.utils.test_base import TestBase
-from src.api.db_base import DBBase
+from src.api.db_base import DBBase, PageCursor, PageRows
+from src.api.json_stream import JSONStreamWriter
 import swagger_server.models as api_models
 
 
@@ -79,3 +80,71 @@ class TestDBBase(TestBase):
         results = self.base.get_all(models.WorkoutsMaterialized, 2)
         self.assertEqual(len(results["data"]), 1)
         self.assertEqual(results["nextPage"], -1)
+
+    def test_cursor_pagination(self):
+        self.base.PAGINATION_STEP = 3
+        results = self.base.get_all(models.WorkoutsMaterialized, PageCursor())
+        self.assertEqual([i["id"] for i in results["data"]], [1, 2, 3])
+        self.assertIsInstance(results["nextPage"], str)
+
+        cursor = PageCursor.decode(results["nextPage"])
+        self.assertEqual(cursor.last_id, 3)
+        results = self.base.get_all(models.WorkoutsMaterialized, cursor)
+        self.assertEqual([i["id"] for i in results["data"]], [4])
+        self.assertEqual(results["nextPage"], -1)
+
+        # A cursor generated for one query can't be reused with another
+        vals = {models.WorkoutsMaterialized.id: [1, 2, 3, 4]}
+        with self.assertRaises(ValueError):
+            self.base.by_id(models.WorkoutsMaterialized, vals, cursor)
+
+    def test_streaming(self):
+        base = DBBase(self.db, self.logger, True, stream=True)
+        base.PAGINATION_STEP = 3
+        results = base.get_all(models.WorkoutsMaterialized, 1)
+        self.assertIsInstance(results["data"], PageRows)
+        self.assertFalse(results["data"].is_empty())
+
+        # nextPage is only worked out once the rows have been written
+        loaded = json.loads(JSONStreamWriter(chunk_size=10).encode(results))
+        self.assertEqual([i["id"] for i in loaded["data"]], [1, 2, 3])
+        self.assertEqual(loaded["data"][2]["equipment"], [])
+        self.assertEqual(loaded["nextPage"], 2)
+
+        results = base.get_all(models.WorkoutsMaterialized, 3)
+        self.assertTrue(results["data"].is_empty())
+        self.assertEqual(
+            json.loads(JSONStreamWriter().encode(results)),
+            {"data": [], "nextPage": -1},
+        )
+
+    def test_cursor_encoding(self):
+        cursor = PageCursor(10, "abc")
+        self.assertEqual(PageCursor.decode(cursor.encode()), cursor)
+        for invalid in ["", "notacursor", PageCursor("10", "abc").encode()]:
+            with self.assertRaises(ValueError):
+                PageCursor.decode(invalid)
+
+    def test_source_samples(self):
+        vals = {models.SourcesMaterialized.id: [1]}
+        results = self.base.by_id(models.SourcesMaterialized, vals)
+        workouts = results["data"][0]["workouts"]
+        self.assertEqual(len(workouts), 2)
+        self.assertTrue(all("samples" not in w for w in workouts))
+
+        results = self.base.by_id(models.SourcesMaterialized, vals, None, True)
+        for w in results["data"][0]["workouts"]:
+            self.assertEqual(w["samples"], [100, 102, 101, 99, 150, 0, 180])
+
+        query = api_models.Query.from_dict(
+            {"sourcesAttributes": {"samples": True, "creator": ["creator1"]}}
+        )
+        results = self.base.query(models.SourcesMaterialized, query)
+        self.assertTrue(
+            all(
+                "samples" in w
+                for s in results["data"]
+                for w in s["workouts"]
+                if w is not None
+            )
+        )
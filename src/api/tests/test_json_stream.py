@@ -0,0 +1,49 @@
+import json
+
+from src.api.json_stream import Deferred, JSONStreamWriter
+from src.utils.test_base import TestBase
+
+
+class TestJSONStreamWriter(TestBase):
+    def setUp(self):
+        self.writer = JSONStreamWriter(chunk_size=8)
+
+    def test_encode(self):
+        data = {
+            "statusCode": 200,
+            "body": {"data": [{"id": 1, "tags": ["a", "b"]}, None], "nextPage": -1},
+        }
+        encoded = self.writer.encode(data)
+        self.assertEqual(encoded, json.dumps(data, separators=(",", ":")))
+
+    def test_chunks(self):
+        chunks = list(self.writer.iter_encode({"data": list(range(20))}))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(c) > 0 for c in chunks))
+        self.assertEqual(json.loads("".join(chunks)), {"data": list(range(20))})
+
+    def test_lazy_rows(self):
+        read = []
+
+        def rows():
+            for i in range(3):
+                read.append(i)
+                yield {"id": i}
+
+        data = {
+            "data": rows(),
+            "nextPage": Deferred(lambda: len(read)),
+        }
+        chunks = self.writer.iter_encode(data)
+        # Nothing is read from the rows until the writer gets to them
+        self.assertEqual(read, [])
+        first = next(chunks)
+        self.assertLess(len(read), 3)
+
+        loaded = json.loads(first + "".join(chunks))
+        self.assertEqual(loaded["data"], [{"id": 0}, {"id": 1}, {"id": 2}])
+        self.assertEqual(loaded["nextPage"], 3)
+
+    def test_empty(self):
+        self.assertEqual(self.writer.encode({"data": iter([])}), '{"data":[]}')
+        self.assertEqual(self.writer.encode({}), "{}")
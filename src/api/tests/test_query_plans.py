@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import src.db.workout.models as models
+from src.api.db_base import DBBase
+from src.utils.test_base import TestBase
+from swagger_server.models import *
+
+
+class TestQueryPlans(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.db = cls.create_test_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.teardown_test_db()
+
+    def setUp(self):
+        self.base = DBBase(self.db, self.logger, False)
+
+    def _plan(self, model, source_params=None, workout_params=None):
+        query = Query(
+            SourceQueryParams(**(source_params or {})),
+            WorkoutQueryParams(**(workout_params or {})),
+        )
+        sql, params = self.base.cq.execute(query, model).sql()
+        with self.db.atomic() as txn:
+            # The test tables are only a few rows, small enough that postgres
+            # would rather scan them. Turning that off leaves a Seq Scan in the
+            # plan only where there's no index it could use.
+            self.db.execute_sql("SET LOCAL enable_seqscan = off")
+            plan = "\n".join(
+                r[0] for r in self.db.execute_sql("EXPLAIN " + sql, params)
+            )
+            txn.rollback()
+        self.assertNotIn("Seq Scan", plan)
+        return plan
+
+    def test_workouts(self):
+        plan = self._plan(
+            models.WorkoutsMaterialized, workout_params={"sport": ["sport1"]}
+        )
+        self.assertIn("workouts_materialized_sport_idx", plan)
+
+        plan = self._plan(
+            models.WorkoutsMaterialized,
+            workout_params={"avg_hr_range": HRRange(min=140)},
+        )
+        self.assertIn("workouts_materialized_avghr_idx", plan)
+
+        plan = self._plan(
+            models.WorkoutsMaterialized,
+            workout_params={"date_range": DateRange(start=datetime(2022, 10, 12))},
+        )
+        self.assertIn("workouts_materialized_starttime_idx", plan)
+
+        plan = self._plan(
+            models.WorkoutsMaterialized,
+            workout_params={
+                "in_hr_zone": [HRZoneRange(zone_type="70_80", min_time="PT5M")]
+            },
+        )
+        self.assertIn("workouts_materialized_zone_70_80_duration_idx", plan)
+
+    def test_workouts_equipment(self):
+        plan = self._plan(
+            models.WorkoutsMaterialized,
+            workout_params={"equipment": [Equipment(equipment_type="weights")]},
+        )
+        # Served by the unique index, which leads with equipmenttype
+        self.assertIn("equipment_equipmenttype_magnitude_quantity", plan)
+
+    def test_sources(self):
+        plan = self._plan(models.SourcesMaterialized, {"creator": ["creator1"]})
+        self.assertIn("sources_materialized_creator_idx", plan)
+
+        # Source tags go through sources_tags_through
+        self._plan(models.SourcesMaterialized, {"tags": ["tag1", "tag2"]})
+
+    def test_through_tables(self):
+        # Workouts filtered on their sources and the other way round
+        self._plan(models.WorkoutsMaterialized, {"tags": ["tag2"]})
+        self._plan(models.SourcesMaterialized, workout_params={"sport": ["sport1"]})
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.api.response_cache import ResponseCache
+from src.utils.test_base import TestBase
+
+
+class TestResponseCache(TestBase):
+    def setUp(self):
+        self.fetch_generation = MagicMock(return_value=1)
+        self.cache = ResponseCache(self.fetch_generation, max_entries=2)
+
+    def test_key(self):
+        self.assertEqual(
+            ResponseCache.key("API", "GET", [("id", ["1"])]),
+            ResponseCache.key("API", "GET", [("id", ["1"])]),
+        )
+        self.assertNotEqual(
+            ResponseCache.key("API", "GET", [("id", ["1"])]),
+            ResponseCache.key("API", "GET", [("id", ["2"])]),
+        )
+
+    def test_lru(self):
+        self.cache.set("a", "1")
+        self.cache.set("b", "2")
+        self.assertEqual(self.cache.get("a"), "1")
+        # b is now the least recently used
+        self.cache.set("c", "3")
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.get("b"), None)
+        self.assertEqual(self.cache.get("a"), "1")
+        self.assertEqual(self.cache.get("c"), "3")
+
+    def test_generation(self):
+        self.cache.set("a", "1")
+        self.fetch_generation.return_value = 2
+        # Still within the ttl so the generation isn't rechecked
+        self.assertEqual(self.cache.get("a"), "1")
+        self.assertEqual(self.fetch_generation.call_count, 1)
+
+        self.cache.generation_ttl = 0
+        self.assertEqual(self.cache.get("a"), None)
+
+    def test_persistent_tier(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "cache.sqlite")
+            cache = ResponseCache(self.fetch_generation, path=path)
+            cache.set("a", "1")
+
+            # Simulates a cold start
+            cache = ResponseCache(self.fetch_generation, path=path)
+            self.assertEqual(cache.get("a"), "1")
+
+            self.fetch_generation.return_value = 2
+            cache = ResponseCache(self.fetch_generation, path=path)
+            self.assertEqual(cache.get("a"), None)
@@ -0,0 +1,98 @@
+from collections import defaultdict
+from datetime import timedelta
+
+import isodate
+
+import src.db.workout.models as models
+import swagger_server.models as api_models
+from src.api.db_base import DBBase
+from src.utils.test_base import TestBase
+
+
+class TestStats(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.db = cls.create_test_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.teardown_test_db()
+
+    def setUp(self):
+        self.base = DBBase(self.db, self.logger, True)
+
+    def test_week(self):
+        # All of the sample workouts are in the same week
+        results = self.base.stats()
+        self.assertEqual(results["nextPage"], -1)
+        self.assertEqual(len(results["data"]), 1)
+
+        stats = results["data"][0]
+        self.assertEqual(stats["workouts"], 4)
+        self.assertEqual(stats["calories"], 800)
+        self.assertEqual(
+            isodate.parse_duration(stats["duration"]), timedelta(minutes=117)
+        )
+        self.assertEqual(stats["avgHRMedian"], 140)
+        zones = {z["zoneType"]: z for z in stats["hrZones"]}
+        self.assertEqual(
+            isodate.parse_duration(zones["60_70"]["duration"]),
+            timedelta(minutes=35),
+        )
+        self.assertEqual(
+            [z["zoneType"] for z in stats["hrZones"]],
+            ["below_50", "50_60", "60_70", "70_80", "80_90", "90_100"],
+        )
+
+        # The keys are the ones in the swagger spec
+        self.assertEqual(
+            set(stats.keys()), set(api_models.Stats().attribute_map.values())
+        )
+        for zone in stats["hrZones"]:
+            self.assertLessEqual(
+                set(zone.keys()), set(api_models.HRZone().attribute_map.values())
+            )
+
+    def test_day(self):
+        results = self.base.stats(bucket="day")
+        self.assertEqual(len(results["data"]), 4)
+        self.assertEqual([s["workouts"] for s in results["data"]], [1, 1, 1, 1])
+        periods = [s["period"] for s in results["data"]]
+        self.assertEqual(periods, sorted(periods))
+
+    def test_matches_workouts(self):
+        # Totals per bucket should match summing the workouts client side
+        expected = defaultdict(int)
+        with self.db.atomic():
+            for w in models.Workouts.select():
+                expected[w.starttime.strftime("%Y-%m")] += w.calories
+        results = self.base.stats(bucket="month")
+        self.assertEqual(
+            {s["period"][0:7]: s["calories"] for s in results["data"]}, expected
+        )
+
+    def test_filters(self):
+        query = api_models.WorkoutQueryParams.from_dict({"sport": ["sport1"]})
+        results = self.base.stats(query)
+        self.assertEqual(results["data"][0]["workouts"], 3)
+        self.assertEqual(results["data"][0]["calories"], 600)
+        self.assertEqual(results["data"][0]["avgHRMedian"], 150)
+
+        query = api_models.WorkoutQueryParams.from_dict(
+            {"avgHRRange": {"min": 140}, "sport": ["sport1"]}
+        )
+        results = self.base.stats(query, "day")
+        self.assertEqual(len(results["data"]), 2)
+
+        # No filters set aggregates everything
+        query = api_models.WorkoutQueryParams.from_dict({})
+        self.assertEqual(self.base.stats(query)["data"][0]["workouts"], 4)
+
+        query = api_models.WorkoutQueryParams.from_dict({"sport": ["missing"]})
+        self.assertEqual(self.base.stats(query)["data"], [])
+
+    def test_invalid_bucket(self):
+        with self.assertRaises(ValueError):
+            self.base.stats(bucket="fortnight")
@@ -1,49 +1,108 @@
-import json
+import threading
+from functools import wraps
 
-from src.api.api import API, TagAPI, QueryAPI
+from src.api.api import API, TagAPI, QueryAPI, StatsAPI
+from src.api.response_cache import ResponseCache
 from src.db.workout import models
 from src.utils.db_utils import DBConnection
-from src.utils import log
+from src.utils import config, log
 
 WORKOUT_DB = None
+DB_CONNECTION = None
 
 LOGGER = log.new_logger()
 
-STORED_APIS = {"API": None, "TagAPI": None, "QueryAPI": None}
+STORED_APIS = {"API": None, "TagAPI": None, "QueryAPI": None, "StatsAPI": None}
+
+RESPONSE_CACHE = None
+
+# Per thread, as each request is handled on its own
+REQUEST_STATE = threading.local()
+
+ID_PARAMS = {"id": int, "url": str}
 
 
 def get_db():
-    global WORKOUT_DB
+    global WORKOUT_DB, DB_CONNECTION
     if not WORKOUT_DB:
         LOGGER.info("Instantiating new db connection", db_connection="new")
-        WORKOUT_DB = DBConnection(LOGGER).workout_db
-    else:
-        LOGGER.info("Reusing DB connection", db_connection="reuse")
-    LOGGER.info("Connection established")
+        DB_CONNECTION = DBConnection(LOGGER)
+        WORKOUT_DB = DB_CONNECTION.workout_db
+    if not getattr(REQUEST_STATE, "connection_checked", False):
+        # Once per request, so a stale pooled connection is replaced before
+        # it's used without every get_db call paying for another round trip
+        DB_CONNECTION.check_connection(WORKOUT_DB)
+        REQUEST_STATE.connection_checked = True
+        LOGGER.info("Connection established")
     return WORKOUT_DB
 
 
+def close_db():
+    if WORKOUT_DB is not None and not WORKOUT_DB.is_closed():
+        WORKOUT_DB.close()
+
+
+def db_request(func):
+    # Hands this thread's connection back to the pool once the request is done
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        response = None
+        REQUEST_STATE.connection_checked = False
+        try:
+            response = func(*args, **kwargs)
+            return response
+        finally:
+            if hasattr(response, "call_on_close"):
+                # A streamed response reads from the db until it's been sent
+                response.call_on_close(close_db)
+            else:
+                close_db()
+
+    return wrapper
+
+
+def stream_response(chunks):
+    # flask is provided by the functions framework at runtime
+    from flask import Response
+
+    return Response(chunks, mimetype="application/json")
+
+
+def get_cache():
+    global RESPONSE_CACHE
+    if RESPONSE_CACHE is None:
+
+        def fetch_generation():
+            get_db()
+            return models.materialized_generation()
+
+        RESPONSE_CACHE = ResponseCache(
+            fetch_generation,
+            logger=LOGGER,
+            **config.read_config().get("response_cache", {}),
+        )
+    return RESPONSE_CACHE
+
+
 def get_api(api_type=API):
     global STORED_APIS
     name = api_type.__name__
+    db = get_db()
     if name in STORED_APIS and STORED_APIS[name] is not None:
         return STORED_APIS[name]
-    STORED_APIS[name] = api_type(get_db(), LOGGER)
+    STORED_APIS[name] = api_type(db, LOGGER, cache=get_cache())
     return STORED_APIS[name]
 
 
+@db_request
 def equipment_http(request):
     """
     /equipment
     """
-    return get_api().parse(request, models.Equipment)
-
+    return stream_response(get_api().parse_stream(request, models.Equipment))
 
-def tags_http(request, is_dev=False):
-    """
-    /tags
 
-    """
+def tags_api():
     return TagAPI(
         get_db(),
         [
@@ -53,49 +112,76 @@ def tags_http(request, is_dev=False):
             models.TagType.EQUIPMENT,
         ],
         LOGGER,
-    ).parse(request, models.Tags)
+        cache=get_cache(),
+    )
+
+
+def exercises_api():
+    return TagAPI(get_db(), [models.TagType.EXERCISE], LOGGER, cache=get_cache())
+
+
+@db_request
+def tags_http(request, is_dev=False):
+    """
+    /tags
+
+    """
+    return stream_response(tags_api().parse_stream(request, models.Tags))
 
 
+@db_request
 def exercises_http(request, is_dev=False):
     """
     /exercises
 
     """
-    return TagAPI(get_db(), [models.TagType.EXERCISE], LOGGER).parse(
-        request, models.Tags
-    )
+    return stream_response(exercises_api().parse_stream(request, models.Tags))
 
 
+@db_request
 def everything_http(request, is_dev=False):
     """
     /everything
 
     """
+    api = get_api()
     if request.method != "GET":
-        return API.error("Must send as a GET request")
+        return api.error("Must send as a GET request")
     request.args = {}
-    data = {
-        "tags": json.loads(tags_http(request))["body"],
-        "equipment": json.loads(equipment_http(request))["body"],
-        "exercises": json.loads(exercises_http(request))["body"],
-        "workouts": json.loads(workouts_http(request))["body"],
-        "sources": json.loads(sources_http(request))["body"],
+    endpoints = {
+        "tags": (tags_api(), models.Tags, {}),
+        "equipment": (api, models.Equipment, {}),
+        "exercises": (exercises_api(), models.Tags, {}),
+        "workouts": (get_api(QueryAPI), models.WorkoutsMaterialized, ID_PARAMS),
+        "sources": (get_api(QueryAPI), models.SourcesMaterialized, ID_PARAMS),
     }
 
-    return API.success(data)
+    # Each endpoint's results are written straight into the one response
+    return stream_response(api.parse_many_stream(request, endpoints))
 
 
+@db_request
 def sources_http(request, is_dev=False):
-    return get_api(QueryAPI).parse(
-        request, models.SourcesMaterialized, {"id": int, "url": str,}
+    return stream_response(
+        get_api(QueryAPI).parse_stream(request, models.SourcesMaterialized, ID_PARAMS)
     )
 
 
+@db_request
 def workouts_http(request, is_dev=False):
-    return get_api(QueryAPI).parse(
-        request, models.WorkoutsMaterialized, {"id": int, "url": str,}
+    return stream_response(
+        get_api(QueryAPI).parse_stream(request, models.WorkoutsMaterialized, ID_PARAMS)
     )
 
 
+@db_request
+def stats_http(request, is_dev=False):
+    """
+    /stats
+
+    """
+    return stream_response(get_api(StatsAPI).parse_stream(request, models.Workouts))
+
+
 if __name__ == "__main__":
     pass
@@ -1,12 +1,84 @@
 import json
 from datetime import datetime, timedelta
-from functools import cache
+from functools import cache, lru_cache
 
 import isodate
-from peewee import Model
+from peewee import DateTimeField, Model
+from playhouse.postgres_ext import ArrayField, IntervalField, JSONField
+
+
+# Zone durations repeat a lot from row to row
+@lru_cache(maxsize=4096)
+def duration_isoformat(value):
+    """isodate.duration_isoformat for timedeltas, without the regex substitution"""
+    usecs = (value.days * 86400 + value.seconds) * 1000000 + value.microseconds
+    sign = "-" if usecs < 0 else ""
+    seconds, usecs = divmod(abs(usecs), 1000000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+
+    ret = [sign, "P"]
+    if days:
+        ret.append(f"{days}D")
+    if hours or minutes or seconds or usecs:
+        ret.append("T")
+        if hours:
+            ret.append(f"{hours}H")
+        if minutes:
+            ret.append(f"{minutes}M")
+        if usecs:
+            ret.append(f"{seconds}.{usecs:06d}".rstrip("0") + "S")
+        elif seconds:
+            ret.append(f"{seconds}S")
+    elif not days:
+        ret.append("0D")
+    return "".join(ret)
+
+
+def _none_list(value):
+    # Aggregated columns with nothing to aggregate come back as [None]
+    if isinstance(value, list) and len(value) == 1 and value[0] is None:
+        return []
+    return value
+
+
+class RowSerializer:
+    """Turns .tuples() rows straight into the dicts json_friendly returns.
+
+    Where each column goes and how its value is converted is worked out once
+    per set of columns, rather than for every row on a model instance.
+    """
+
+    def __init__(self, columns):
+        # columns are (key path, converter or None, whether to leave out None)
+        self.columns = [
+            (path[:-1], path[-1], convert, omit_none)
+            for path, convert, omit_none in columns
+        ]
+
+    def __call__(self, row):
+        j = {}
+        for value, (parents, key, convert, omit_none) in zip(row, self.columns):
+            if value is None:
+                if omit_none:
+                    continue
+            elif convert is not None:
+                value = convert(value)
+
+            d = j
+            for k in parents:
+                if k not in d:
+                    d[k] = {}
+                d = d[k]
+            d[key] = value
+        return j
 
 
 class BaseModel(Model):
+    # Fields left out of json_friendly when they're None
+    _omit_none_fields = frozenset()
+
     def as_dict(self):
         fields = {}
         for field in self._meta.fields.items():
@@ -29,3 +101,33 @@ class BaseModel(Model):
                 fields[k] = isodate.duration_isoformat(v)
 
         return fields
+
+    @classmethod
+    def _json_path(cls, name):
+        return (name,)
+
+    @staticmethod
+    def _json_converter(field):
+        if isinstance(field, DateTimeField):
+            return lambda v: v.isoformat()
+        if isinstance(field, IntervalField):
+            return duration_isoformat
+        if isinstance(field, (ArrayField, JSONField)):
+            return _none_list
+        return None
+
+    @classmethod
+    @cache
+    def row_serializer(cls, names):
+        """A RowSerializer for .tuples() rows of the named fields, in order"""
+        return RowSerializer(
+            [
+                (
+                    cls._json_path(name),
+                    # Aliased expressions aren't fields and are passed through
+                    cls._json_converter(cls._meta.fields.get(name)),
+                    name in cls._omit_none_fields,
+                )
+                for name in names
+            ]
+        )
@@ -0,0 +1,96 @@
+import struct
+
+from peewee import BlobField
+
+
+class SamplesCodec:
+    """Delta encodes per second heart rate samples into a compact byte string.
+
+    Layout: a header holding the width of each delta (1 or 2 bytes) and the
+    first sample, followed by one signed little-endian delta per remaining
+    sample. Heart rate rarely moves more than a few bpm a second so almost
+    every workout fits in one byte per sample.
+
+    numpy is imported on first use rather than with the module, as every
+    model import would otherwise pay for it, including api cold starts that
+    never touch a sample.
+    """
+
+    HEADER = struct.Struct("<Bh")
+    INT8 = 1
+    INT16 = 2
+    DTYPES = {INT8: "<i1", INT16: "<i2"}
+
+    @classmethod
+    def _width(cls, deltas):
+        import numpy as np
+
+        if deltas.size == 0:
+            return cls.INT8
+        low, high = deltas.min(), deltas.max()
+        for width in (cls.INT8, cls.INT16):
+            info = np.iinfo(cls.DTYPES[width])
+            if low >= info.min and high <= info.max:
+                return width
+        raise ValueError(f"Samples out of range: {low} {high}")
+
+    @classmethod
+    def encode(cls, samples):
+        import numpy as np
+
+        if samples is None:
+            return None
+        values = np.asarray(samples, dtype=np.int32)
+        if values.size == 0:
+            return b""
+
+        deltas = np.diff(values)
+        width = cls._width(deltas)
+        return (
+            cls.HEADER.pack(width, int(values[0]))
+            + deltas.astype(cls.DTYPES[width]).tobytes()
+        )
+
+    @classmethod
+    def decode_array(cls, data):
+        import numpy as np
+
+        if data is None:
+            return None
+        data = bytes(data)
+        if len(data) == 0:
+            return np.empty(0, dtype=np.int32)
+
+        width, first = cls.HEADER.unpack_from(data)
+        deltas = np.frombuffer(data, dtype=cls.DTYPES[width], offset=cls.HEADER.size)
+        values = np.empty(deltas.size + 1, dtype=np.int32)
+        values[0] = first
+        np.cumsum(deltas, dtype=np.int32, out=values[1:])
+        values[1:] += first
+        return values
+
+    @classmethod
+    def decode(cls, data):
+        values = cls.decode_array(data)
+        return None if values is None else values.tolist()
+
+    @classmethod
+    def decode_hex(cls, value):
+        # bytea columns nested in json are rendered by postgres as "\x<hex>"
+        if value is None:
+            return None
+        if value.startswith("\\x"):
+            value = value[2:]
+        return cls.decode(bytes.fromhex(value))
+
+
+class SamplesField(BlobField):
+    """Stores a list of integer samples as a delta encoded bytea column."""
+
+    def db_value(self, value):
+        if value is not None and not isinstance(value, (bytes, bytearray, memoryview)):
+            value = SamplesCodec.encode(value)
+        return super().db_value(value)
+
+    def python_value(self, value):
+        return SamplesCodec.decode(value)
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+
+import isodate
+
+import src.db.workout.models as models
+from src.db.base_model import duration_isoformat
+from src.utils.test_base import TestBase
+
+
+class TestRowSerializer(TestBase):
+    def test_duration_isoformat(self):
+        for value in [
+            timedelta(0),
+            timedelta(seconds=59),
+            timedelta(seconds=3661),
+            timedelta(days=1),
+            timedelta(days=1, seconds=5),
+            timedelta(seconds=61.25),
+            timedelta(microseconds=1),
+            timedelta(seconds=-5),
+            timedelta(days=-2, hours=3),
+        ]:
+            self.assertEqual(
+                duration_isoformat(value), isodate.duration_isoformat(value)
+            )
+
+    def _row(self, names, **values):
+        return tuple(values.get(name) for name in names)
+
+    def test_workouts(self):
+        model = models.WorkoutsMaterialized
+        names = tuple(f.name for f in model._meta.sorted_fields)
+        values = {
+            "id": 3,
+            "avghr": 140,
+            "starttime": datetime(2022, 10, 12, 10, tzinfo=timezone.utc),
+            "sport": "Running",
+            "zone_50_60_duration": timedelta(minutes=5),
+            "zone_50_60_lower": 100,
+            "zone_90_100_percentspentabove": 2.5,
+            "tags": [None],
+            "equipment": [None],
+            "sources": [{"id": 1}],
+        }
+        serialized = model.row_serializer(names)(self._row(names, **values))
+
+        expected = model(**values).json_friendly()
+        expected["tags"] = []
+        expected["equipment"] = []
+        self.assertEqual(serialized, expected)
+        self.assertNotIn("samples", serialized)
+        self.assertEqual(serialized["hrzones"]["50_60"]["duration"], "PT5M")
+
+        # Only the columns that were selected come back
+        names = ("id", "sport", "samples")
+        serialized = model.row_serializer(names)((1, "Running", [100, 101]))
+        self.assertEqual(
+            serialized, {"id": 1, "sport": "Running", "samples": [100, 101]}
+        )
+
+    def test_sources(self):
+        model = models.SourcesMaterialized
+        names = tuple(f.name for f in model._meta.sorted_fields)
+        values = {
+            "id": 1,
+            "length": timedelta(minutes=30),
+            "sourcetype": models.SourceType.YOUTUBE,
+            "url": "https://youtube.com/source1",
+            "workouts": [{"id": 3}],
+            "tags": ["tag1"],
+            "exercises": [None],
+        }
+        serialized = model.row_serializer(names)(self._row(names, **values))
+
+        expected = model(**values).json_friendly()
+        expected["exercises"] = []
+        self.assertEqual(serialized, expected)
@@ -0,0 +1,49 @@
+import json
+import unittest
+
+import src.db.workout.models as models
+from src.db.samples_field import SamplesCodec
+from src.utils.test_base import TestBase
+
+
+class TestSamplesCodec(TestBase):
+    def data(self):
+        with open("src/db/workout/tests/sample_data.json") as f:
+            return json.loads(f.read())["samples"]
+
+    def test_round_trip(self):
+        samples = self.data()
+        encoded = SamplesCodec.encode(samples)
+        self.assertEqual(SamplesCodec.decode(encoded), samples)
+        # one byte per sample plus the header
+        self.assertEqual(len(encoded), SamplesCodec.HEADER.size + len(samples) - 1)
+
+    def test_wide_deltas(self):
+        # Dropouts to 0 need two bytes per delta
+        samples = [150, 0, 180, 181, 179]
+        encoded = SamplesCodec.encode(samples)
+        self.assertEqual(encoded[0], SamplesCodec.INT16)
+        self.assertEqual(SamplesCodec.decode(encoded), samples)
+
+        with self.assertRaises(ValueError):
+            SamplesCodec.encode([0, 70000])
+
+    def test_edge_cases(self):
+        self.assertEqual(SamplesCodec.encode(None), None)
+        self.assertEqual(SamplesCodec.decode(None), None)
+        self.assertEqual(SamplesCodec.decode(SamplesCodec.encode([])), [])
+        self.assertEqual(SamplesCodec.decode(SamplesCodec.encode([90])), [90])
+
+    def test_decode_hex(self):
+        samples = [100, 102, 101, 99]
+        hex_val = "\\x" + SamplesCodec.encode(samples).hex()
+        self.assertEqual(SamplesCodec.decode_hex(hex_val), samples)
+
+    def test_field(self):
+        field = models.Workouts.samples
+        samples = [100, 102, 101, 99]
+        # psycopg2 hands bytea columns back as memoryviews
+        from_db = memoryview(SamplesCodec.encode(samples))
+        self.assertEqual(field.python_value(from_db), samples)
+        self.assertEqual(field.python_value(None), None)
+        self.assertEqual(field.db_value(None), None)
@@ -2,6 +2,7 @@ import abc
 from functools import cached_property
 
 import src.db.workout.models as models
+from src.db.workout.tag_registry import TagRegistry
 from src.db.workout.workout_data_store import WorkoutDataStore
 from src.utils import log
 
@@ -27,20 +28,10 @@ class DBInterface(abc.ABC):
             pass
         return None
 
-    def _insert_tags(self, data, type_data):
-        self.logger.debug("Inserting tag data", tag_type=type_data, tags=data)
-        insert_data = [{"name": val, "tagtype": type_data} for val in data]
-        with self.db.atomic():
-            inserts = (
-                models.Tags.insert_many(insert_data).on_conflict_ignore().execute()
-            )
+    @cached_property
+    def tag_registry(self):
+        # Callers inserting a batch replace this with one shared registry
+        return TagRegistry(self.db, self.logger)
 
-            all_models = models.Tags.select().where(models.Tags.name << data).execute()
-        if inserts is not None and len(inserts) > 0:
-            new_inserts = set(i[0] for i in inserts)
-            for i in sorted(all_models, key=lambda x: x.name):
-                if i.id in new_inserts:
-                    self.logger.info(
-                        f"New tag: {i.name}", tag_name=i.name, action="new"
-                    )
-        return all_models
+    def _insert_tags(self, data, type_data):
+        return self.tag_registry.get(data, type_data)
@@ -0,0 +1,96 @@
+import numpy as np
+
+from src.db.workout import models
+
+
+def lttb(samples, points):
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last readings and, from each of points - 2 equal
+    buckets in between, the one forming the largest triangle with the reading
+    kept from the bucket before and the mean of the bucket after. The bucket
+    means are worked out for every bucket at once, which leaves a single
+    vectorised argmax per bucket. t is the second each kept reading is from.
+    """
+    hr = np.asarray(samples if samples is not None else [], dtype=np.float64)
+    # Zeros are dropouts, which would otherwise always be picked as extremes
+    t = np.flatnonzero(hr > 0)
+    hr = hr[t]
+    n = t.size
+    if n <= points or points < 3:
+        return {"method": "lttb", "t": t.tolist(), "hr": hr.astype(int).tolist()}
+
+    t = t.astype(np.float64)
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    mean_t = np.add.reduceat(t[: n - 1], starts) / counts
+    mean_hr = np.add.reduceat(hr[: n - 1], starts) / counts
+    # The last bucket is followed by the final reading rather than a mean
+    next_t = np.append(mean_t[1:], t[-1])
+    next_hr = np.append(mean_hr[1:], hr[-1])
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        area = np.abs(
+            (t[a] - next_t[i]) * (hr[start:end] - hr[a])
+            - (t[a] - t[start:end]) * (next_hr[i] - hr[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+
+    return {
+        "method": "lttb",
+        "t": t[selected].astype(int).tolist(),
+        "hr": hr[selected].astype(int).tolist(),
+    }
+
+
+def buckets(samples, points):
+    """The min, mean and max heart rate of fixed intervals.
+
+    The interval is the number of seconds that gives at most points buckets.
+    Buckets with nothing but dropouts in them are None.
+    """
+    hr = np.asarray(samples if samples is not None else [], dtype=np.float64)
+    interval = max(-(-hr.size // points), 1)
+    grid = np.zeros(-(-hr.size // interval) * interval)
+    grid[: hr.size] = hr
+    grid = grid.reshape(-1, interval)
+
+    valid = grid > 0
+    counts = valid.sum(axis=1)
+    empty = counts == 0
+    mean = np.where(valid, grid, 0).sum(axis=1) / np.maximum(counts, 1)
+    low = np.where(valid, grid, np.inf).min(axis=1)
+    high = np.where(valid, grid, -np.inf).max(axis=1)
+
+    def column(values, convert):
+        return [None if e else convert(v) for e, v in zip(empty, values)]
+
+    return {
+        "method": "buckets",
+        "interval": int(interval),
+        "min": column(low, int),
+        "mean": column(mean, lambda v: round(float(v), 1)),
+        "max": column(high, int),
+    }
+
+
+METHODS = {
+    models.DownsampleMethod.LTTB: lttb,
+    models.DownsampleMethod.BUCKETS: buckets,
+}
+
+
+def downsample(samples, method, points):
+    return METHODS[models.DownsampleMethod(method)](samples, points)
+
+
+def tiers(samples):
+    """Every stored copy of samples, as (method, points, data)"""
+    for method, func in METHODS.items():
+        for points in models.DownsampledSamples.POINTS:
+            yield method, points, func(samples, points)
@@ -0,0 +1,103 @@
+from functools import cached_property
+
+import src.db.workout.models as models
+
+
+class EquipmentRegistry:
+    """An in memory (type, magnitude, quantity) -> Equipment map.
+
+    The equipment table is tiny and barely changes, so one registry is shared
+    by the whole process and the table is read once, on first use. After
+    that only combinations that haven't been seen go to postgres: one
+    INSERT ... ON CONFLICT DO NOTHING RETURNING for the lot, plus a select for
+    any that a concurrent writer got to first.
+    """
+
+    _shared = {}
+
+    def __init__(self, db, logger):
+        self.db = db
+        self.logger = logger
+
+    @classmethod
+    def shared(cls, db, logger):
+        if db not in cls._shared:
+            cls._shared[db] = cls(db, logger)
+        return cls._shared[db]
+
+    @classmethod
+    def clear(cls):
+        # For when the database behind db is swapped out, as it is in tests
+        cls._shared.clear()
+
+    @staticmethod
+    def key(equipment_type, magnitude, quantity):
+        return (models.EquipmentType(equipment_type), str(magnitude), quantity)
+
+    @classmethod
+    def keys(cls, equipment):
+        """The keys for a WorkoutDataStore.equipment dict, in order"""
+        return [
+            cls.key(k, vals["magnitude"], vals["quantity"])
+            for k, v in equipment.items()
+            for vals in v
+        ]
+
+    @cached_property
+    def _equipment(self):
+        with self.db.atomic():
+            return {
+                self.key(e.equipmenttype, e.magnitude, e.quantity): e
+                for e in models.Equipment.select()
+            }
+
+    def add_many(self, keys):
+        missing = [k for k in dict.fromkeys(keys) if k not in self._equipment]
+        if len(missing) == 0:
+            return
+
+        with self.db.atomic():
+            inserted = list(
+                models.Equipment.insert_many(
+                    [
+                        {"equipmenttype": t, "magnitude": m, "quantity": q}
+                        for t, m, q in missing
+                    ]
+                )
+                .on_conflict_ignore()
+                .returning(models.Equipment)
+                .execute()
+            )
+            found = {
+                self.key(e.equipmenttype, e.magnitude, e.quantity) for e in inserted
+            }
+            existing = []
+            if len(found) < len(missing):
+                existing = [
+                    e
+                    for e in models.Equipment.select().where(
+                        models.Equipment.equipmenttype
+                        << list({t for t, _, _ in missing})
+                    )
+                    if self.key(e.equipmenttype, e.magnitude, e.quantity) not in found
+                ]
+
+        for e in inserted:
+            self.logger.info(
+                "New equipment type inserted", equipment=e.as_dict(), action="new"
+            )
+        self._equipment.update(
+            {self.key(e.equipmenttype, e.magnitude, e.quantity): e for e in inserted}
+        )
+        self._equipment.update(
+            {self.key(e.equipmenttype, e.magnitude, e.quantity): e for e in existing}
+        )
+
+    def get(self, keys):
+        self.add_many(keys)
+        missing = [k for k in keys if k not in self._equipment]
+        if len(missing) > 0:
+            # Dropping them would save the workout without its equipment
+            self.logger.error("Unable to resolve equipment", equipment=missing)
+            raise Exception(f"Unable to resolve equipment: {missing}")
+        return [self._equipment[k] for k in keys]
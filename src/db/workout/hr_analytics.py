@@ -0,0 +1,178 @@
+from datetime import timedelta
+
+import numpy as np
+
+from src.utils import config
+
+# The Workouts zone_* column prefixes, lowest zone first
+ZONE_NAMES = ["below_50", "50_60", "60_70", "70_80", "80_90", "90_100"]
+
+
+def zone_seconds(samples, thresholds):
+    """Seconds each workout spent in each zone, for many workouts at once.
+
+    samples is a sequence of per second heart rate arrays. They're
+    concatenated and binned in a single histogram, so the cost is one pass
+    over every sample rather than a loop per workout. Returns an array with a
+    row per workout and a column per zone: below the first threshold, between
+    each, and above the last.
+    """
+    zones = len(thresholds) + 1
+    if len(samples) == 0:
+        return np.zeros((0, zones), dtype=np.int64)
+
+    arrays = [np.asarray(s if s is not None else [], dtype=np.float64) for s in samples]
+    hr = np.concatenate(arrays)
+    workout = np.repeat(np.arange(len(arrays)), [a.size for a in arrays])
+    # Zeros are dropouts rather than readings
+    valid = hr > 0
+    bins = workout[valid] * zones + np.searchsorted(thresholds, hr[valid], side="right")
+    counts = np.bincount(bins, minlength=len(arrays) * zones)
+    return counts.reshape(len(arrays), zones)
+
+
+def zone_columns(seconds, thresholds, max_hr):
+    """The zone_* column values for each row of zone_seconds.
+
+    Matches what's stored from Polar's own zone data: every zone's limits,
+    its duration and the percent of the workout spent in it or above. Rows
+    without any heart rate readings are None.
+    """
+    seconds = np.asarray(seconds)
+    above = np.cumsum(seconds[:, ::-1], axis=1)[:, ::-1]
+    total = above[:, :1]
+    percent = np.divide(
+        above * 100.0, total, out=np.zeros(above.shape), where=total > 0
+    )
+    lower = [0] + list(thresholds)
+    upper = list(thresholds) + [max_hr]
+
+    rows = []
+    for row_seconds, row_percent, row_total in zip(seconds, percent, total[:, 0]):
+        if row_total == 0:
+            rows.append(None)
+            continue
+        columns = {}
+        for i, name in enumerate(ZONE_NAMES):
+            columns[f"zone_{name}_lower"] = int(lower[i])
+            columns[f"zone_{name}_upper"] = int(upper[i])
+            columns[f"zone_{name}_duration"] = timedelta(seconds=int(row_seconds[i]))
+            columns[f"zone_{name}_percentspentabove"] = round(float(row_percent[i]), 6)
+        rows.append(columns)
+    return rows
+
+
+class HRAnalytics:
+    """Metrics derived from a workout's per second heart rate samples.
+
+    The samples are turned into one array up front and each metric is a
+    vectorised pass over it. Zeros are dropouts from the strap rather than
+    readings, so they're left out of everything.
+
+    Thresholds, resting_hr and max_hr default to the hr_analytics section of
+    the app config, with the zone thresholds at 50-90% of max_hr.
+    """
+
+    RESTING_HR = 60
+    MAX_HR = 190
+    ZONE_PERCENTAGES = (50, 60, 70, 80, 90)
+    # Windows the best average heart rate is found for, in seconds
+    EFFORT_WINDOWS = (60, 300, 1200)
+    # Recovery is the biggest drop in heart rate over this many seconds
+    RECOVERY_WINDOW = 60
+    # Drift compares each half of the workout, shorter ones are too noisy
+    MIN_DRIFT_DURATION = 20 * 60
+
+    def __init__(self, samples, thresholds=None, resting_hr=None, max_hr=None):
+        settings = self._settings()
+        self.resting_hr = resting_hr or settings.get("resting_hr", self.RESTING_HR)
+        self.max_hr = max_hr or settings.get("max_hr", self.MAX_HR)
+        if thresholds is None:
+            thresholds = settings.get("zone_thresholds")
+        if thresholds is None:
+            thresholds = self.default_thresholds
+        self.thresholds = sorted(thresholds)
+
+        hr = np.asarray(samples if samples is not None else [], dtype=np.float64)
+        self.hr = hr[hr > 0]
+
+    @staticmethod
+    def _settings():
+        try:
+            return config.read_config().get("hr_analytics", {})
+        except FileNotFoundError:
+            return {}
+
+    @property
+    def default_thresholds(self):
+        return [round(self.max_hr * p / 100) for p in self.ZONE_PERCENTAGES]
+
+    @property
+    def zone_thresholds(self):
+        """Thresholds for the zone_* columns, which follow Polar's five zones"""
+        if len(self.thresholds) == len(self.ZONE_PERCENTAGES):
+            return self.thresholds
+        return self.default_thresholds
+
+    @property
+    def min_hr(self):
+        return int(self.hr.min()) if self.hr.size > 0 else 0
+
+    def time_in_zones(self):
+        """Seconds spent below the first threshold, between each, and above the last"""
+        return zone_seconds([self.hr], self.thresholds)[0].tolist()
+
+    def zone_columns(self):
+        """zone_* column values, for when Polar didn't send zone data"""
+        thresholds = self.zone_thresholds
+        return zone_columns(
+            zone_seconds([self.hr], thresholds), thresholds, self.max_hr
+        )[0]
+
+    def training_load(self):
+        """Banister's TRIMP, heart rate reserve weighted minutes"""
+        if self.hr.size == 0:
+            return None
+        reserve = (self.hr - self.resting_hr) / (self.max_hr - self.resting_hr)
+        reserve = np.clip(reserve, 0, 1)
+        return round(float(np.sum(reserve * 0.64 * np.exp(1.92 * reserve)) / 60), 1)
+
+    def effort_curve(self):
+        """Best average heart rate held for each of EFFORT_WINDOWS"""
+        sums = np.concatenate(([0], np.cumsum(self.hr)))
+        curve = {}
+        for window in self.EFFORT_WINDOWS:
+            if self.hr.size < window:
+                break
+            means = (sums[window:] - sums[:-window]) / window
+            curve[str(window)] = int(round(means.max()))
+        return curve
+
+    def drift(self):
+        """Percent change in average heart rate from the first half to the second"""
+        if self.hr.size < self.MIN_DRIFT_DURATION:
+            return None
+        first, second = np.array_split(self.hr, 2)
+        return round(float((second.mean() - first.mean()) / first.mean() * 100), 2)
+
+    def recovery_drop(self):
+        """Biggest fall in heart rate over RECOVERY_WINDOW seconds"""
+        window = self.RECOVERY_WINDOW
+        if self.hr.size <= window:
+            return None
+        return max(int((self.hr[:-window] - self.hr[window:]).max()), 0)
+
+    def summary(self):
+        """The column values for a Workouts row"""
+        return {
+            "trainingload": self.training_load(),
+            "hrdrift": self.drift(),
+            "recoverydrop": self.recovery_drop(),
+            "hranalytics": {
+                "zones": {
+                    "thresholds": self.thresholds,
+                    "seconds": self.time_in_zones(),
+                },
+                "effort": self.effort_curve(),
+            },
+        }
@@ -7,7 +7,9 @@ from peewee import (
     ManyToManyField,
     CharField,
     SQL,
+    fn,
 )
+from playhouse.pool import PooledPostgresqlExtDatabase
 from playhouse.postgres_ext import (
     PostgresqlExtDatabase,
     JSONField,
@@ -21,8 +23,11 @@ from functools import cache
 
 from src.db.base_model import BaseModel
 from src.db.enum_field import EnumField, ExtendedEnum
+from src.db.samples_field import SamplesField
 
-database = PostgresqlExtDatabase(None)
+# Pooled so that each worker thread gets its own connection. The pool size and
+# stale timeout are set from the app config when DBConnection initialises it
+database = PooledPostgresqlExtDatabase(None)
 
 # types
 
@@ -47,6 +52,11 @@ class ZoneType(ExtendedEnum):
     NINETY_100 = "NINETY_100"
 
 
+class DownsampleMethod(ExtendedEnum):
+    LTTB = "lttb"
+    BUCKETS = "buckets"
+
+
 class TagType(ExtendedEnum):
     TAG = "TAG"
     EXERCISE = "EXERCISE"
@@ -86,6 +96,19 @@ class Equipment(WorkoutBaseModel):
     quantity = IntegerField(constraints=[SQL("DEFAULT 1")], null=True)
 
 
+# Postgres treats NULLs as distinct in a unique index, so a NULL quantity is
+# indexed as -1 to stop duplicates of those too
+Equipment.add_index(
+    Equipment.index(
+        Equipment.equipmenttype,
+        Equipment.magnitude,
+        fn.COALESCE(Equipment.quantity, -1),
+        unique=True,
+        name="equipment_equipmenttype_magnitude_quantity",
+    )
+)
+
+
 class Sources(WorkoutBaseModel):
     extrainfo = JSONField(null=True)
     length = IntervalField(null=True)
@@ -108,7 +131,7 @@ class Workouts(WorkoutBaseModel):
     sport = CharField(default="Unknown")
     starttime = DateTimeTZField(unique=True)
     tags = ManyToManyField(Tags, backref="workouts")
-    samples = BinaryJSONField(null=True)
+    samples = SamplesField(null=True)
     zone_below_50_lower = IntegerField(null=True)
     zone_below_50_upper = IntegerField(null=True)
     zone_below_50_duration = IntervalField(null=True)
@@ -133,6 +156,21 @@ class Workouts(WorkoutBaseModel):
     zone_90_100_upper = IntegerField(null=True)
     zone_90_100_duration = IntervalField(null=True)
     zone_90_100_percentspentabove = FloatField(null=True)
+    # Derived from samples by HRAnalytics when the workout is saved
+    trainingload = FloatField(null=True)
+    hrdrift = FloatField(null=True)
+    recoverydrop = IntegerField(null=True)
+    hranalytics = BinaryJSONField(null=True)
+
+    _omit_none_fields = frozenset(["samples"])
+
+    @classmethod
+    def _json_path(cls, name):
+        # zone_50_60_duration is nested as hrzones["50_60"]["duration"]
+        if name.startswith("zone_"):
+            parts = name.split("_")
+            return ("hrzones", f"{parts[1]}_{parts[2]}", parts[3])
+        return super()._json_path(name)
 
     def json_friendly(self):
         j = super().json_friendly()
@@ -168,6 +206,57 @@ class SourcesMaterialized(Sources):
     exercises = ArrayField(TextField)
 
 
+class DownsampledSamples(WorkoutBaseModel):
+    """Low resolution copies of a workout's samples, for charting.
+
+    A copy is stored per method at each of POINTS, so a request only ever
+    reads the one it asks for instead of the full per second series.
+    """
+
+    class Meta:
+        table_name = "downsampled_samples"
+        indexes = ((("workout", "method", "points"), True),)
+
+    POINTS = (100, 300, 1000)
+    DEFAULT_POINTS = 300
+
+    workout = ForeignKeyField(Workouts, backref="downsampled", on_delete="CASCADE")
+    method = EnumField(DownsampleMethod)
+    points = IntegerField()
+    data = BinaryJSONField()
+
+    @classmethod
+    def tier(cls, points=None):
+        """The stored size a request for points is served from, rounding up"""
+        if points is None:
+            return cls.DEFAULT_POINTS
+        for p in cls.POINTS:
+            if points <= p:
+                return p
+        return cls.POINTS[-1]
+
+
+class MaterializedGeneration(WorkoutBaseModel):
+    """Single row counter bumped every time the materialized data changes"""
+
+    class Meta:
+        table_name = "materialized_generation"
+
+    generation = IntegerField(default=0)
+
+
+class PolarSync(WorkoutBaseModel):
+    """Single row watermark for the Polar AccessLink sync"""
+
+    class Meta:
+        table_name = "polar_sync"
+
+    # Start time of the newest workout the sync has dealt with
+    last_start_time = DateTimeTZField(null=True)
+    last_transaction_id = IntegerField(null=True)
+    synced_at = DateTimeTZField(null=True)
+
+
 def get_all_models():
     return [
         Equipment,
@@ -178,9 +267,46 @@ def get_all_models():
         Workouts.sources.get_through_model(),
         Workouts.equipment.get_through_model(),
         Workouts.tags.get_through_model(),
+        DownsampledSamples,
+        MaterializedGeneration,
+        PolarSync,
     ]
 
 
+# Columns ComplexQuery filters the summary tables on. The tables are created
+# with CREATE TABLE AS rather than from a model, so their indexes live here
+MATERIALIZED_INDEXES = {
+    "workouts_materialized": [
+        "starttime",
+        "sport",
+        "avghr",
+        "minhr",
+        "maxhr",
+        "trainingload",
+        "hrdrift",
+        "recoverydrop",
+    ]
+    + [
+        f"zone_{zone}_{field}"
+        for zone in ["below_50", "50_60", "60_70", "70_80", "80_90", "90_100"]
+        for field in ["duration", "percentspentabove"]
+    ],
+    "sources_materialized": ["creator", "sourcetype", "length"],
+}
+
+
+def create_materialized_indexes(tables=None):
+    if tables is None:
+        tables = MATERIALIZED_INDEXES.keys()
+    with database.atomic():
+        for table in tables:
+            for column in MATERIALIZED_INDEXES[table]:
+                database.execute_sql(
+                    f"CREATE INDEX IF NOT EXISTS {table}_{column}_idx "
+                    f"ON {table} ({column})"
+                )
+
+
 def create_materialized_views(
     paths=[
         "src/db/workout/sql/workouts_materialized_view.sql",
@@ -195,9 +321,72 @@ def create_materialized_views(
     with database.atomic():
         for i in queries:
             database.execute_sql(i)
+    create_materialized_indexes()
+
+
+def _refresh_materialized(name, ids=None):
+    # Each summary table is rebuilt from its {name}_query view. Deleting rather
+    # than truncating means readers keep seeing the old rows until we commit
+    if ids is None:
+        database.execute_sql(f"DELETE FROM {name}")
+        database.execute_sql(f"INSERT INTO {name} SELECT * FROM {name}_query")
+        return
+    database.execute_sql(f"DELETE FROM {name} WHERE id = ANY(%s)", (ids,))
+    database.execute_sql(
+        f"INSERT INTO {name} SELECT * FROM {name}_query WHERE id = ANY(%s)", (ids,)
+    )
+
+
+def _linked_source_ids(workout_ids):
+    through = Workouts.sources.get_through_model()
+    return [
+        i[0]
+        for i in through.select(through.sources)
+        .where(through.workouts << workout_ids)
+        .distinct()
+        .tuples()
+    ]
+
+
+def _bump_materialized_generation():
+    MaterializedGeneration.insert(id=1, generation=1).on_conflict(
+        conflict_target=[MaterializedGeneration.id],
+        update={
+            MaterializedGeneration.generation: MaterializedGeneration.generation + 1
+        },
+    ).execute()
+
+
+def materialized_generation():
+    with database.atomic():
+        generation = (
+            MaterializedGeneration.select(MaterializedGeneration.generation)
+            .where(MaterializedGeneration.id == 1)
+            .scalar()
+        )
+    return generation if generation is not None else 0
+
 
+def refresh_materialized_views(workout_ids=None, source_ids=None):
+    """Bring workouts_materialized and sources_materialized up to date.
 
-def refresh_materialized_views():
+    With no ids every row is rebuilt. Otherwise only the given workouts, any
+    sources linked to them and any extra source_ids are, so the cost scales
+    with the size of the change rather than the whole history.
+    """
     with database.atomic():
-        database.execute_sql("REFRESH MATERIALIZED VIEW workouts_materialized")
-        database.execute_sql("REFRESH MATERIALIZED VIEW sources_materialized")
+        # Part of the same transaction so readers never see the new
+        # generation paired with the old data
+        _bump_materialized_generation()
+        if workout_ids is None and source_ids is None:
+            _refresh_materialized("workouts_materialized")
+            _refresh_materialized("sources_materialized")
+            return
+
+        workout_ids = sorted(set(workout_ids or []))
+        source_ids = set(source_ids or [])
+        if len(workout_ids) > 0:
+            _refresh_materialized("workouts_materialized", workout_ids)
+            source_ids.update(_linked_source_ids(workout_ids))
+        if len(source_ids) > 0:
+            _refresh_materialized("sources_materialized", sorted(source_ids))
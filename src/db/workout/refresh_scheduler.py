@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import src.db.workout.models as models
+
+RefreshRun = namedtuple(
+    "RefreshRun",
+    ["started", "duration", "requests", "workout_ids", "source_ids", "error"],
+)
+
+
+class RefreshScheduler:
+    """Runs refresh_materialized_views on a background thread.
+
+    request() returns straight away. Requests that come in while a refresh is
+    waiting to start, or already running, are merged and handled by a single
+    later run: the union of their ids, or a full rebuild if any of them asked
+    for one. Each run is timed and logged, and the latest max_runs are kept in
+    runs.
+
+    A run that fails puts its ids back with the pending ones, so nothing is
+    dropped, and they're tried again retry_delay seconds later.
+
+    The refresh itself replaces rows inside one transaction, so readers keep
+    seeing the previous rows until it commits and are never blocked by it.
+    """
+
+    def __init__(self, logger, delay=1.0, refresh=None, retry_delay=30.0, max_runs=100):
+        self.logger = logger
+        # How long to wait for more requests before starting a run
+        self.delay = delay
+        self.retry_delay = retry_delay
+        self._refresh = refresh or models.refresh_materialized_views
+        self._cond = threading.Condition()
+        self._thread = None
+        self._full = False
+        self._workout_ids = None
+        self._source_ids = None
+        self._requested = 0
+        self._completed = 0
+        self._failures = 0
+        self.runs = deque(maxlen=max_runs)
+
+    def request(self, workout_ids=None, source_ids=None):
+        with self._cond:
+            self._merge(workout_ids, source_ids)
+            self._requested += 1
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="refresh-scheduler", daemon=True
+                )
+                self._thread.start()
+
+    def _merge(self, workout_ids, source_ids):
+        if workout_ids is None and source_ids is None:
+            self._full = True
+        if workout_ids is not None:
+            self._workout_ids = (self._workout_ids or set()) | set(workout_ids)
+        if source_ids is not None:
+            self._source_ids = (self._source_ids or set()) | set(source_ids)
+
+    def wait(self, timeout=None):
+        """Blocks until every request made so far has been refreshed.
+
+        Returns False if it timed out, or if a run covering them failed. Those
+        requests stay queued and are retried in the background.
+        """
+        with self._cond:
+            target = self._requested
+            failures = self._failures
+            self._cond.wait_for(
+                lambda: self._completed >= target or self._failures > failures,
+                timeout,
+            )
+            return self._completed >= target
+
+    def _take_pending(self):
+        with self._cond:
+            if self._completed == self._requested:
+                self._thread = None
+                self._cond.notify_all()
+                return None
+            pending = (
+                self._requested,
+                self._requested - self._completed,
+                None if self._full else self._workout_ids,
+                None if self._full else self._source_ids,
+            )
+            self._full = False
+            self._workout_ids = None
+            self._source_ids = None
+            return pending
+
+    def _run(self):
+        try:
+            while True:
+                time.sleep(self.delay)
+                pending = self._take_pending()
+                if pending is None:
+                    return
+                requested, count, workout_ids, source_ids = pending
+                run = self._refresh_once(count, workout_ids, source_ids)
+                with self._cond:
+                    if run.error is None:
+                        self._completed = requested
+                    else:
+                        self._merge(workout_ids, source_ids)
+                        self._failures += 1
+                    self._cond.notify_all()
+                if run.error is not None:
+                    time.sleep(self.retry_delay)
+        finally:
+            # Hand this thread's connection back to the pool
+            if not models.database.is_closed():
+                models.database.close()
+
+    def _refresh_once(self, count, workout_ids, source_ids):
+        kwargs = {}
+        if workout_ids is not None or source_ids is not None:
+            kwargs = {
+                "workout_ids": sorted(workout_ids or []),
+                "source_ids": sorted(source_ids or []),
+            }
+
+        started = time.time()
+        start = time.perf_counter()
+        error = None
+        try:
+            self._refresh(**kwargs)
+        except Exception as e:
+            error = str(e)
+            self.logger.exception("Refreshing materialized views failed", **kwargs)
+        duration = time.perf_counter() - start
+
+        run = RefreshRun(
+            started,
+            duration,
+            count,
+            kwargs.get("workout_ids"),
+            kwargs.get("source_ids"),
+            error,
+        )
+        self.runs.append(run)
+        self.logger.info(
+            "Refreshed materialized views",
+            duration_ms=round(duration * 1000, 1),
+            requests=count,
+            full_refresh=len(kwargs) == 0,
+            workouts=len(kwargs.get("workout_ids", [])),
+            sources=len(kwargs.get("source_ids", [])),
+            failed=error is not None,
+        )
+        return run
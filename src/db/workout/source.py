@@ -1,4 +1,5 @@
 import math
+from collections import defaultdict
 from functools import cache, cached_property
 
 from typing import override
@@ -40,6 +41,40 @@ class Source(DBInterface):
         if res is not None:
             return ExistingSource(db, url, res, logger)
 
+        return Source._load_new_source(db, url, logger)
+
+    @staticmethod
+    def load_sources(db, urls, logger=None, tag_registry=None):
+        # Resolve a whole batch of urls, looking up the known ones in one query
+        urls = {Source.normalise_url(url) for url in urls}
+        if len(urls) == 0:
+            return {}
+
+        with db.atomic():
+            existing = {
+                i.url: i
+                for i in models.Sources.select().where(models.Sources.url << urls)
+            }
+
+        new_urls = defaultdict(list)
+        for url in urls - existing.keys():
+            new_urls[Source.get_source_type(url)].append(url)
+        for source_obj, type_urls in new_urls.items():
+            if "prefetch" in source_obj.__dict__:
+                source_obj.prefetch(type_urls)
+
+        sources = {}
+        for url in sorted(urls):
+            if url in existing:
+                sources[url] = ExistingSource(db, url, existing[url], logger)
+            else:
+                sources[url] = Source._load_new_source(db, url, logger)
+            if tag_registry is not None:
+                sources[url].tag_registry = tag_registry
+        return sources
+
+    @staticmethod
+    def _load_new_source(db, url, logger=None):
         source_obj = Source.get_source_type(url)
         # __dict__ doesn't include inherited attrs
         if "load_source" in source_obj.__dict__:
@@ -88,21 +123,21 @@ class Source(DBInterface):
     def source_type(cls):
         return None
 
-    @override
-    def insert_row(self):
-        all_tags = set()
+    def tag_names(self):
+        names = {}
         if self.creator:
-            all_tags.update(
-                set(self._insert_tags([self.creator], models.TagType.CREATOR))
-            )
-
+            names[models.TagType.CREATOR] = [self.creator]
         if len(self.exercises) > 0:
-            all_tags.update(
-                set(self._insert_tags(self.exercises, models.TagType.EXERCISE))
-            )
-
+            names[models.TagType.EXERCISE] = list(self.exercises)
         if len(self.tags) > 0:
-            all_tags.update(set(self._insert_tags(self.tags, models.TagType.TAG)))
+            names[models.TagType.TAG] = list(self.tags)
+        return names
+
+    @override
+    def insert_row(self):
+        all_tags = set()
+        for tag_type, names in self.tag_names().items():
+            all_tags.update(set(self._insert_tags(names, tag_type)))
 
         with self.db.atomic():
             self.model = models.Sources.create(
@@ -142,6 +177,10 @@ class ExistingSource(Source):
     def normalise_url(url):
         return url
 
+    @override
+    def tag_names(self):
+        return {}
+
     @override
     def insert_row(self):
         return self.model
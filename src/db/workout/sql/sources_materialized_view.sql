@@ -1,4 +1,4 @@
- CREATE MATERIALIZED VIEW sources_materialized AS select
+ CREATE VIEW sources_materialized_query AS select
   s.id,
   s.length,
   s.creator,
@@ -21,7 +21,6 @@
           'notes', wm.notes,
           'sport', wm.sport,
           'starttime', wm.starttime,
-          'samples', wm.samples,
           'zone_below_50_lower', wm.zone_below_50_lower,
           'zone_below_50_upper', wm.zone_below_50_upper,
           'zone_below_50_duration', wm.zone_below_50_duration,
@@ -58,3 +57,5 @@ left outer join (select tts.sources_id, tag_tag.name from sources_tags_through a
 left outer join (select ttss.sources_id, tag_exercise.name from sources_tags_through as ttss join tags as tag_exercise on ttss.tags_id = tag_exercise.id where tag_exercise.tagtype = 'EXERCISE') as te on s.id = te.sources_id
 group by s.id
 order by s.id;
+CREATE TABLE sources_materialized AS SELECT * FROM sources_materialized_query;
+ALTER TABLE sources_materialized ADD PRIMARY KEY (id);
@@ -1,4 +1,4 @@
-CREATE MATERIALIZED VIEW workouts_materialized AS select
+CREATE VIEW workouts_materialized_query AS select
   w.id,
   w.avghr,
   w.calories,
@@ -33,6 +33,10 @@ CREATE MATERIALIZED VIEW workouts_materialized AS select
   w.zone_90_100_upper,
   w.zone_90_100_duration,
   w.zone_90_100_percentspentabove,
+  w.trainingload,
+  w.hrdrift,
+  w.recoverydrop,
+  w.hranalytics,
   array_agg(distinct tags.name) as tags,
   json_agg(distinct
     case when equipment.equipmenttype is null then null
@@ -69,3 +73,5 @@ left outer join workouts_sources_through as wst on w.id = wst.workouts_id
 left outer join sources as s on wst.sources_id = s.id
 group by w.id
 order by w.id;
+CREATE TABLE workouts_materialized AS SELECT * FROM workouts_materialized_query;
+ALTER TABLE workouts_materialized ADD PRIMARY KEY (id);
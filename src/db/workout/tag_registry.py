@@ -0,0 +1,57 @@
+from functools import cached_property
+
+import src.db.workout.models as models
+
+
+class TagRegistry:
+    """An in memory name -> Tags map shared by everything in an ingest run.
+
+    The whole tags table is read once, on first use. After that only names
+    that haven't been seen go to postgres: one INSERT ... ON CONFLICT DO
+    NOTHING RETURNING for the lot, plus a select for any that a concurrent
+    writer got to first. Callers in a batch register all of their names up
+    front with add_many so the per source lookups don't hit the db at all.
+    """
+
+    def __init__(self, db, logger):
+        self.db = db
+        self.logger = logger
+
+    @cached_property
+    def _tags(self):
+        with self.db.atomic():
+            return {t.name: t for t in models.Tags.select()}
+
+    def add_many(self, names_by_type):
+        # Tag names are unique regardless of type, so the first type a name is
+        # registered with wins, the same as with separate inserts
+        rows = {}
+        for tag_type, names in names_by_type.items():
+            for name in names:
+                if name not in self._tags and name not in rows:
+                    rows[name] = {"name": name, "tagtype": tag_type}
+        if len(rows) == 0:
+            return
+
+        self.logger.debug("Inserting tag data", tags=list(rows.keys()))
+        with self.db.atomic():
+            inserted = list(
+                models.Tags.insert_many(list(rows.values()))
+                .on_conflict_ignore()
+                .returning(models.Tags)
+                .execute()
+            )
+            missing = rows.keys() - {t.name for t in inserted}
+            existing = []
+            if len(missing) > 0:
+                existing = list(
+                    models.Tags.select().where(models.Tags.name << list(missing))
+                )
+
+        for t in sorted(inserted, key=lambda x: x.name):
+            self.logger.info(f"New tag: {t.name}", tag_name=t.name, action="new")
+        self._tags.update({t.name: t for t in inserted + existing})
+
+    def get(self, names, tag_type):
+        self.add_many({tag_type: names})
+        return [self._tags[n] for n in dict.fromkeys(names) if n in self._tags]
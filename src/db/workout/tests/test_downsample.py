@@ -0,0 +1,85 @@
+import json
+
+import numpy as np
+
+from src.db.workout import models
+from src.db.workout.downsample import buckets, downsample, lttb, tiers
+from src.utils.test_base import TestBase
+
+
+class TestDownsample(TestBase):
+    def _samples(self, size=3600):
+        rng = np.random.default_rng(0)
+        return (120 + np.cumsum(rng.integers(-2, 3, size))).clip(40, 200)
+
+    def test_lttb(self):
+        samples = self._samples()
+        samples[1000:1010] = 0
+        data = lttb(samples, 300)
+        self.assertEqual(data["method"], "lttb")
+        self.assertEqual(len(data["t"]), 300)
+        self.assertEqual(data["t"][0], 0)
+        self.assertEqual(data["t"][-1], 3599)
+        self.assertEqual(data["t"], sorted(set(data["t"])))
+        # Every point kept is a real reading, dropouts are never picked
+        for t, hr in zip(data["t"], data["hr"]):
+            self.assertEqual(samples[t], hr)
+            self.assertGreater(hr, 0)
+        # A spike is the largest triangle in its bucket
+        samples[500] += 60
+        self.assertIn(500, lttb(samples, 300)["t"])
+
+    def test_lttb_short(self):
+        self.assertEqual(
+            lttb([100, 0, 120, 130], 300),
+            {"method": "lttb", "t": [0, 2, 3], "hr": [100, 120, 130]},
+        )
+        self.assertEqual(lttb(None, 300), {"method": "lttb", "t": [], "hr": []})
+
+    def test_buckets(self):
+        data = buckets([100, 110, 120, 0, 0, 0, 90, 0], 3)
+        self.assertEqual(
+            data,
+            {
+                "method": "buckets",
+                "interval": 3,
+                "min": [100, None, 90],
+                "mean": [110.0, None, 90.0],
+                "max": [120, None, 90],
+            },
+        )
+
+        samples = self._samples()
+        data = buckets(samples, 1000)
+        self.assertEqual(data["interval"], 4)
+        self.assertEqual(len(data["mean"]), 900)
+        self.assertEqual(data["min"][0], samples[:4].min())
+        self.assertEqual(data["max"][-1], samples[-4:].max())
+        self.assertAlmostEqual(data["mean"][1], samples[4:8].mean(), places=1)
+
+    def test_tiers(self):
+        samples = self._samples()
+        stored = list(tiers(samples))
+        self.assertEqual(
+            [(m, p) for m, p, _ in stored],
+            [
+                (method, points)
+                for method in models.DownsampleMethod
+                for points in models.DownsampledSamples.POINTS
+            ],
+        )
+        self.assertEqual(stored[0][2], downsample(samples, "lttb", 100))
+
+        # The smallest copies are an order of magnitude smaller than the series
+        full = len(json.dumps(samples.tolist()))
+        for method, points, data in stored:
+            if points == 100:
+                self.assertGreater(full / len(json.dumps(data)), 9)
+
+    def test_tier(self):
+        tier = models.DownsampledSamples.tier
+        self.assertEqual(tier(), 300)
+        self.assertEqual(tier(50), 100)
+        self.assertEqual(tier(100), 100)
+        self.assertEqual(tier(101), 300)
+        self.assertEqual(tier(5000), 1000)
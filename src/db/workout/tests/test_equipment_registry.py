@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+import src.db.workout.models as models
+from src.db.workout.equipment_registry import EquipmentRegistry
+from src.utils.test_base import TestBase
+
+
+class TestEquipmentRegistry(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.db = cls.create_test_db(insert_data=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.teardown_test_db()
+
+    def test_keys(self):
+        self.assertEqual(
+            EquipmentRegistry.keys(
+                {
+                    "weights": [
+                        {"magnitude": 5, "quantity": 2},
+                        {"magnitude": "8", "quantity": 1},
+                    ],
+                    "bands": [{"magnitude": "heavy", "quantity": 1}],
+                }
+            ),
+            [
+                (models.EquipmentType.WEIGHTS, "5", 2),
+                (models.EquipmentType.WEIGHTS, "8", 1),
+                (models.EquipmentType.BANDS, "heavy", 1),
+            ],
+        )
+
+    def test_add_many(self):
+        registry = EquipmentRegistry(self.db, self.logger)
+        five = EquipmentRegistry.key("weights", 5, 2)
+        eight = EquipmentRegistry.key("weights", 8, 1)
+        heavy = EquipmentRegistry.key("bands", "heavy", 1)
+        with patch.object(
+            self.db, "execute_sql", wraps=self.db.execute_sql
+        ) as execute_sql:
+            registry.add_many([five, eight, five])
+            # preload + insert
+            self.assertEqual(execute_sql.call_count, 2)
+
+            equipment = registry.get([eight, five, five])
+            self.assertEqual(
+                [(e.magnitude, e.quantity) for e in equipment],
+                [("8", 1), ("5", 2), ("5", 2)],
+            )
+            self.assertEqual(execute_sql.call_count, 2)
+        self.assertEqual(len(models.Equipment.select()), 2)
+
+        # Created elsewhere after this registry was loaded
+        models.Equipment.create(
+            equipmenttype=models.EquipmentType.BANDS, magnitude="heavy", quantity=1
+        )
+        light = EquipmentRegistry.key("bands", "light", 1)
+        equipment = registry.get([heavy, light])
+        self.assertEqual([e.magnitude for e in equipment], ["heavy", "light"])
+        self.assertTrue(all(e.id is not None for e in equipment))
+        self.assertEqual(len(models.Equipment.select()), 4)
+
+    def test_null_quantity(self):
+        key = EquipmentRegistry.key("bands", "medium", None)
+        stale = EquipmentRegistry(self.db, self.logger)
+        self.assertNotIn(key, stale._equipment)
+        equipment = EquipmentRegistry(self.db, self.logger).get([key])
+
+        # The unique index treats the NULL quantities as equal, so the stale
+        # registry's insert is a no-op and it picks up the existing row
+        self.assertEqual(stale.get([key])[0].id, equipment[0].id)
+        nulls = models.Equipment.select().where(models.Equipment.quantity.is_null())
+        self.assertEqual(len(nulls), 1)
+
+    def test_unresolved(self):
+        registry = EquipmentRegistry(self.db, self.logger)
+        with patch.object(registry, "add_many"):
+            with self.assertRaises(Exception):
+                registry.get([EquipmentRegistry.key("weights", 20, 1)])
+
+    def test_shared(self):
+        registry = EquipmentRegistry.shared(self.db, self.logger)
+        self.assertIs(EquipmentRegistry.shared(self.db, self.logger), registry)
+        EquipmentRegistry.clear()
+        self.assertIsNot(EquipmentRegistry.shared(self.db, self.logger), registry)
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+import numpy as np
+
+from src.db.workout.hr_analytics import HRAnalytics, zone_columns, zone_seconds
+from src.utils.test_base import TestBase
+
+
+class TestHRAnalytics(TestBase):
+    def _analytics(self, samples):
+        return HRAnalytics(
+            samples, thresholds=[100, 120, 140], resting_hr=50, max_hr=190
+        )
+
+    def test_time_in_zones(self):
+        hr = self._analytics([90, 0, 100, 110, 130, 150, 160, 0])
+        # Dropouts are ignored, thresholds are the lower bound of their zone
+        self.assertEqual(hr.time_in_zones(), [1, 2, 1, 2])
+        self.assertEqual(hr.min_hr, 90)
+
+    def test_training_load(self):
+        samples = [120] * 600
+        reserve = (120 - 50) / (190 - 50)
+        expected = 600 * reserve * 0.64 * np.exp(1.92 * reserve) / 60
+        self.assertAlmostEqual(
+            self._analytics(samples).training_load(), expected, places=1
+        )
+        # Harder efforts weigh more than their time alone
+        self.assertGreater(
+            self._analytics([180] * 600).training_load(),
+            self._analytics([120] * 600).training_load() * 2,
+        )
+        self.assertIsNone(self._analytics([0, 0]).training_load())
+
+    def test_effort_curve(self):
+        samples = [100] * 600 + [170] * 70 + [100] * 600
+        curve = self._analytics(samples).effort_curve()
+        self.assertEqual(curve["60"], 170)
+        self.assertEqual(curve["300"], round((170 * 70 + 100 * 230) / 300))
+        self.assertEqual(curve["1200"], round((170 * 70 + 100 * 1130) / 1200))
+
+        self.assertEqual(self._analytics([100] * 100).effort_curve(), {"60": 100})
+
+    def test_drift(self):
+        self.assertIsNone(self._analytics([100] * 600).drift())
+        samples = [100] * 900 + [110] * 900
+        self.assertEqual(self._analytics(samples).drift(), 10.0)
+
+    def test_recovery_drop(self):
+        samples = [170] * 30 + list(range(170, 110, -1)) + [110] * 30
+        self.assertEqual(self._analytics(samples).recovery_drop(), 60)
+        self.assertEqual(self._analytics([100] * 120).recovery_drop(), 0)
+        self.assertIsNone(self._analytics([100] * 30).recovery_drop())
+
+    def test_summary(self):
+        summary = self._analytics([100] * 90).summary()
+        self.assertEqual(
+            summary["hranalytics"],
+            {
+                "zones": {"thresholds": [100, 120, 140], "seconds": [0, 90, 0, 0]},
+                "effort": {"60": 100},
+            },
+        )
+        self.assertEqual(summary["recoverydrop"], 0)
+        self.assertIsNone(summary["hrdrift"])
+
+    def test_default_thresholds(self):
+        hr = HRAnalytics([100], max_hr=200)
+        self.assertEqual(hr.thresholds, [100, 120, 140, 160, 180])
+
+    def test_zone_seconds(self):
+        seconds = zone_seconds(
+            [[90, 100, 0, 130], [], None, [150, 150, 119]], [100, 120, 140]
+        )
+        self.assertEqual(
+            seconds.tolist(), [[1, 1, 1, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 1, 0, 2]]
+        )
+        self.assertEqual(zone_seconds([], [100, 120]).shape, (0, 3))
+
+        # Matches binning each workout on its own
+        rng = np.random.default_rng(0)
+        samples = [rng.integers(0, 200, rng.integers(0, 500)) for _ in range(50)]
+        thresholds = [95, 114, 133, 152, 171]
+        self.assertEqual(
+            zone_seconds(samples, thresholds).tolist(),
+            [HRAnalytics(s, thresholds=thresholds).time_in_zones() for s in samples],
+        )
+
+    def test_zone_columns(self):
+        thresholds = [95, 114, 133, 152, 171]
+        rows = zone_columns([[10, 20, 30, 20, 10, 10], [0] * 6], thresholds, max_hr=190)
+        self.assertIsNone(rows[1])
+        columns = rows[0]
+        self.assertEqual(columns["zone_below_50_lower"], 0)
+        self.assertEqual(columns["zone_below_50_upper"], 95)
+        self.assertEqual(columns["zone_below_50_percentspentabove"], 100)
+        self.assertEqual(columns["zone_60_70_lower"], 114)
+        self.assertEqual(columns["zone_60_70_upper"], 133)
+        self.assertEqual(columns["zone_60_70_duration"], timedelta(seconds=30))
+        self.assertEqual(columns["zone_60_70_percentspentabove"], 70)
+        self.assertEqual(columns["zone_90_100_upper"], 190)
+        self.assertEqual(columns["zone_90_100_percentspentabove"], 10)
+
+    def test_zone_columns_thresholds(self):
+        # Configured thresholds that aren't Polar's five zones aren't used
+        hr = HRAnalytics([100] * 10, thresholds=[100, 150], max_hr=200)
+        columns = hr.zone_columns()
+        self.assertEqual(columns["zone_50_60_lower"], 100)
+        self.assertEqual(columns["zone_60_70_lower"], 120)
+        self.assertEqual(columns["zone_50_60_duration"], timedelta(seconds=10))
+        self.assertIsNone(HRAnalytics([0, 0]).zone_columns())
@@ -0,0 +1,57 @@
+import unittest
+from datetime import datetime
+
+import src.db.workout.models as models
+from src.utils.test_base import TestBase
+
+
+class TestMaterializedViews(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.db = cls.create_test_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.teardown_test_db()
+
+    def _materialized_workout(self, workout_id):
+        return models.WorkoutsMaterialized.get_or_none(
+            models.WorkoutsMaterialized.id == workout_id
+        )
+
+    def test_incremental_refresh(self):
+        with self.db.atomic():
+            workout = models.Workouts.create(
+                sport="sport3",
+                starttime=datetime(2022, 10, 14, 10, 0),
+                samples=[100, 110, 120],
+            )
+            workout.sources.add([models.Sources.get(models.Sources.id == 1)])
+            # Changed, but not passed in below so shouldn't be picked up
+            models.Workouts.update(sport="changed").where(
+                models.Workouts.id == 4
+            ).execute()
+
+        models.refresh_materialized_views(workout_ids=[workout.id])
+
+        self.assertEqual(self._materialized_workout(workout.id).sport, "sport3")
+        self.assertEqual(
+            self._materialized_workout(workout.id).samples, [100, 110, 120]
+        )
+        self.assertEqual(self._materialized_workout(4).sport, "sport1")
+
+        source = models.SourcesMaterialized.get(models.SourcesMaterialized.id == 1)
+        self.assertIn(workout.id, [w["id"] for w in source.workouts])
+
+        # Full refresh picks up everything, including deletions
+        with self.db.atomic():
+            workout.sources.clear()
+            workout.delete_instance()
+        models.refresh_materialized_views()
+
+        self.assertIsNone(self._materialized_workout(workout.id))
+        self.assertEqual(self._materialized_workout(4).sport, "changed")
+        source = models.SourcesMaterialized.get(models.SourcesMaterialized.id == 1)
+        self.assertNotIn(workout.id, [w["id"] for w in source.workouts])
@@ -0,0 +1,88 @@
+import threading
+from unittest.mock import MagicMock
+
+from src.db.workout.refresh_scheduler import RefreshScheduler
+from src.utils.test_base import TestBase
+
+
+class TestRefreshScheduler(TestBase):
+    def test_coalesce(self):
+        refresh = MagicMock()
+        scheduler = RefreshScheduler(self.logger, delay=0.1, refresh=refresh)
+        scheduler.request(workout_ids=[3, 1])
+        scheduler.request(workout_ids=[2, 3])
+        scheduler.request(source_ids=[5])
+        self.assertTrue(scheduler.wait(timeout=5))
+
+        refresh.assert_called_once_with(workout_ids=[1, 2, 3], source_ids=[5])
+        self.assertEqual(len(scheduler.runs), 1)
+        self.assertEqual(scheduler.runs[0].requests, 3)
+        self.assertIsNone(scheduler.runs[0].error)
+        self.assertGreaterEqual(scheduler.runs[0].duration, 0)
+
+    def test_full_refresh(self):
+        refresh = MagicMock()
+        scheduler = RefreshScheduler(self.logger, delay=0.1, refresh=refresh)
+        scheduler.request(workout_ids=[1])
+        scheduler.request()
+        self.assertTrue(scheduler.wait(timeout=5))
+        refresh.assert_called_once_with()
+
+        # Only ids from requests after that run are passed on to the next one
+        scheduler.request(workout_ids=[4])
+        self.assertTrue(scheduler.wait(timeout=5))
+        refresh.assert_called_with(workout_ids=[4], source_ids=[])
+        self.assertEqual(refresh.call_count, 2)
+
+    def test_request_during_refresh(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def refresh(**kwargs):
+            calls.append(kwargs)
+            started.set()
+            release.wait(5)
+
+        scheduler = RefreshScheduler(self.logger, delay=0, refresh=refresh)
+        scheduler.request(workout_ids=[1])
+        self.assertTrue(started.wait(5))
+        # Both land while the first run is in progress
+        scheduler.request(workout_ids=[2])
+        scheduler.request(workout_ids=[3])
+        self.assertFalse(scheduler.wait(timeout=0.1))
+        release.set()
+        self.assertTrue(scheduler.wait(timeout=5))
+
+        self.assertEqual(
+            calls,
+            [
+                {"workout_ids": [1], "source_ids": []},
+                {"workout_ids": [2, 3], "source_ids": []},
+            ],
+        )
+
+    def test_failed_refresh(self):
+        refresh = MagicMock(side_effect=[Exception("Lost connection"), None])
+        scheduler = RefreshScheduler(
+            self.logger, delay=0, refresh=refresh, retry_delay=0.2
+        )
+        scheduler.request(workout_ids=[1])
+        self.assertFalse(scheduler.wait(timeout=5))
+        self.assertEqual(scheduler.runs[0].error, "Lost connection")
+
+        # The ids aren't dropped, they go out with the next run
+        scheduler.request(workout_ids=[2])
+        self.assertTrue(scheduler.wait(timeout=5))
+        self.assertIsNone(scheduler.runs[1].error)
+        refresh.assert_called_with(workout_ids=[1, 2], source_ids=[])
+        self.assertEqual(refresh.call_count, 2)
+
+    def test_runs_bounded(self):
+        scheduler = RefreshScheduler(
+            self.logger, delay=0, refresh=MagicMock(), max_runs=2
+        )
+        for i in range(3):
+            scheduler.request(workout_ids=[i])
+            self.assertTrue(scheduler.wait(timeout=5))
+        self.assertEqual([r.workout_ids for r in scheduler.runs], [[1], [2]])
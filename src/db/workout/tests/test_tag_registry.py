@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+import src.db.workout.models as models
+from src.db.workout.tag_registry import TagRegistry
+from src.utils.test_base import TestBase
+
+
+class TestTagRegistry(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.db = cls.create_test_db(insert_data=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.teardown_test_db()
+
+    def test_add_many(self):
+        registry = TagRegistry(self.db, self.logger)
+        with patch.object(
+            self.db, "execute_sql", wraps=self.db.execute_sql
+        ) as execute_sql:
+            registry.add_many(
+                {
+                    models.TagType.CREATOR: ["creator"],
+                    models.TagType.TAG: ["tag1", "tag2", "creator"],
+                    models.TagType.EXERCISE: ["ex1"],
+                }
+            )
+            # preload + insert
+            self.assertEqual(execute_sql.call_count, 2)
+
+            tags = registry.get(["tag2", "tag1", "tag2"], models.TagType.TAG)
+            self.assertEqual([t.name for t in tags], ["tag2", "tag1"])
+            registry.get(["ex1"], models.TagType.EXERCISE)
+            self.assertEqual(execute_sql.call_count, 2)
+
+        self.assertEqual(
+            models.Tags.get(models.Tags.name == "creator").tagtype,
+            models.TagType.CREATOR,
+        )
+        self.assertEqual(len(models.Tags.select()), 4)
+
+        # Created elsewhere after this registry was loaded
+        models.Tags.create(name="tag3", tagtype=models.TagType.TAG)
+        tags = registry.get(["tag3", "tag4"], models.TagType.TAG)
+        self.assertEqual({t.name for t in tags}, {"tag3", "tag4"})
+        self.assertTrue(all(t.id is not None for t in tags))
+        self.assertEqual(len(models.Tags.select()), 6)
+
+        # A new registry starts from what's in the db
+        registry = TagRegistry(self.db, self.logger)
+        self.assertEqual(
+            {t.name for t in registry.get(["tag1", "ex1"], models.TagType.SPORT)},
+            {"tag1", "ex1"},
+        )
+        self.assertEqual(len(models.Tags.select()), 6)
@@ -8,7 +8,9 @@ from unittest.mock import MagicMock, Mock, PropertyMock, patch
 from peewee import fn
 
 import src.db.workout.models as models
-from src.db.workout.workout import Workout
+from src.db.workout.hr_analytics import ZONE_NAMES
+from src.db.workout.source import Source
+from src.db.workout.workout import ExistingWorkout, Workout, WorkoutBatch
 from src.db.workout.workout_data_store import WorkoutDataStore
 from src.utils.test_base import TestBase
 
@@ -63,6 +65,127 @@ class TestWorkout(TestBase):
 
         self.teardown_test_db()
 
+    def test_batch_insert(self):
+        self.db = self.create_test_db(insert_data=False)
+
+        def _create(start_time, sources):
+            d = deepcopy(self.raw_data)
+            d["start_time"] = start_time
+            d["sources"] = sources
+            return WorkoutDataStore(d)
+
+        data = [
+            _create("2022-11-24T04:32:39+00:00", ["www.test.com"]),
+            _create("2022-11-25T04:32:39+00:00", ["www.test.com", "www.test2.com"]),
+            # Duplicate within the batch
+            _create("2022-11-25T04:32:39+00:00", ["www.test.com"]),
+        ]
+        inserted = WorkoutBatch(self.db, data, self.logger).insert_row()
+        self.assertEqual(len(inserted), 2)
+
+        workouts = models.Workouts.select().order_by(models.Workouts.starttime)
+        self.assertEqual(len(workouts), 2)
+        self.assertEqual({w.id for w in workouts}, {w.id for w in inserted})
+        self.assertEqual(workouts[0].samples, self.data.samples)
+        self.assertEqual(len(models.Sources.select()), 2)
+        self.assertEqual(len(models.Equipment.select()), 2)
+        self.assertEqual(
+            {s.url for s in workouts[1].sources}, {"www.test.com", "www.test2.com"}
+        )
+        for w in workouts:
+            self.assertEqual(
+                {"hiit", "5lbs", "8lbs", "weights"}, {t.name for t in w.tags}
+            )
+            self.assertEqual(len(w.equipment), 2)
+
+        # Everything already exists, so nothing new should be written
+        data.append(_create("2022-11-26T04:32:39+00:00", []))
+        inserted = WorkoutBatch(self.db, data, self.logger).insert_row()
+        self.assertEqual(len(inserted), 1)
+        self.assertEqual(len(models.Workouts.select()), 3)
+        self.assertEqual(len(models.Equipment.select()), 2)
+
+        self.teardown_test_db()
+
+    def test_batch_insert_failure(self):
+        self.db = self.create_test_db(insert_data=False)
+        data = []
+        for day in [24, 25, 26]:
+            d = deepcopy(self.raw_data)
+            d["start_time"] = f"2022-11-{day}T04:32:39+00:00"
+            d["sources"] = ["www.test.com"]
+            data.append(WorkoutDataStore(d))
+        bad = data[1].samples
+
+        batch = WorkoutBatch(self.db, data, self.logger)
+        downsampled_rows = batch._downsampled_rows
+
+        def fail_one(workout_id, samples):
+            if samples is bad:
+                raise Exception("Bad samples")
+            return downsampled_rows(workout_id, samples)
+
+        load_sources = Source.load_sources
+
+        def outside_transaction(*args, **kwargs):
+            # Sources can go over the network, so no transaction is held open
+            self.assertFalse(self.db.in_transaction())
+            return load_sources(*args, **kwargs)
+
+        with patch.object(batch, "_downsampled_rows", side_effect=fail_one), patch(
+            "src.db.workout.workout.Source.load_sources",
+            side_effect=outside_transaction,
+        ):
+            inserted = batch.insert_row()
+
+        # Only the workout that failed is lost
+        self.assertEqual([w.starttime.day for w in inserted], [24, 26])
+        workouts = models.Workouts.select().order_by(models.Workouts.starttime)
+        self.assertEqual([w.starttime.day for w in workouts], [24, 26])
+        self.assertEqual(len(models.Sources.select()), 1)
+        for w in workouts:
+            self.assertEqual({s.url for s in w.sources}, {"www.test.com"})
+            self.assertEqual(len(w.tags), 4)
+
+        self.teardown_test_db()
+
+    def test_insert_row_sources(self):
+        self.db = self.create_test_db(insert_data=False)
+        urls = [f"www.test{i}.com" for i in range(5)]
+        models.Sources.insert_many(
+            [{"url": u, "sourcetype": models.SourceType.UNKNOWN} for u in urls[:3]]
+        ).execute()
+        self.data._i_data["sources"] = urls
+
+        def source_lookups(execute_sql):
+            return [
+                c
+                for c in execute_sql.call_args_list
+                if c.args[0].startswith("SELECT") and 'FROM "sources"' in c.args[0]
+            ]
+
+        with patch.object(
+            self.db, "execute_sql", wraps=self.db.execute_sql
+        ) as execute_sql:
+            Workout(self.db, self.data, self.logger).insert_row()
+            # Every url is resolved by the one query, however many there are
+            self.assertEqual(len(source_lookups(execute_sql)), 1)
+
+        wrk = models.Workouts.get()
+        self.assertEqual({s.url for s in wrk.sources}, set(urls))
+        self.assertEqual(len(models.Sources.select()), 5)
+
+        existing = ExistingWorkout(self.db, wrk.starttime, self.logger)
+        with patch.object(
+            self.db, "execute_sql", wraps=self.db.execute_sql
+        ) as execute_sql:
+            added = existing.add_sources(urls + ["www.test5.com"])
+            self.assertEqual(len(source_lookups(execute_sql)), 1)
+        self.assertEqual({s.url for s in added}, {"www.test5.com"})
+        self.assertEqual(len(wrk.sources), 6)
+
+        self.teardown_test_db()
+
     @patch("src.db.workout.workout.DBInterface.find", return_value=None)
     def test_exit_early(self, find):
         self.mock_through_workout()
@@ -94,6 +217,27 @@ class TestWorkout(TestBase):
         self.assertEqual(w.insert_row(), "something")
         pop.assert_not_called()
 
+    def test_zones_from_samples(self):
+        self.mock_through_workout()
+        polar_model = self.workout._populate_model()
+
+        d = deepcopy(self.raw_data)
+        del d["heart_rate_zones"]
+        wrk = Workout(self.db, WorkoutDataStore(d), self.logger)
+        model = wrk._populate_model()
+
+        self.assertIsNotNone(model.zone_50_60_lower)
+        self.assertEqual(model.zone_below_50_percentspentabove, 100)
+        durations = sum(
+            (getattr(model, f"zone_{z}_duration") for z in ZONE_NAMES), timedelta()
+        )
+        self.assertEqual(durations.total_seconds(), len([i for i in d["samples"] if i]))
+        # The derived zones are used the same way as Polar's in queries
+        for z in ZONE_NAMES[1:]:
+            above = getattr(model, f"zone_{z}_percentspentabove")
+            self.assertTrue(0 <= above <= 100)
+        self.assertIsNotNone(polar_model.zone_50_60_lower)
+
     def _mock_equipment(self):
         equipment_mocks = []
         for i in self.data.equipment["weights"]:
@@ -8,18 +8,57 @@ import structlog
 from typing import override
 
 import src.db.workout.models as models
+from src.db.workout import downsample
 from src.db.workout.db_interface import DBInterface
+from src.db.workout.equipment_registry import EquipmentRegistry
+from src.db.workout.hr_analytics import ZONE_NAMES, HRAnalytics
 from src.db.workout.source import Source
 
 
 class WorkoutBase(DBInterface):
-    def _create_source(self, url):
-        try:
-            src = Source.load_source(self.db, url, self.logger)
-            return src.insert_row()
-        except Exception as e:
-            self.logger.warn("Failed to insert source", url=Source.normalise_url(url))
-            raise e
+    @cached_property
+    def equipment_registry(self):
+        return EquipmentRegistry.shared(self.db, self.logger)
+
+    def _reset_equipment(self):
+        # Equipment inserted as part of a failed transaction was rolled back
+        # with it, so the shared registry can't be trusted any more
+        EquipmentRegistry.clear()
+
+    def _create_sources(self, urls):
+        """Returns the Sources row for each url, inserting the ones not yet seen.
+
+        The known urls are found with a single query, and the tags of the
+        new ones registered in one go, so only the new sources' own inserts
+        scale with the number of urls.
+        """
+        loaded = Source.load_sources(
+            self.db, urls, self.logger, tag_registry=self.tag_registry
+        )
+        names = defaultdict(list)
+        for src in loaded.values():
+            for tag_type, type_names in src.tag_names().items():
+                names[tag_type].extend(type_names)
+        self.tag_registry.add_many(names)
+
+        sources = {}
+        for url, src in loaded.items():
+            try:
+                sources[url] = src.insert_row()
+            except Exception as e:
+                self.logger.warn("Failed to insert source", url=url)
+                raise e
+        return sources
+
+    def _downsampled_rows(self, workout_id, samples):
+        return [
+            {"workout": workout_id, "method": method, "points": points, "data": data}
+            for method, points, data in downsample.tiers(samples)
+        ]
+
+    def _insert_downsampled(self, rows):
+        if len(rows) > 0:
+            models.DownsampledSamples.insert_many(rows).execute()
 
     @override
     def insert_row(self):
@@ -39,9 +78,7 @@ class ExistingWorkout(WorkoutBase):
     def add_sources(self, urls):
         if self.model is None:
             raise Exception("Model must be created before adding sources")
-        new_sources = set()
-        for url in urls:
-            new_sources.add(self._create_source(url))
+        new_sources = set(self._create_sources(urls).values())
 
         model_sources = set(self.model.sources)
         new_sources -= model_sources
@@ -74,6 +111,7 @@ class Workout(WorkoutBase):
             setattr(workout_model, f"{k}hr", v)
 
         self._add_hr_zones(workout_model)
+        self._add_hr_analytics(workout_model)
 
         return workout_model
 
@@ -81,29 +119,15 @@ class Workout(WorkoutBase):
     def data(self):
         return self._data
 
+    @cached_property
+    def hr_analytics(self):
+        return HRAnalytics(self._data.samples)
+
     @cached_property
     def equipment(self):
-        equipment = []
         if len(self._data.equipment) == 0:
-            return equipment
-
-        with self.db.atomic():
-            for k, v in self._data.equipment.items():
-                for vals in v:
-                    equip, created = models.Equipment.get_or_create(
-                        equipmenttype=k,
-                        magnitude=vals["magnitude"],
-                        quantity=vals["quantity"],
-                    )
-                    if created:
-                        self.logger.info(
-                            "New equipment type inserted",
-                            equipment=equip.as_dict(),
-                            action="new",
-                        )
-                    equipment.append(equip)
-
-        return equipment
+            return []
+        return self.equipment_registry.get(EquipmentRegistry.keys(self._data.equipment))
 
     @override
     def insert_row(self):
@@ -137,9 +161,7 @@ class Workout(WorkoutBase):
                     set(self._insert_tags(tags, models.TagType.EQUIPMENT))
                 )
 
-            self.sources = set()
-            for url in self._data.sources:
-                self.sources.add(self._create_source(url))
+            self.sources = set(self._create_sources(self._data.sources).values())
 
             self.logger.info("Inserted sources")
 
@@ -150,11 +172,15 @@ class Workout(WorkoutBase):
                 self.model.equipment.add(equipment)
                 self.model.tags.add(list(tag_models))
                 self.model.save()
+                self._insert_downsampled(
+                    self._downsampled_rows(self.model.id, self._data.samples)
+                )
 
         except Exception as e:
             self.logger.exception(
                 "Failed to insert workout", start_time=self._data.start_time,
             )
+            self._reset_equipment()
             raise e
 
     @cache
@@ -177,14 +203,22 @@ class Workout(WorkoutBase):
 
         return tags
 
+    def _add_hr_analytics(self, model):
+        for k, v in self.hr_analytics.summary().items():
+            setattr(model, k, v)
+
     def _add_hr_zones(self, model):
         zone_data = self._data.hr_zones
-        if len(zone_data) != 5:
-            self.logger.warn("Invalid zone data found", zones=zone_data)
+        if zone_data is None or len(zone_data) != 5:
+            self.logger.warn(
+                "Invalid zone data found, computing from samples", zones=zone_data
+            )
+            columns = self.hr_analytics.zone_columns()
+            if columns is not None:
+                for k, v in columns.items():
+                    setattr(model, k, v)
             return
 
-        zone_names = ["below_50", "50_60", "60_70", "70_80", "80_90", "90_100"]
-
         full_duration = self._data.duration
 
         zones = []
@@ -196,7 +230,7 @@ class Workout(WorkoutBase):
             dur = isodate.parse_duration(val["in_zone"])
             summed_duration += dur
             spent_above = summed_duration / full_duration * 100
-            prefix = f"zone_{zone_names[val['index']]}_"
+            prefix = f"zone_{ZONE_NAMES[val['index']]}_"
             setattr(model, prefix + "lower", val["lower_limit"])
             setattr(model, prefix + "upper", val["upper_limit"])
             setattr(model, prefix + "duration", dur)
@@ -209,3 +243,189 @@ class Workout(WorkoutBase):
         setattr(model, prefix + "upper", model.zone_50_60_lower)
         setattr(model, prefix + "duration", dur)
         setattr(model, prefix + "percentspentabove", 100)
+
+
+class WorkoutBatch(WorkoutBase):
+    """Inserts a run of workouts in one transaction.
+
+    Existing workouts, equipment, tags and sources are looked up with a few
+    set based queries up front, and the workouts and their through table rows
+    are written with insert_many rather than row by row. If that fails the
+    workouts are retried one savepoint each, so only the bad ones are skipped.
+    """
+
+    def __init__(self, db, data, logger):
+        super().__init__(db, logger)
+        self._data = data
+        self.models = []
+
+    def _valid_workouts(self):
+        workouts = {}
+        for data in self._data:
+            if (
+                data.start_time is None
+                or data.samples is None
+                or len(data.samples) == 0
+            ):
+                self.logger.warn(
+                    "Invalid workout, skipping", workout=data.log_abridged()
+                )
+                continue
+            # Keep the first of any duplicates within the batch
+            workouts.setdefault(data.start_time, Workout(self.db, data, self.logger))
+        return workouts
+
+    def _existing_start_times(self, start_times):
+        return {
+            i[0]
+            for i in models.Workouts.select(models.Workouts.starttime)
+            .where(models.Workouts.starttime << start_times)
+            .tuples()
+        }
+
+    def _load_equipment(self, workouts):
+        # Every new combination in the batch is inserted together, after
+        # which each workout's lookup is served from memory
+        self.equipment_registry.add_many(
+            [k for w in workouts for k in EquipmentRegistry.keys(w.data.equipment)]
+        )
+        for w in workouts:
+            w.equipment = self.equipment_registry.get(
+                EquipmentRegistry.keys(w.data.equipment)
+            )
+
+    def _load_sources(self, workouts):
+        """The Source for every url in the batch, with all their data fetched.
+
+        This is the part of an insert that goes over the network, so it's done
+        before the transaction is opened rather than holding it open.
+        """
+        urls = set()
+        for w in workouts:
+            urls.update(w.data.sources)
+        loaded = Source.load_sources(
+            self.db, urls, self.logger, tag_registry=self.tag_registry
+        )
+        for src in loaded.values():
+            # Pulls in anything a source fetches lazily
+            src.tag_names()
+        return loaded
+
+    def _load_tags(self, workouts, sources):
+        """Registers every tag in the batch at once, returning the workouts' own.
+
+        After this the per workout and source lookups are served from memory.
+        """
+        names = defaultdict(list)
+        for w in workouts:
+            names[models.TagType.SPORT].append(w.data.sport)
+            names[models.TagType.EQUIPMENT].extend(w._equipment_to_tags())
+        for src in sources:
+            for tag_type, type_names in src.tag_names().items():
+                names[tag_type].extend(type_names)
+        self.tag_registry.add_many(names)
+
+        return {
+            t.name: t
+            for tag_type in [models.TagType.SPORT, models.TagType.EQUIPMENT]
+            for t in self._insert_tags(names[tag_type], tag_type)
+        }
+
+    def _insert_through(self, field, rows):
+        if len(rows) > 0:
+            field.get_through_model().insert_many(rows).execute()
+
+    def _model_rows(self, to_insert):
+        # insert_many needs every row to have the same columns, but zone data
+        # is only set when polar sent it
+        fields = [f.name for f in models.Workouts._meta.sorted_fields if f.name != "id"]
+        return [{f: getattr(m, f) for f in fields} for m in to_insert]
+
+    def _insert_workouts(self, workouts, sources, tags):
+        to_insert = [w._populate_model() for w in workouts]
+        ids = {
+            start_time: workout_id
+            for workout_id, start_time in models.Workouts.insert_many(
+                self._model_rows(to_insert)
+            )
+            .returning(models.Workouts.id, models.Workouts.starttime)
+            .tuples()
+            .execute()
+        }
+
+        workout_sources, workout_equipment, workout_tags = [], [], []
+        downsampled = []
+        for w, m in zip(workouts, to_insert):
+            m.id = ids[m.starttime]
+            downsampled.extend(self._downsampled_rows(m.id, w.data.samples))
+            workout_sources.extend(
+                {"workouts": m.id, "sources": i}
+                for i in {sources[Source.normalise_url(u)].id for u in w.data.sources}
+            )
+            workout_equipment.extend(
+                {"workouts": m.id, "equipment": i} for i in {e.id for e in w.equipment}
+            )
+            workout_tags.extend(
+                {"workouts": m.id, "tags": tags[t].id}
+                for t in {w.data.sport} | w._equipment_to_tags()
+            )
+
+        self._insert_through(models.Workouts.sources, workout_sources)
+        self._insert_through(models.Workouts.equipment, workout_equipment)
+        self._insert_through(models.Workouts.tags, workout_tags)
+        self._insert_downsampled(downsampled)
+        return to_insert
+
+    def _insert_each(self, workouts, sources, tags):
+        # One savepoint per workout, so a bad one only loses itself
+        inserted = []
+        for w in workouts:
+            try:
+                with self.db.atomic():
+                    inserted.extend(self._insert_workouts([w], sources, tags))
+            except Exception:
+                self.logger.exception(
+                    "Failed to insert workout, skipping", workout=w.data.log_abridged()
+                )
+        return inserted
+
+    @override
+    def insert_row(self):
+        workouts = self._valid_workouts()
+        if len(workouts) == 0:
+            return []
+
+        for start_time in self._existing_start_times(list(workouts.keys())):
+            self.logger.debug("Workout already in db; skipping", start_time=start_time)
+            del workouts[start_time]
+        if len(workouts) == 0:
+            return []
+        workouts = list(workouts.values())
+
+        try:
+            loaded = self._load_sources(workouts)
+            with self.db.atomic():
+                self._load_equipment(workouts)
+                tags = self._load_tags(workouts, loaded.values())
+
+                sources = {url: src.insert_row() for url, src in loaded.items()}
+                self.logger.info("Inserted sources", sources=len(sources))
+
+                try:
+                    # The whole batch in a savepoint first, which is the
+                    # common case
+                    with self.db.atomic():
+                        to_insert = self._insert_workouts(workouts, sources, tags)
+                except Exception:
+                    self.logger.exception(
+                        "Failed to insert workout batch, retrying one at a time"
+                    )
+                    to_insert = self._insert_each(workouts, sources, tags)
+        except Exception as e:
+            self.logger.exception("Failed to insert workout batch")
+            self._reset_equipment()
+            raise e
+
+        self.logger.info("Inserted workouts", workouts=len(to_insert))
+        self.models = to_insert
+        return self.models
@@ -0,0 +1,108 @@
+import codecs
+import gzip
+import itertools
+import json
+import os
+
+
+def iter_json_array(chunks):
+    """Yields the elements of a JSON array as its text arrives in chunks.
+
+    Chunks can be bytes (utf-8) or str. Only the element currently being
+    parsed is buffered.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    started = False
+    # Chunks are held back until an unfinished element has at least doubled
+    # in size, so a large one isn't decoded from the start for every chunk
+    pending = []
+    pending_size = 0
+    retry_size = 0
+    for chunk in itertools.chain(chunks, [None]):
+        if chunk is not None:
+            if isinstance(chunk, bytes):
+                chunk = utf8.decode(chunk)
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if len(buf) - pos + pending_size < retry_size:
+                continue
+        buf = buf[pos:] + "".join(pending)
+        pos = 0
+        pending = []
+        pending_size = 0
+        retry_size = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # The element carries on in the next chunk
+                retry_size = 2 * (len(buf) - pos)
+                break
+            if end == len(buf) and not isinstance(value, (dict, list, str)):
+                # A number or literal might not be complete yet
+                retry_size = 2 * (len(buf) - pos)
+                break
+            yield value
+            pos = end
+    raise ValueError("Truncated JSON array")
+
+
+class ExerciseCache:
+    """Exercises stored as gzipped newline delimited JSON.
+
+    Each appending write adds a new gzip member to the end of the file, which
+    gzip readers treat as one continuous stream, so earlier exercises are
+    never rewritten. Reading yields one exercise at a time.
+    """
+
+    def __init__(self, path="cache.ndjson.gz"):
+        self.path = path
+
+    def write(self, exercises, append=True):
+        """Writes exercises to the cache as they're iterated, passing each one on.
+
+        Without append the exercises go to a temporary file that only replaces
+        the cache once they've all been written, so a failed fetch leaves the
+        old cache in place.
+        """
+        if append:
+            yield from self._write(self.path, "at", exercises)
+            return
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            yield from self._write(tmp_path, "wt", exercises)
+        except BaseException:
+            # Includes the generator being closed before it's finished
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, self.path)
+
+    def _write(self, path, mode, exercises):
+        with gzip.open(path, mode, encoding="utf-8") as f:
+            for exercise in exercises:
+                f.write(json.dumps(exercise, separators=(",", ":")))
+                f.write("\n")
+                yield exercise
+
+    def __iter__(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if len(line.strip()) > 0:
+                    yield json.loads(line)
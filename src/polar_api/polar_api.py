@@ -1,24 +1,141 @@
-import json
 from functools import cache, cached_property
 
 import structlog
 from requests_oauthlib import OAuth2Session
 
+from src.polar_api.exercise_stream import ExerciseCache, iter_json_array
 from src.polar_api.polar_data_store import PolarDataStore
 from src.utils import gcp_utils
 
 
+class ExerciseTransaction:
+    """An open AccessLink exercise transaction.
+
+    Polar hands out the exercises uploaded since the last committed
+    transaction. Once they've been saved the transaction has to be committed,
+    otherwise the same exercises come back in the next one. So any fetch that
+    fails is recorded in failed_urls, and a transaction with failures is never
+    committed, leaving the exercises to be retried next time.
+    """
+
+    HEART_RATE_SAMPLE_TYPE = "0"
+
+    def __init__(self, api, transaction_id, url):
+        self.api = api
+        self.transaction_id = transaction_id
+        self.url = url
+        self.logger = api.logger.bind(transaction_id=transaction_id)
+        self.failed_urls = []
+
+    def _get_json(self, url):
+        data = self.api._get_json(url)
+        if data is None:
+            self.failed_urls.append(url)
+        return data
+
+    @cached_property
+    def exercise_urls(self):
+        data = self._get_json(self.url)
+        if data is None:
+            return []
+        return data.get("exercises", [])
+
+    def exercises(self, is_new=lambda start_time: True):
+        """Fetches the exercises in this transaction that is_new accepts.
+
+        Only the summary is fetched for the rest, zones and samples are
+        requested just for the exercises that are going to be saved.
+        """
+        exercises = []
+        skipped = 0
+        for url in self.exercise_urls:
+            data = self._get_json(url)
+            if data is None:
+                continue
+            exercise = PolarDataStore(data, self.logger)
+            if not is_new(exercise.start_time):
+                skipped += 1
+                continue
+            details = self._details(url)
+            if details is None:
+                # Saving it without its samples would lose them for good
+                continue
+            data.update(details)
+            exercises.append(exercise)
+
+        self.logger.info(
+            "Fetched transaction exercises",
+            exercises=len(self.exercise_urls),
+            new=len(exercises),
+            skipped=skipped,
+            failed=len(self.failed_urls),
+        )
+        return sorted(exercises, key=lambda x: x.start_time)
+
+    def _details(self, url):
+        """Zones and heart rate samples, or None if any of them failed"""
+        failed = len(self.failed_urls)
+        details = {"heart_rate_zones": [], "samples": []}
+
+        zones = self._get_json(f"{url}/heart-rate-zones")
+        if zones is not None:
+            details["heart_rate_zones"] = zones.get("zone", [])
+
+        sample_urls = self._get_json(f"{url}/samples")
+        if sample_urls is not None:
+            for sample_url in sample_urls.get("samples", []):
+                # Only heart rate is stored, the other sample types aren't fetched
+                if sample_url.rstrip("/").split("/")[-1] != self.HEART_RATE_SAMPLE_TYPE:
+                    continue
+                samples = self._get_json(sample_url)
+                if samples is not None:
+                    details["samples"].append(samples)
+
+        if len(self.failed_urls) > failed:
+            return None
+        return details
+
+    @property
+    def has_failures(self):
+        return len(self.failed_urls) > 0
+
+    def commit(self):
+        if self.has_failures:
+            self.logger.warn(
+                "Not committing transaction with failed fetches",
+                failed_urls=self.failed_urls,
+            )
+            return False
+        response = self.api.session.put(self.url)
+        if response.status_code not in (200, 204):
+            self.logger.error(
+                "Error committing transaction", status_code=response.status_code
+            )
+            return False
+        self.logger.info("Committed transaction")
+        return True
+
+
 class PolarAPI:
-    POLAR_EXERCISE_URL = (
-        "https://www.polaraccesslink.com/v3/exercises?samples=true&zones=true"
-    )
+    ACCESSLINK_URL = "https://www.polaraccesslink.com/v3"
+    # Bytes read from the exercise listing at a time
+    CHUNK_SIZE = 64 * 1024
 
-    def __init__(self, logger=None, use_cache=False, write_cache=False):
+    def __init__(
+        self,
+        logger=None,
+        use_cache=False,
+        write_cache=False,
+        url=None,
+        cache_path="cache.ndjson.gz",
+    ):
         self.use_cache = use_cache
         self.write_cache = write_cache
+        self.cache_path = cache_path
         if logger is None:
             logger = structlog.get_logger()
         self.logger = logger
+        self.url = url if url is not None else self.ACCESSLINK_URL
         self.logger.debug(f"Using cache: {self.use_cache}")
 
     @cache
@@ -32,24 +149,77 @@ class PolarAPI:
             token={"access_token": self._get_secret("polar_token")},
         )
 
-    @property
-    def exercises(self):
-        if not self.use_cache:
-            workouts = self.session.get(self.POLAR_EXERCISE_URL)
-            if workouts.status_code != 200:
+    @cached_property
+    def user_id(self):
+        return self._get_secret("polar_user_id")
+
+    @staticmethod
+    def _normalise_keys(data):
+        # The transaction endpoints use "start-time" where /exercises uses
+        # "start_time", PolarDataStore expects the latter
+        if isinstance(data, dict):
+            return {
+                k.replace("-", "_"): PolarAPI._normalise_keys(v)
+                for k, v in data.items()
+            }
+        if isinstance(data, list):
+            return [PolarAPI._normalise_keys(i) for i in data]
+        return data
+
+    def _get_json(self, url):
+        response = self.session.get(url, headers={"Accept": "application/json"})
+        if response.status_code != 200:
+            self.logger.error(
+                "Error retrieving from Polar", url=url, status_code=response.status_code
+            )
+            return None
+        return self._normalise_keys(response.json())
+
+    def exercise_transaction(self):
+        """Opens a transaction, or returns None when there's nothing new"""
+        response = self.session.post(
+            f"{self.url}/users/{self.user_id}/exercise-transactions",
+            headers={"Accept": "application/json"},
+        )
+        if response.status_code == 204:
+            self.logger.info("No new exercises")
+            return None
+        if response.status_code not in (200, 201):
+            self.logger.error(
+                "Error creating transaction", status_code=response.status_code
+            )
+            return None
+
+        data = self._normalise_keys(response.json())
+        return ExerciseTransaction(self, data["transaction_id"], data["resource_uri"])
+
+    def _fetch_exercises(self):
+        url = f"{self.url}/exercises?samples=true&zones=true"
+        with self.session.get(url, stream=True) as response:
+            if response.status_code != 200:
                 self.logger.error(
                     "Error retrieving workouts",
-                    extra={"request": workouts, "status_code": workouts.status_code},
+                    extra={"request": response, "status_code": response.status_code},
                 )
-                return []
-            data = workouts.json()
+                return
+            yield from iter_json_array(
+                response.iter_content(chunk_size=self.CHUNK_SIZE)
+            )
 
-            if self.write_cache:
-                with open("cache", "w") as f:
-                    f.write(json.dumps(data, indent=4))
+    def iter_exercises(self):
+        """Yields a PolarDataStore per exercise as the response is parsed"""
+        cache = ExerciseCache(self.cache_path)
+        if self.use_cache:
+            data = iter(cache)
         else:
-            with open("cache") as f:
-                data = json.loads(f.read())
+            data = self._fetch_exercises()
+            if self.write_cache:
+                # Every exercise is listed, so this replaces the old cache
+                data = cache.write(data, append=False)
+
+        for i in data:
+            yield PolarDataStore(i, self.logger)
 
-        exer = [PolarDataStore(i, self.logger) for i in data]
-        return sorted(exer, key=lambda x: x.start_time)
+    @property
+    def exercises(self):
+        return sorted(self.iter_exercises(), key=lambda x: x.start_time)
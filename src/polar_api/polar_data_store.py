@@ -1,9 +1,10 @@
-import sys
 from collections import defaultdict
 from functools import cache, cached_property
 
 from typing import override
 
+import numpy as np
+
 from src.db.workout import models
 from src.db.workout.workout_data_store import WorkoutDataStore
 from src.utils.equipment_parsing_mixin import EquipmentParsingMixin
@@ -70,20 +71,20 @@ class PolarDataStore(WorkoutDataStore, EquipmentParsingMixin):
     @cached_property
     @override
     def samples(self):
+        return self._samples_array.tolist()
+
+    @cached_property
+    def _samples_array(self):
         if len(self._i_data["samples"]) != 1:
             self.logger.debug(
                 "Unexpectedly shaped samples object", data=self._i_data["samples"]
             )
-            return []
+            return np.empty(0, dtype=np.int32)
 
-        return [int(i) for i in self._i_data["samples"][0]["data"].split(",")]
+        return np.array(self._i_data["samples"][0]["data"].split(","), dtype=np.int32)
 
     @cache
     def _lowest_sample(self):
-        m = sys.maxsize
-        for i in self.samples:
-            if i != 0 and i < m:
-                m = i
-        if m == sys.maxsize:
-            return 0
-        return m
+        # Zeros are dropouts rather than readings
+        readings = self._samples_array[self._samples_array != 0]
+        return int(readings.min()) if readings.size > 0 else 0
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from src.polar_api.exercise_stream import ExerciseCache, iter_json_array
+from src.utils.test_base import TestBase
+
+
+class TestExerciseStream(TestBase):
+    def _chunks(self, text, size):
+        data = text.encode("utf-8")
+        return [data[i : i + size] for i in range(0, len(data), size)]
+
+    def test_iter_json_array(self):
+        exercises = [
+            {"id": 1, "samples": [{"data": "100,101,102"}], "sport": "löpning"},
+            {"id": 2, "heart_rate": None},
+            12345,
+            "str",
+        ]
+        text = json.dumps(exercises, indent=4)
+        # Split everywhere, including through multibyte characters and numbers
+        for size in [1, 3, 7, len(text)]:
+            self.assertEqual(list(iter_json_array(self._chunks(text, size))), exercises)
+
+        self.assertEqual(list(iter_json_array(["[", "]"])), [])
+        self.assertEqual(list(iter_json_array([" [1,", "2]"])), [1, 2])
+
+    def test_large_element(self):
+        exercise = {"id": 1, "samples": [{"data": ",".join(["100"] * 10000)}]}
+        chunks = self._chunks(json.dumps([exercise, 2]), 10)
+        with patch.object(
+            json.JSONDecoder,
+            "raw_decode",
+            autospec=True,
+            wraps=json.JSONDecoder.raw_decode,
+        ) as raw_decode:
+            self.assertEqual(list(iter_json_array(chunks)), [exercise, 2])
+        # Only retried once the element has doubled, not for all 4000 chunks
+        self.assertLess(raw_decode.call_count, 30)
+
+    def test_lazy(self):
+        chunks = iter(['[{"id": 1},', '{"id": 2}', ', {"id"', ": 3}]"])
+        values = iter_json_array(chunks)
+        self.assertEqual(next(values), {"id": 1})
+        # Nothing past the first element has been read yet
+        self.assertEqual(next(chunks), '{"id": 2}')
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['{"id": 1}']))
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['[{"id": 1}, {"id"']))
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as d:
+            cache = ExerciseCache(os.path.join(d, "cache.ndjson.gz"))
+            self.assertEqual(
+                list(cache.write([{"id": 1}, {"id": 2}])), [{"id": 1}, {"id": 2}]
+            )
+            list(cache.write(iter([{"id": 3}])))
+            self.assertEqual([i["id"] for i in cache], [1, 2, 3])
+
+            list(cache.write([{"id": 4}], append=False))
+            self.assertEqual([i["id"] for i in cache], [4])
+
+    def test_cache_failed_fetch(self):
+        def fetch():
+            yield {"id": 5}
+            raise ValueError("Truncated JSON array")
+
+        with tempfile.TemporaryDirectory() as d:
+            cache = ExerciseCache(os.path.join(d, "cache.ndjson.gz"))
+            list(cache.write([{"id": 4}], append=False))
+            with self.assertRaises(ValueError):
+                list(cache.write(fetch(), append=False))
+            # The old cache is kept until a fetch gets to the end
+            self.assertEqual([i["id"] for i in cache], [4])
+            self.assertEqual(os.listdir(d), ["cache.ndjson.gz"])
+
+            written = cache.write([{"id": 6}, {"id": 7}], append=False)
+            next(written)
+            written.close()
+            self.assertEqual([i["id"] for i in cache], [4])
+            self.assertEqual(os.listdir(d), ["cache.ndjson.gz"])
@@ -0,0 +1,245 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import DEFAULT, MagicMock, patch
+
+import requests
+
+from src.polar_api.polar_api import PolarAPI
+from src.refresh_function.polar import ProcessData
+from src.utils.test_base import TestBase
+
+
+class AccessLinkStub(BaseHTTPRequestHandler):
+    # {(method, path): (status code, json body)}, set per test
+    routes = {}
+    requests = []
+
+    def _respond(self):
+        self.requests.append((self.command, self.path))
+        status, body = self.routes.get((self.command, self.path), (404, None))
+        data = b"" if body is None else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPolarAPI(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), AccessLinkStub)
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/v3"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        AccessLinkStub.requests = []
+        self.api = PolarAPI(self.logger, url=self.url)
+        self.api.session = requests.Session()
+        self.api.user_id = 42
+        self.transaction = "/v3/users/42/exercise-transactions/7"
+        AccessLinkStub.routes = {
+            ("POST", "/v3/users/42/exercise-transactions"): (
+                201,
+                {"transaction-id": 7, "resource-uri": self.url + self.transaction[3:]},
+            ),
+            ("GET", self.transaction): (
+                200,
+                {
+                    "exercises": [
+                        self._exercise_url(2),
+                        self._exercise_url(1),
+                        self._exercise_url(3),
+                    ]
+                },
+            ),
+            ("PUT", self.transaction): (200, None),
+        }
+        for i, day in [(1, 10), (2, 12), (3, 14)]:
+            self._add_exercise(i, day)
+
+    def _exercise_url(self, exercise_id):
+        return f"{self.url}{self.transaction[3:]}/exercises/{exercise_id}"
+
+    def _add_exercise(self, exercise_id, day):
+        path = f"{self.transaction}/exercises/{exercise_id}"
+        AccessLinkStub.routes.update(
+            {
+                ("GET", path): (
+                    200,
+                    {
+                        "id": exercise_id,
+                        "start-time": f"2022-10-{day}T10:00:00",
+                        "start-time-utc-offset": 0,
+                        "duration": "PT30M",
+                        "calories": 300,
+                        "heart-rate": {"average": 140, "maximum": 170},
+                        "detailed-sport-info": "RUNNING",
+                    },
+                ),
+                ("GET", f"{path}/heart-rate-zones"): (
+                    200,
+                    {
+                        "zone": [
+                            {
+                                "index": 1,
+                                "lower-limit": 95,
+                                "upper-limit": 114,
+                                "in-zone": "PT10M",
+                            }
+                        ]
+                    },
+                ),
+                ("GET", f"{path}/samples"): (
+                    200,
+                    {
+                        "samples": [
+                            f"{self._exercise_url(exercise_id)}/samples/0",
+                            f"{self._exercise_url(exercise_id)}/samples/1",
+                        ]
+                    },
+                ),
+                ("GET", f"{path}/samples/0"): (
+                    200,
+                    {"recording-rate": 1, "sample-type": "0", "data": "100,0,120"},
+                ),
+            }
+        )
+
+    def _requested(self, suffix):
+        return [p for m, p in AccessLinkStub.requests if p.endswith(suffix)]
+
+    def test_transaction(self):
+        transaction = self.api.exercise_transaction()
+        self.assertEqual(transaction.transaction_id, 7)
+
+        exercises = transaction.exercises()
+        self.assertEqual(
+            [e.start_time for e in exercises],
+            [datetime(2022, 10, d, 10, tzinfo=timezone.utc) for d in [10, 12, 14]],
+        )
+        exercise = exercises[0]
+        self.assertEqual(exercise.samples, [100, 0, 120])
+        self.assertEqual(
+            exercise.heart_rate_range, {"min": 100, "max": 170, "avg": 140}
+        )
+        self.assertEqual(exercise.sport, "running")
+        self.assertEqual(
+            exercise.hr_zones,
+            [{"index": 1, "lower_limit": 95, "upper_limit": 114, "in_zone": "PT10M"}],
+        )
+        # Only heart rate samples are fetched
+        self.assertEqual(len(self._requested("/samples/0")), 3)
+        self.assertEqual(len(self._requested("/samples/1")), 0)
+
+        self.assertTrue(transaction.commit())
+        self.assertIn(("PUT", self.transaction), AccessLinkStub.requests)
+
+    def test_only_new_exercises(self):
+        watermark = datetime(2022, 10, 12, 10, tzinfo=timezone.utc)
+        exercises = self.api.exercise_transaction().exercises(
+            lambda start_time: start_time > watermark
+        )
+        self.assertEqual(
+            [e.start_time for e in exercises],
+            [datetime(2022, 10, 14, 10, tzinfo=timezone.utc)],
+        )
+        # Summaries are needed to tell what's new, but nothing else is fetched
+        # for the exercises that are already saved
+        self.assertEqual(len(self._requested("/heart-rate-zones")), 1)
+        self.assertEqual(len(self._requested("/samples")), 1)
+        self.assertEqual(len(self._requested("/samples/0")), 1)
+
+    def test_no_new_data(self):
+        AccessLinkStub.routes[("POST", "/v3/users/42/exercise-transactions")] = (
+            204,
+            None,
+        )
+        self.assertIsNone(self.api.exercise_transaction())
+        self.assertEqual(len(AccessLinkStub.requests), 1)
+
+    def test_errors(self):
+        del AccessLinkStub.routes[("GET", f"{self.transaction}/exercises/2")]
+        transaction = self.api.exercise_transaction()
+        self.assertEqual(len(transaction.exercises()), 2)
+        self.assertEqual(
+            transaction.failed_urls, [self.url + self.transaction[3:] + "/exercises/2"]
+        )
+        # Committing would drop the exercise that failed for good
+        self.assertFalse(transaction.commit())
+        self.assertNotIn(("PUT", self.transaction), AccessLinkStub.requests)
+
+    def test_commit_error(self):
+        del AccessLinkStub.routes[("PUT", self.transaction)]
+        transaction = self.api.exercise_transaction()
+        self.assertEqual(len(transaction.exercises()), 3)
+        self.assertFalse(transaction.commit())
+
+    def test_sync_failed_fetch(self):
+        samples = ("GET", f"{self.transaction}/exercises/3/samples/0")
+        AccessLinkStub.routes[samples] = (500, None)
+        transaction = self.api.exercise_transaction()
+        data = ProcessData(self.logger)
+        with patch.multiple(
+            data,
+            get_sync_watermark=MagicMock(return_value=None),
+            map_data=MagicMock(side_effect=lambda d: d),
+            save_to_db=DEFAULT,
+            save_sync_watermark=DEFAULT,
+        ) as mocks, patch.object(transaction, "commit") as commit:
+            data.sync(transaction)
+
+        # The exercise without its samples isn't saved, and the transaction is
+        # left open so it comes back next time
+        saved = mocks["save_to_db"].call_args.args[0]
+        self.assertEqual([w.start_time.day for w in saved], [10, 12])
+        commit.assert_not_called()
+
+    def test_exercise_listing(self):
+        listing = [
+            {
+                "start_time": f"2022-10-{day}T10:00:00",
+                "start_time_utc_offset": 0,
+                "duration": "PT30M",
+                "samples": [{"data": "100,110"}],
+            }
+            for day in [14, 10]
+        ]
+        AccessLinkStub.routes[("GET", "/v3/exercises?samples=true&zones=true")] = (
+            200,
+            listing,
+        )
+        self.api.CHUNK_SIZE = 16
+        with tempfile.TemporaryDirectory() as d:
+            self.api.cache_path = os.path.join(d, "cache.ndjson.gz")
+            self.api.write_cache = True
+            exercises = self.api.iter_exercises()
+            self.assertEqual(next(exercises).samples, [100, 110])
+            self.assertEqual(len(list(exercises)), 1)
+
+            # The cache is read back without going to polar
+            self.api.use_cache = True
+            AccessLinkStub.requests = []
+            self.assertEqual([e.start_time.day for e in self.api.exercises], [10, 14])
+            self.assertEqual(AccessLinkStub.requests, [])
+
+        del AccessLinkStub.routes[("GET", "/v3/exercises?samples=true&zones=true")]
+        self.api.use_cache = False
+        self.api.write_cache = False
+        self.assertEqual(self.api.exercises, [])
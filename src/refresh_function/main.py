@@ -3,33 +3,38 @@ import json
 from src.polar_api.polar_api import PolarAPI
 from polar import ProcessData
 
+from src.db.workout.refresh_scheduler import RefreshScheduler
 from src.utils import gcp_utils, log
 
+# Shared by every request this instance handles, so overlapping runs only
+# refresh the materialized tables once
+REFRESH_SCHEDULER = None
+
+
+def get_refresh_scheduler(logger):
+    global REFRESH_SCHEDULER
+    if REFRESH_SCHEDULER is None:
+        REFRESH_SCHEDULER = RefreshScheduler(logger)
+    return REFRESH_SCHEDULER
+
 
 def http(request, is_dev=False):
     logger = log.new_logger("refresh", is_dev)
+    scheduler = get_refresh_scheduler(logger)
     logger.info("Starting refresh run")
     api = PolarAPI(logger)
-    data = api.exercises
-
-    if len(data) > 0:
-        logger.debug(
-            "Polar API returned workouts",
-            workouts=[workout.as_dict_for_logging() for workout in data],
-        )
-
-        p = ProcessData(logger)
-        workouts = p.map_data(data)
-
-        logger.debug(
-            "Workouts to be saved",
-            workouts=[workout.as_dict_for_logging() for workout in workouts],
-        )
+    # Only exercises uploaded since the last committed transaction come back
+    transaction = api.exercise_transaction()
 
-        p.save_to_db(workouts)
+    if transaction is not None:
+        ProcessData(logger, scheduler).sync(transaction)
     else:
-        logger.info("No workouts returned by the API", api_response=api)
+        logger.info("No new workouts returned by the API")
 
+    # Cloud functions throttle the cpu once a response is sent, so the
+    # refresh can't be left running in the background past this point
+    if not scheduler.wait():
+        logger.warn("Materialized views not refreshed, the next run retries them")
     logger.info("Completed run")
 
     response = {"statusCode": 200, "body": ""}
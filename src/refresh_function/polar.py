@@ -1,19 +1,20 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 
 from peewee import fn
 
 from src.db.sources import models as source_models
 from src.db.workout import models as workout_models
-from src.db.workout.workout import Workout
+from src.db.workout.workout import WorkoutBatch
 from src.utils.db_utils import DBConnection
 
 
 class ProcessData:
     UNIX_SOCKET_PATH = "/cloudsql/"
 
-    def __init__(self, logger):
+    def __init__(self, logger, refresh_scheduler=None):
         self.logger = logger
         self.db = DBConnection(self.logger)
+        self.refresh_scheduler = refresh_scheduler
 
     def get_sources(self, earliest):
         with self.db.source_db.atomic():
@@ -31,6 +32,32 @@ class ProcessData:
                 fn.MAX(workout_models.Workouts.starttime)
             ).scalar()
 
+    def get_sync_watermark(self):
+        """Start time of the newest workout the sync has dealt with"""
+        with self.db.workout_db.atomic():
+            sync = workout_models.PolarSync.get_or_none(
+                workout_models.PolarSync.id == 1
+            )
+        if sync is not None and sync.last_start_time is not None:
+            return sync.last_start_time
+        return self.get_last_saved_workout_date()
+
+    def save_sync_watermark(self, last_start_time, transaction_id=None):
+        with self.db.workout_db.atomic():
+            workout_models.PolarSync.insert(
+                id=1,
+                last_start_time=last_start_time,
+                last_transaction_id=transaction_id,
+                synced_at=datetime.now(timezone.utc),
+            ).on_conflict(
+                conflict_target=[workout_models.PolarSync.id],
+                preserve=[
+                    workout_models.PolarSync.last_start_time,
+                    workout_models.PolarSync.last_transaction_id,
+                    workout_models.PolarSync.synced_at,
+                ],
+            ).execute()
+
     def map_data(self, data):
         # For each source, we want the workout where it was created after the start time, but before the start time of the next workout
         sources = self.get_sources(data[0].start_time)
@@ -74,8 +101,60 @@ class ProcessData:
 
         return updated_workouts
 
+    def sync(self, transaction):
+        """Saves the new workouts in an AccessLink transaction and commits it.
+
+        Returns the workouts that were saved.
+        """
+        watermark = self.get_sync_watermark()
+        data = transaction.exercises(
+            lambda start_time: watermark is None or start_time > watermark
+        )
+        workouts = []
+        if len(data) > 0:
+            self.logger.debug(
+                "Polar API returned workouts",
+                workouts=[workout.as_dict_for_logging() for workout in data],
+            )
+            workouts = self.map_data(data)
+            self.logger.debug(
+                "Workouts to be saved",
+                workouts=[workout.as_dict_for_logging() for workout in workouts],
+            )
+            self.save_to_db(workouts)
+
+        start_times = [w.start_time for w in workouts]
+        if watermark is not None:
+            start_times.append(watermark)
+        newest = max(start_times) if len(start_times) > 0 else None
+        if newest is not None:
+            self.save_sync_watermark(newest, transaction.transaction_id)
+
+        # A workout newer than anything saved could still have its source
+        # added later. Leaving the transaction open hands it back next time.
+        pending = [w for w in data if newest is None or w.start_time > newest]
+        if len(pending) > 0:
+            self.logger.info(
+                "Leaving transaction open for unmatched workouts",
+                workouts=[w.log_abridged() for w in pending],
+            )
+        elif transaction.has_failures:
+            # The exercises that failed to fetch come back in the next one
+            self.logger.warn(
+                "Leaving transaction open after failed fetches",
+                failed_urls=transaction.failed_urls,
+            )
+        else:
+            transaction.commit()
+        return workouts
+
     def save_to_db(self, workouts):
-        for workout in workouts:
-            w = Workout(self.db.workout_db, workout, self.logger)
-            w.insert_row()
-            workout_models.refresh_materialized_views()
+        batch = WorkoutBatch(self.db.workout_db, workouts, self.logger)
+        inserted = batch.insert_row()
+        if len(inserted) == 0:
+            return
+        workout_ids = [w.id for w in inserted]
+        if self.refresh_scheduler is None:
+            workout_models.refresh_materialized_views(workout_ids=workout_ids)
+        else:
+            self.refresh_scheduler.request(workout_ids=workout_ids)
@@ -0,0 +1,71 @@
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from peewee import DateTimeField, FloatField, IntegerField
+from playhouse.postgres_ext import ArrayField, IntervalField, JSONField
+
+import src.db.workout.models as models
+
+# Compares serializing materialized workout rows through model instances and
+# json_friendly, as DBBase used to, against the tuple rows and RowSerializer
+# it uses now. The rows are synthetic so no db is needed.
+
+ROWS = 10000
+
+
+def synthetic_value(field, i):
+    if field.name == "id":
+        return i
+    if field.name == "samples":
+        return None
+    if isinstance(field, DateTimeField):
+        return datetime(2022, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i)
+    if isinstance(field, IntervalField):
+        return timedelta(seconds=random.randint(0, 4000))
+    if isinstance(field, ArrayField):
+        return [None] if i % 3 == 0 else ["tag1", "tag2"]
+    if isinstance(field, JSONField):
+        return [None] if i % 2 == 0 else [{"id": i, "name": "source"}]
+    if isinstance(field, FloatField):
+        return random.random() * 100
+    if isinstance(field, IntegerField):
+        return random.randint(50, 190)
+    return "Running"
+
+
+def legacy_serialize(model, names, row):
+    m = model(__no_default__=1, **dict(zip(names, row)))
+    m._dirty.clear()
+    j = m.json_friendly()
+    for field_name, data in j.items():
+        if isinstance(data, list) and len(data) == 1 and data[0] is None:
+            j[field_name] = []
+    return j
+
+
+def bench(name, legacy, fast, number=5):
+    legacy_time = timeit.timeit(legacy, number=number) / number
+    fast_time = timeit.timeit(fast, number=number) / number
+    print(
+        f"{name}: legacy {legacy_time / ROWS * 1e6:.1f}us/row, "
+        f"tuples {fast_time / ROWS * 1e6:.1f}us/row, "
+        f"{legacy_time / fast_time:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    model = models.WorkoutsMaterialized
+    fields = model._meta.sorted_fields
+    names = tuple(f.name for f in fields)
+    rows = [tuple(synthetic_value(f, i) for f in fields) for i in range(ROWS)]
+    serializer = model.row_serializer(names)
+
+    for row in rows:
+        assert legacy_serialize(model, names, row) == serializer(row)
+
+    bench(
+        model.__name__,
+        lambda: [legacy_serialize(model, names, r) for r in rows],
+        lambda: [serializer(r) for r in rows],
+    )
@@ -0,0 +1,90 @@
+import copy
+import re
+import timeit
+
+import src.db.workout.models as models
+from src.utils import log
+from src.utils.db_utils import DBConnection
+from src.workout_sources.source_consts import SourceConsts
+from src.workout_sources.youtube import Youtube
+
+# Compares the compiled WordMatcher against the per word regex loops it
+# replaced, using the descriptions and tags of every youtube source in the db.
+
+
+def legacy_add_from_text(text):
+    tags = set()
+    for i in SourceConsts.possible_tags:
+        if re.search(r"\b" + i + r"\b", text) is not None:
+            tags.add(i)
+    return tags
+
+
+def legacy_strip_words(words, val):
+    for j in words:
+        val = re.sub(r"\b" + j + r"\b", "", val)
+        val = re.sub(r"\s+", " ", val)
+    return val.strip()
+
+
+def legacy_clean_tags(potential_tags):
+    strip_words = sorted(
+        list(copy.deepcopy(SourceConsts.strip_words)), key=len, reverse=True
+    )
+    for i in sorted(potential_tags, key=len):
+        i = legacy_strip_words(strip_words, i.lower().strip())
+        if len(i) >= 3:
+            strip_words.append(i)
+            strip_words = sorted(strip_words, key=len, reverse=True)
+
+
+def clean_tags(potential_tags):
+    strip_words = Youtube._strip_matcher().copy()
+    for i in sorted(potential_tags, key=len):
+        i = strip_words.strip(i.lower().strip())
+        if len(i) >= 3:
+            strip_words.add(i)
+
+
+def load_videos(logger, db):
+    with db.atomic():
+        urls = [
+            i.url
+            for i in models.Sources.select().where(
+                models.Sources.sourcetype == models.SourceType.YOUTUBE
+            )
+        ]
+    logger.info("Fetching youtube data", videos=len(urls))
+    Youtube.prefetch(urls)
+    return [Youtube.get_data(url)["snippet"] for url in urls]
+
+
+def bench(name, legacy, compiled, number=5):
+    legacy_time = timeit.timeit(legacy, number=number) / number
+    compiled_time = timeit.timeit(compiled, number=number) / number
+    print(
+        f"{name}: legacy {legacy_time * 1000:.1f}ms, "
+        f"compiled {compiled_time * 1000:.1f}ms, "
+        f"{legacy_time / compiled_time:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    logger = log.new_logger(is_dev=True)
+    db = DBConnection(logger).workout_db
+    videos = load_videos(logger, db)
+
+    texts = [v["title"] + "\n" + v["description"] for v in videos]
+    for text in texts:
+        assert legacy_add_from_text(text) == Youtube._tag_matcher().findall(text)
+
+    bench(
+        "add_from_text",
+        lambda: [legacy_add_from_text(t) for t in texts],
+        lambda: [Youtube._tag_matcher().findall(t) for t in texts],
+    )
+    bench(
+        "clean_tags",
+        lambda: [legacy_clean_tags(v.get("tags", [])) for v in videos],
+        lambda: [clean_tags(v.get("tags", [])) for v in videos],
+    )
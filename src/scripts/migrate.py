@@ -4,7 +4,9 @@ import os
 import click
 
 from playhouse.migrate import *
-from src.db.workout import models
+from src.db.samples_field import SamplesCodec
+from src.db.workout import downsample, models
+from src.db.workout.hr_analytics import HRAnalytics, zone_columns, zone_seconds
 from src.db.workout.workout import Workout
 from src.scripts.dump_workout_data_store import WorkoutDataWithFilenameStore
 from src.utils import db_utils, log
@@ -84,11 +86,241 @@ def move_zone_data(db):
             v.save()
 
 
+def samples_to_bytea(db, migrator, batch_size=500):
+    # The materialized views depend on workouts.samples so have to be rebuilt
+    with db.atomic():
+        db.execute_sql("DROP MATERIALIZED VIEW IF EXISTS sources_materialized")
+        db.execute_sql("DROP MATERIALIZED VIEW IF EXISTS workouts_materialized")
+        migrate(migrator.add_column("workouts", "samples_packed", BlobField(null=True)))
+
+        cursor = db.execute_sql(
+            "SELECT id, samples FROM workouts WHERE samples IS NOT NULL ORDER BY id"
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if len(rows) == 0:
+                break
+            for workout_id, samples in rows:
+                if isinstance(samples, str):
+                    samples = json.loads(samples)
+                if not isinstance(samples, list):
+                    print(f"Skipping workout {workout_id}: unexpected samples")
+                    continue
+                db.execute_sql(
+                    "UPDATE workouts SET samples_packed = %s WHERE id = %s",
+                    (SamplesCodec.encode(samples), workout_id),
+                )
+            print(f"Packed samples up to workout {rows[-1][0]}")
+
+        migrate(
+            migrator.drop_column("workouts", "samples"),
+            migrator.rename_column("workouts", "samples_packed", "samples"),
+        )
+    models.create_materialized_views()
+
+
+def materialized_views_to_tables(db):
+    with db.atomic():
+        db.execute_sql("DROP MATERIALIZED VIEW IF EXISTS sources_materialized")
+        db.execute_sql("DROP MATERIALIZED VIEW IF EXISTS workouts_materialized")
+    models.create_materialized_views()
+
+
+def create_materialized_generation(db):
+    with db.atomic():
+        db.create_tables([models.MaterializedGeneration])
+
+
+def sources_materialized_without_samples(db):
+    with db.atomic():
+        db.execute_sql("DROP TABLE IF EXISTS sources_materialized")
+        db.execute_sql("DROP VIEW IF EXISTS sources_materialized_query")
+    models.create_materialized_views(
+        paths=["src/db/workout/sql/sources_materialized_view.sql"]
+    )
+    # Invalidates any cached responses still carrying samples
+    models.refresh_materialized_views(source_ids=[])
+
+
+def workouts_materialized_starttime_index(db):
+    # The same index create_materialized_indexes builds for starttime
+    with db.atomic():
+        db.execute_sql(
+            "CREATE INDEX IF NOT EXISTS workouts_materialized_starttime_idx "
+            "ON workouts_materialized (starttime)"
+        )
+
+
+def query_indexes(db):
+    # The through tables already have an index per foreign key from peewee,
+    # and equipment's unique index leads with equipmenttype
+    models.create_materialized_indexes()
+
+
+def create_polar_sync(db):
+    with db.atomic():
+        db.create_tables([models.PolarSync])
+
+
+def hr_analytics(db, migrator, batch_size=500):
+    with db.atomic():
+        migrate(
+            migrator.add_column("workouts", "trainingload", FloatField(null=True)),
+            migrator.add_column("workouts", "hrdrift", FloatField(null=True)),
+            migrator.add_column("workouts", "recoverydrop", IntegerField(null=True)),
+            migrator.add_column("workouts", "hranalytics", BinaryJSONField(null=True)),
+        )
+
+        cursor = db.execute_sql(
+            "SELECT id, samples FROM workouts WHERE samples IS NOT NULL ORDER BY id"
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if len(rows) == 0:
+                break
+            for workout_id, samples in rows:
+                summary = HRAnalytics(SamplesCodec.decode_array(samples)).summary()
+                models.Workouts.update(**summary).where(
+                    models.Workouts.id == workout_id
+                ).execute()
+            print(f"Computed heart rate analytics up to workout {rows[-1][0]}")
+
+        # Rebuilt to pick up the new columns. sources_materialized_query joins
+        # workouts_materialized, so the sources tables go first
+        for name in ["sources_materialized", "workouts_materialized"]:
+            db.execute_sql(f"DROP TABLE IF EXISTS {name}")
+            db.execute_sql(f"DROP VIEW IF EXISTS {name}_query")
+    models.create_materialized_views(
+        paths=[
+            "src/db/workout/sql/workouts_materialized_view.sql",
+            "src/db/workout/sql/sources_materialized_view.sql",
+        ]
+    )
+    # Bumps the generation too, so cached responses are dropped
+    models.refresh_materialized_views()
+
+
+def recompute_hr_zones(db, batch_size=5000):
+    """Fills in the zone columns from samples where Polar sent no zone data"""
+    analytics = HRAnalytics([])
+    thresholds = analytics.zone_thresholds
+    updated = []
+    with db.atomic():
+        cursor = db.execute_sql(
+            "SELECT id, samples FROM workouts WHERE zone_50_60_lower IS NULL"
+            " AND samples IS NOT NULL ORDER BY id"
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if len(rows) == 0:
+                break
+            # One histogram over the whole batch
+            seconds = zone_seconds(
+                [SamplesCodec.decode_array(samples) for _, samples in rows],
+                thresholds,
+            )
+            for (workout_id, _), columns in zip(
+                rows, zone_columns(seconds, thresholds, analytics.max_hr)
+            ):
+                if columns is None:
+                    continue
+                models.Workouts.update(**columns).where(
+                    models.Workouts.id == workout_id
+                ).execute()
+                updated.append(workout_id)
+            print(f"Computed heart rate zones up to workout {rows[-1][0]}")
+
+    if len(updated) > 0:
+        models.refresh_materialized_views(workout_ids=updated)
+    print(f"Computed heart rate zones for {len(updated)} workouts")
+
+
+def downsampled_samples(db, batch_size=500):
+    with db.atomic():
+        db.create_tables([models.DownsampledSamples])
+
+        cursor = db.execute_sql(
+            "SELECT id, samples FROM workouts WHERE samples IS NOT NULL ORDER BY id"
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if len(rows) == 0:
+                break
+            models.DownsampledSamples.insert_many(
+                [
+                    {
+                        "workout": workout_id,
+                        "method": method,
+                        "points": points,
+                        "data": data,
+                    }
+                    for workout_id, samples in rows
+                    for method, points, data in downsample.tiers(
+                        SamplesCodec.decode_array(samples)
+                    )
+                ]
+            ).execute()
+            print(f"Downsampled samples up to workout {rows[-1][0]}")
+
+
+def equipment_unique(db):
+    """Merges duplicate equipment rows and adds the unique index.
+
+    EquipmentRegistry inserts with ON CONFLICT DO NOTHING, which relies on the
+    index to stop duplicate combinations. Workouts linked to a duplicate are
+    repointed to the lowest id with the same combination first.
+    """
+    through = models.Workouts.equipment.get_through_model()._meta.table_name
+    with db.atomic():
+        db.execute_sql(
+            "CREATE TEMPORARY TABLE equipment_duplicates ON COMMIT DROP AS"
+            " SELECT id, keep FROM (SELECT id, MIN(id) OVER (PARTITION BY"
+            " equipmenttype, magnitude, COALESCE(quantity, -1)) AS keep"
+            " FROM equipment) e WHERE id != keep"
+        )
+        db.execute_sql(
+            f"INSERT INTO {through} (workouts_id, equipment_id)"
+            f" SELECT DISTINCT t.workouts_id, d.keep FROM {through} t"
+            " JOIN equipment_duplicates d ON t.equipment_id = d.id"
+            " ON CONFLICT DO NOTHING"
+        )
+        cursor = db.execute_sql(
+            f"DELETE FROM {through} t USING equipment_duplicates d"
+            " WHERE t.equipment_id = d.id RETURNING t.workouts_id"
+        )
+        workout_ids = sorted({row[0] for row in cursor.fetchall()})
+        cursor = db.execute_sql(
+            "DELETE FROM equipment e USING equipment_duplicates d WHERE e.id = d.id"
+        )
+        print(f"Merged {cursor.rowcount} duplicate equipment rows")
+
+        # Replaces the first version of the index, which let NULL quantities
+        # through
+        db.execute_sql(
+            "DROP INDEX IF EXISTS equipment_equipmenttype_magnitude_quantity"
+        )
+        models.Equipment._schema.create_indexes()
+
+    if len(workout_ids) > 0:
+        models.refresh_materialized_views(workout_ids=workout_ids)
+
+
 def main():
     logger = log.new_logger(is_dev=True)
     db = db_utils.DBConnection(logger).workout_db
     migrator = PostgresqlMigrator(db)
-    move_zone_data(db)
+    # move_zone_data(db)
+    # samples_to_bytea(db, migrator)
+    # materialized_views_to_tables(db)
+    # create_materialized_generation(db)
+    # sources_materialized_without_samples(db)
+    # workouts_materialized_starttime_index(db)
+    # query_indexes(db)
+    # create_polar_sync(db)
+    # hr_analytics(db, migrator)
+    # recompute_hr_zones(db)
+    # downsampled_samples(db)
+    equipment_unique(db)
     # with db.atomic():
     # migrate(*zones(migrator))
     # migrator.add_column("workouts", "samples", BinaryJSONField(null=True)))
@@ -18,6 +18,10 @@ def get_all_tags(logger, db):
     tags_map = {i.name: i for i in tags}
 
     id_to_name = {i.id: i.name for i in tags}
+    exercises = [i.name for i in tags if i.tagtype == models.TagType.EXERCISE]
+    cleaned = dict(
+        zip(exercises, Youtube.exercise_normaliser().normalise_many(exercises))
+    )
     for tag in tags:
         if tag.name in SourceConsts.ignore_tags:
             to_remove.add(tag)
@@ -29,7 +33,7 @@ def get_all_tags(logger, db):
                 to_create[updated_name].add(tag)
 
         elif tag.tagtype == models.TagType.EXERCISE:
-            updated_name = Youtube._clean_exercise(tag.name)
+            updated_name = cleaned[tag.name]
             if updated_name != tag.name:
                 if updated_name in tags_map:
                     to_replace[tags_map[updated_name]].add(tag)
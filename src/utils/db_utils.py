@@ -1,8 +1,8 @@
 from functools import cache, cached_property
 
+from peewee import InterfaceError, OperationalError
 from playhouse.db_url import connect
 
-from src.db.sources import models as source_models
 from src.db.workout import models as workout_models
 from src.utils import gcp_utils, log, config
 
@@ -16,16 +16,58 @@ class DBConnection:
             self.logger = log.new_logger(is_dev=True)
 
     @cache
-    def _connect_to_db(self, model, db_name, host, user, password):
+    def _connect_to_db(
+        self,
+        model,
+        db_name,
+        host,
+        user,
+        password,
+        max_connections=None,
+        stale_timeout=None,
+        timeout=None,
+    ):
         host = self.UNIX_SOCKET_PATH + host
         self.logger.debug(
             f"Opening connection to DB {db_name}",
             db={"name": db_name, "host": host, "user": user,},
         )
-        model.database.init(db_name, host=host, user=user, password=password)
+        # Only pooled databases understand these
+        pool = {
+            k: v
+            for k, v in {
+                "max_connections": max_connections,
+                "stale_timeout": stale_timeout,
+                "timeout": timeout,
+            }.items()
+            if v is not None
+        }
+        model.database.init(db_name, host=host, user=user, password=password, **pool)
         model.database.connect()
         return model.database
 
+    def check_connection(self, database):
+        """Make sure this thread has a working connection before it's used.
+
+        Cloud SQL drops idle sockets, which otherwise only shows up as an error
+        part way through the next request. A SELECT 1 is cheap enough to run
+        at the start of every request. It runs after connect() too, as the
+        pool hands back whatever socket it's holding without checking it.
+        """
+        if database.is_closed():
+            database.connect()
+        try:
+            database.execute_sql("SELECT 1")
+        except (InterfaceError, OperationalError):
+            self.logger.warn("Dropping stale DB connection", db_connection="stale")
+            # Don't hand a broken connection back to the pool
+            if hasattr(database, "manual_close"):
+                database.manual_close()
+            else:
+                database.close()
+            database.connect()
+        return database
+
     @cached_property
     def config(self):
         return config.read_config()
@@ -34,6 +76,9 @@ class DBConnection:
     def source_db(self):
         if "source" not in self.config["db"]:
             raise Exception("No credentials found for sources db")
+        # Only the ingest jobs use the sources db, the api never does
+        from src.db.sources import models as source_models
+
         return self._connect_to_db(source_models, **self.config["db"]["source"])
 
     @cached_property
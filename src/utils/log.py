@@ -14,7 +14,7 @@ def enable_debug_logging(use_cloud_config=False):
     elif "debug_logging" in cfg:
         debug = cfg["debug_logging"]
     else:
-        debug_logging = False
+        debug = False
 
     if debug:
         print("debug logging enabled")
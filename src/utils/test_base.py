@@ -6,6 +6,7 @@ import structlog
 import testing.postgresql
 from src.utils.test_db import PG_DB
 from src.db.workout import models
+from src.db.workout.equipment_registry import EquipmentRegistry
 
 
 def tearDownModule():
@@ -25,6 +26,8 @@ class TestBase(unittest.TestCase):
         else:
             cls.pg_db = testing.postgresql.Postgresql()
         db = models.database
+        # Rows cached for the previous test database don't exist in this one
+        EquipmentRegistry.clear()
         db.init(**cls.pg_db.dsn())
         db.connect()
         if not insert_data:
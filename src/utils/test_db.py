@@ -2,7 +2,8 @@ import json
 from datetime import timedelta, datetime
 from functools import cache
 
-from src.db.workout import models
+from src.db.workout import downsample, models
+from src.db.workout.hr_analytics import HRAnalytics
 import testing.postgresql
 
 
@@ -102,7 +103,7 @@ def _gen_workouts(db, sources, equipment):
                 notes="some note",
                 sport="sport1",
                 starttime=datetime(2022, 10, 10, 10, 0),
-                samples=json.dumps({"somedata": "something"}),
+                samples=[100, 102, 101, 99, 150, 0, 180],
                 # percent above: [100, 100, 96, 76, 36, 4]
                 **_gen_hr_zones(db, [0, 1, 5, 10, 8, 1], 200),
             )
@@ -126,7 +127,7 @@ def _gen_workouts(db, sources, equipment):
                 minhr=100,
                 notes="some note",
                 sport="sport1",
-                samples=json.dumps({"somedata": "something"}),
+                samples=[100, 102, 101, 99, 150, 0, 180],
                 starttime=datetime(2022, 10, 11, 10, 0),
                 # percent above: [100, 100, 92, 72, 60, 20]
                 **_gen_hr_zones(db, [0, 2, 5, 3, 10, 5], 200),
@@ -155,7 +156,8 @@ def _gen_workouts(db, sources, equipment):
                 notes="some note",
                 sport="sport2",
                 starttime=datetime(2022, 10, 12, 10, 0),
-                samples=json.dumps({"somedata": "something"}),
+                # 20 minutes at a higher heart rate, for a bigger training load
+                samples=[150, 160, 0, 170] * 300,
                 # percent above: [100, 100, 100, 60, 0, 0]
                 **_gen_hr_zones(db, [0, 0, 20, 15, 0, 0], 200),
             )
@@ -176,7 +178,7 @@ def _gen_workouts(db, sources, equipment):
                 minhr=80,
                 notes="some note",
                 sport="sport1",
-                samples=json.dumps({"somedata": "something"}),
+                samples=[100, 102, 101, 99, 150, 0, 180],
                 starttime=datetime(2022, 10, 13, 10, 0),
                 # percent above: [100, 86, 71, 43, 29, 14]
                 **_gen_hr_zones(db, [5, 5, 5, 10, 5, 5], 200),
@@ -214,6 +216,25 @@ def _gen_hr_zones(db, durations, max_hr):
     return data
 
 
+def _gen_hr_analytics(db, workouts):
+    with db.atomic():
+        for w in workouts:
+            models.Workouts.update(**HRAnalytics(w.samples).summary()).where(
+                models.Workouts.id == w.id
+            ).execute()
+
+
+def _gen_downsampled(db, workouts):
+    with db.atomic():
+        models.DownsampledSamples.insert_many(
+            [
+                {"workout": w.id, "method": method, "points": points, "data": data}
+                for w in workouts
+                for method, points, data in downsample.tiers(w.samples)
+            ]
+        ).execute()
+
+
 def _gen_equipment(db):
     equipment = {"weights": {}, "bands": {}}
     with db.atomic():
@@ -248,6 +269,8 @@ def insert_data(postgres):
     sources = _gen_sources(db)
     equipment = _gen_equipment(db)
     workouts = _gen_workouts(db, sources, equipment)
+    _gen_hr_analytics(db, workouts)
+    _gen_downsampled(db, workouts)
     models.create_materialized_views()
 
 
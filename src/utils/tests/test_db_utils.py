@@ -0,0 +1,49 @@
+import psycopg2
+
+from src.utils.db_utils import DBConnection
+from src.utils.test_base import TestBase
+
+
+class TestDBConnection(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.db = cls.create_test_db(insert_data=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.teardown_test_db()
+
+    def test_check_connection(self):
+        conn = DBConnection(self.logger)
+
+        # Simulate the server dropping the socket under us
+        self.db.connection().close()
+        conn.check_connection(self.db)
+        self.assertEqual(self.db.execute_sql("SELECT 1").fetchone(), (1,))
+
+        # Returned to the pool between requests
+        self.db.close()
+        conn.check_connection(self.db)
+        self.assertFalse(self.db.is_closed())
+        self.assertEqual(self.db.execute_sql("SELECT 1").fetchone(), (1,))
+
+    def test_check_connection_from_pool(self):
+        conn = DBConnection(self.logger)
+        conn.check_connection(self.db)
+        pid = self.db.execute_sql("SELECT pg_backend_pid()").fetchone()[0]
+        self.db.close()
+
+        # The server drops the socket while it's idle in the pool, which the
+        # pool can't tell until it's used
+        with psycopg2.connect(**self.pg_db.dsn()) as other:
+            with other.cursor() as cursor:
+                cursor.execute("SELECT pg_terminate_backend(%s)", (pid,))
+        other.close()
+
+        conn.check_connection(self.db)
+        self.assertEqual(self.db.execute_sql("SELECT 1").fetchone(), (1,))
+        self.assertNotEqual(
+            self.db.execute_sql("SELECT pg_backend_pid()").fetchone()[0], pid
+        )
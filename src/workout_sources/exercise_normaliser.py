@@ -0,0 +1,94 @@
+import re
+from functools import lru_cache
+
+from src.workout_sources.source_consts import SourceConsts
+
+
+class ExerciseNormaliser:
+    """Cleans up exercise names pulled from video chapters and descriptions.
+
+    The SourceConsts rule tables are compiled once. None of the strip or plural
+    entries overlap, so each of those tables becomes a single alternation with
+    a callback substitution. Dupes can produce text that a later dupe matches,
+    so they stay sequential and in table order. One combined pattern per table
+    still skips the whole table for the common case where nothing matches.
+    """
+
+    def __init__(
+        self,
+        strip=SourceConsts.exercises_strip,
+        plurals=SourceConsts.exercise_plurals,
+        dupes=SourceConsts.exercise_dupes,
+        dupes_regex=SourceConsts.exercise_dupes_regex,
+        depluralise=SourceConsts.depluralise,
+        max_entries=4096,
+    ):
+        self._strip = self._alternation(strip)
+        self._plurals = self._alternation(plurals)
+        self._dupes = self._sequence(dupes)
+        self._dupes_regex = self._sequence(dupes_regex, word_bounded=False)
+        self._depluralise = [
+            (re.compile(r"(" + e + r" \+)"), f"{e[:-1]} +") for e in depluralise
+        ]
+        self.normalise = lru_cache(maxsize=max_entries)(self._normalise)
+
+    @staticmethod
+    def _alternation(words):
+        if len(words) == 0:
+            return None
+        words = sorted(words, key=lambda w: (-len(w), w))
+        return re.compile(r"(" + "|".join(words) + r")\b")
+
+    @staticmethod
+    def _sequence(rules, word_bounded=True):
+        if len(rules) == 0:
+            return None, []
+        suffix = r"\b" if word_bounded else ""
+        patterns = [(re.compile(r"(" + k + r")" + suffix), v) for k, v in rules.items()]
+        combined = re.compile("|".join(r"(?:" + p.pattern + r")" for p, _ in patterns))
+        return combined, patterns
+
+    @staticmethod
+    def _apply_sequence(sequence, val):
+        combined, patterns = sequence
+        if combined is None or combined.search(val) is None:
+            return val
+        for pattern, replacement in patterns:
+            val = pattern.sub(replacement, val)
+        return val
+
+    _BRACKETED = re.compile(r"\(.+\)")
+    _FREQUENCY = re.compile(" x[0-9]")
+    _LEADING = re.compile(r"^\W+")
+
+    def _normalise(self, val):
+        # remove extra words
+        if self._strip is not None:
+            val = self._strip.sub("", val)
+
+        # standardise on the plural form
+        if self._plurals is not None:
+            val = self._plurals.sub(lambda m: m.group(1) + "s", val)
+
+        # standardise names (but only if they're not in the middle of a word"
+        val = self._apply_sequence(self._dupes, val)
+        val = self._apply_sequence(self._dupes_regex, val)
+
+        # remove any bracketed extra info - i.e. (L) or (R)
+        val = self._BRACKETED.sub("", val)
+        # remove any frequencies - i.e. x3
+        val = self._FREQUENCY.sub("", val)
+        # make sure we start with the exercise, i.e. remove bulletpoints (-, *, etc)
+        val = self._LEADING.sub("", val)
+        # standardise on '+' instead of '&' in descriptions
+        val = val.replace("&", "+")
+
+        for pattern, replacement in self._depluralise:
+            val = pattern.sub(replacement, val)
+
+        return val.strip()
+
+    def normalise_many(self, vals):
+        # Names repeat a lot in bulk jobs, so only normalise each one once
+        normalised = {v: self.normalise(v) for v in dict.fromkeys(vals)}
+        return [normalised[v] for v in vals]
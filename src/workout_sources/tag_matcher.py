@@ -0,0 +1,122 @@
+import re
+
+
+def _is_word_char(c):
+    return c.isalnum() or c == "_"
+
+
+class WordMatcher:
+    """Matches a set of words against text without a regex per word.
+
+    The patterns given to the constructor (the SourceConsts sets) are joined
+    into one word bounded alternation, longest first, and compiled once, so a
+    search is a single pass over the text. Copies share the compiled pattern.
+
+    Words learned while cleaning a source are added as plain literals. They're
+    matched with str.find and a word boundary check instead, as recompiling the
+    alternation after every accepted tag costs more than it saves.
+    """
+
+    def __init__(self, patterns=()):
+        self._patterns = frozenset(patterns)
+        self._literals = []
+        self._compiled = None
+        self._contains = None
+
+    def __len__(self):
+        return len(self._patterns) + len(self._literals)
+
+    def copy(self):
+        matcher = WordMatcher()
+        matcher._patterns = self._patterns
+        matcher._literals = list(self._literals)
+        matcher._compiled = self._compiled
+        matcher._contains = self._contains
+        return matcher
+
+    def add(self, word):
+        if len(word) == 0 or word in self._patterns or word in self._literals:
+            return
+        self._literals.append(word)
+        self._literals.sort(key=len, reverse=True)
+
+    @property
+    def _compiled_patterns(self):
+        if self._compiled is None:
+            words = sorted(self._patterns, key=lambda w: (-len(w), w))
+            alternation = r"\b(?:" + "|".join(words) + r")\b"
+            # The lookahead version lets findall return overlapping matches
+            self._compiled = (
+                re.compile(alternation),
+                re.compile(r"(?=(" + alternation + r"))"),
+            )
+        return self._compiled
+
+    @property
+    def pattern(self):
+        return self._compiled_patterns[0]
+
+    @property
+    def _contained_patterns(self):
+        # A match can hide shorter words that start at the same position (core
+        # vs core strength). Those are fixed per word, so work them out once.
+        if self._contains is None:
+            self._contains = {
+                word: {
+                    w
+                    for w in self._patterns
+                    if w != word and re.search(r"\b" + w + r"\b", word)
+                }
+                for word in self._patterns
+            }
+        return self._contains
+
+    @staticmethod
+    def _find_literal(text, word, start=0):
+        # Equivalent to re.search(r"\b" + re.escape(word) + r"\b", text)
+        first, last = _is_word_char(word[0]), _is_word_char(word[-1])
+        i = text.find(word, start)
+        while i >= 0:
+            end = i + len(word)
+            before = i > 0 and _is_word_char(text[i - 1])
+            after = end < len(text) and _is_word_char(text[end])
+            if before != first and after != last:
+                return i
+            i = text.find(word, i + 1)
+        return -1
+
+    def _remove_literal(self, text, word):
+        parts = []
+        start = 0
+        i = self._find_literal(text, word)
+        while i >= 0:
+            parts.append(text[start:i])
+            start = i + len(word)
+            i = self._find_literal(text, word, start)
+        parts.append(text[start:])
+        return "".join(parts)
+
+    def findall(self, text):
+        found = set()
+        if len(self._patterns) > 0:
+            found.update(m.group(1) for m in self._compiled_patterns[1].finditer(text))
+            contained = self._contained_patterns
+            for word in list(found):
+                found.update(contained.get(word, ()))
+        found.update(w for w in self._literals if self._find_literal(text, w) >= 0)
+        return found
+
+    def strip(self, text):
+        if len(self) == 0:
+            return text.strip()
+        text = re.sub(r"\s+", " ", text)
+        if len(self._patterns) > 0:
+            text = re.sub(r"\s+", " ", self.pattern.sub("", text))
+        if len(self._literals) > 0:
+            for word in self._literals:
+                if word in text:
+                    text = re.sub(r"\s+", " ", self._remove_literal(text, word))
+            # Removing a literal can expose a pattern match that spanned it
+            if len(self._patterns) > 0:
+                text = self.pattern.sub("", text)
+        return re.sub(r"\s+", " ", text).strip()
@@ -0,0 +1,34 @@
+import json
+
+from src.utils.test_base import TestBase
+from src.workout_sources.exercise_normaliser import ExerciseNormaliser
+
+
+class TestExerciseNormaliser(TestBase):
+    def setUp(self):
+        self.normaliser = ExerciseNormaliser()
+
+    def golden(self):
+        # Generated with the per rule re.sub implementation this replaced
+        with open("src/workout_sources/tests/exercise_golden.json") as f:
+            return json.loads(f.read())
+
+    def test_golden(self):
+        for val, expected in self.golden().items():
+            self.assertEqual(self.normaliser.normalise(val), expected, val)
+
+    def test_normalise_many(self):
+        golden = self.golden()
+        vals = list(golden.keys()) * 2
+        self.assertEqual(
+            self.normaliser.normalise_many(vals), [golden[v] for v in vals]
+        )
+        self.assertEqual(self.normaliser.normalise_many([]), [])
+
+    def test_cache_bounded(self):
+        normaliser = ExerciseNormaliser(max_entries=2)
+        for val in ["push up", "squat", "lunge", "push up"]:
+            normaliser.normalise(val)
+        info = normaliser.normalise.cache_info()
+        self.assertEqual(info.currsize, 2)
+        self.assertEqual(info.hits, 0)
@@ -0,0 +1,36 @@
+from src.utils.test_base import TestBase
+from src.workout_sources.tag_matcher import WordMatcher
+
+
+class TestWordMatcher(TestBase):
+    def test_findall(self):
+        matcher = WordMatcher({"core", "core strength", "strength", "abs"})
+        self.assertEqual(
+            matcher.findall("a core strength workout"),
+            {"core", "core strength", "strength"},
+        )
+        # only whole words
+        self.assertEqual(matcher.findall("crabs and hardcore"), set())
+        self.assertEqual(WordMatcher().findall("core"), set())
+
+    def test_strip(self):
+        matcher = WordMatcher({"workout", "full body"})
+        self.assertEqual(matcher.strip("full  body hiit workout"), "hiit")
+        self.assertEqual(matcher.strip("workouts"), "workouts")
+        self.assertEqual(WordMatcher().strip(" as is  "), "as is")
+
+    def test_add(self):
+        matcher = WordMatcher({"workout"})
+        self.assertEqual(matcher.strip("legs+arms workout"), "legs+arms")
+
+        copied = matcher.copy()
+        # learned words are literal, not patterns
+        copied.add("legs+arms")
+        copied.add("a.c")
+        self.assertEqual(copied.strip("legs+arms workout"), "")
+        self.assertEqual(copied.strip("legsssarms"), "legsssarms")
+        self.assertEqual(copied.strip("abc"), "abc")
+        self.assertEqual(len(copied), 3)
+
+        # the original is left untouched
+        self.assertEqual(matcher.strip("legs+arms workout"), "legs+arms")
@@ -19,7 +19,11 @@ class TestYoutube(TestBase):
             "contentDetails": {"duration": "PT21M34S"},
         }
         self.vid = self._create_vid()
-        Youtube.get_data = MagicMock(return_value=self.data_return)
+        patcher = patch.object(
+            Youtube, "get_data", MagicMock(return_value=self.data_return)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def _create_vid(self):
         return Youtube(self.db, self.url, self.data_return, self.logger)
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.utils.test_base import TestBase
+from src.workout_sources.youtube import Youtube
+from src.workout_sources.youtube_fetcher import YoutubeFetcher
+
+
+class FakeYoutubeClient:
+    """Stands in for the googleapiclient resource, recording every request"""
+
+    def __init__(self, known_ids):
+        self.known_ids = set(known_ids)
+        self.requests = []
+
+    def videos(self):
+        return self
+
+    def list(self, part, id):
+        ids = id.split(",")
+        self.requests.append(ids)
+        request = MagicMock()
+        request.execute.return_value = {
+            "items": [
+                {"id": i, "snippet": {"title": f"title {i}"}}
+                for i in ids
+                if i in self.known_ids
+            ]
+        }
+        return request
+
+
+class TestYoutubeFetcher(TestBase):
+    def setUp(self):
+        self.ids = [f"vid{i}" for i in range(120)]
+        self.client = FakeYoutubeClient(self.ids)
+        self.clients = []
+        self.fetcher = YoutubeFetcher(
+            client_factory=self._client, cache_path=None, max_workers=2
+        )
+
+    def tearDown(self):
+        self.fetcher.close()
+
+    def _client(self):
+        self.clients.append(self.client)
+        return self.client
+
+    def test_batches(self):
+        res = self.fetcher.fetch(self.ids + self.ids[:10] + ["unknown"])
+        self.assertEqual(set(res.keys()), set(self.ids))
+        self.assertEqual(res["vid3"]["snippet"]["title"], "title vid3")
+        self.assertEqual(
+            sorted(len(i) for i in self.client.requests),
+            [21, 50, 50],
+        )
+
+        # Everything is served from memory the second time around
+        self.fetcher.fetch(self.ids[:5])
+        self.assertEqual(len(self.client.requests), 3)
+
+    def test_clients_reused(self):
+        for i in range(0, 120, 30):
+            self.fetcher.fetch(self.ids[i : i + 30])
+            self.fetcher.fetch([f"new{i}-{j}" for j in range(60)])
+        self.assertEqual(len(self.client.requests), 12)
+        # One client on the calling thread, plus one per pool thread, however
+        # many fetches there are
+        self.assertLessEqual(len(self.clients), 3)
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "videos.sqlite")
+            YoutubeFetcher(client_factory=lambda: self.client, cache_path=path).fetch(
+                self.ids[:3]
+            )
+            self.assertEqual(len(self.client.requests), 1)
+
+            # A new fetcher (i.e. a new process) picks the videos up from disk
+            fetcher = YoutubeFetcher(
+                client_factory=lambda: self.client, cache_path=path
+            )
+            self.assertEqual(len(fetcher.fetch(self.ids[:3])), 3)
+            self.assertEqual(len(self.client.requests), 1)
+
+            # Unless they've expired
+            fetcher = YoutubeFetcher(
+                client_factory=lambda: self.client, cache_path=path, ttl=-1
+            )
+            self.assertEqual(len(fetcher.fetch(self.ids[:3])), 3)
+            self.assertEqual(len(self.client.requests), 2)
+
+    def test_youtube_prefetch(self):
+        Youtube.set_fetcher(self.fetcher)
+        try:
+            Youtube.prefetch([f"https://www.youtu.be/{i}" for i in self.ids[:60]])
+            self.assertEqual(len(self.client.requests), 2)
+
+            data = Youtube.get_data("https://www.youtube.com/watch?v=vid7")
+            self.assertEqual(data["id"], "vid7")
+            self.assertEqual(len(self.client.requests), 2)
+
+            with self.assertRaises(Exception):
+                Youtube.get_data("https://www.youtu.be/unknown")
+        finally:
+            Youtube.set_fetcher(None)
@@ -1,12 +1,11 @@
-import copy
 import math
-import re
 from functools import cache, cached_property
 
 from typing import override
 
 from src.db.workout.source import Source
 from src.workout_sources.source_consts import SourceConsts
+from src.workout_sources.tag_matcher import WordMatcher
 
 
 class VideoSource(Source):
@@ -33,10 +32,18 @@ class VideoSource(Source):
             end += 10
         return f"{start}-{end}min"
 
+    @classmethod
+    @cache
+    def _tag_matcher(cls):
+        return WordMatcher(SourceConsts.possible_tags)
+
+    @classmethod
+    @cache
+    def _strip_matcher(cls):
+        return WordMatcher(SourceConsts.strip_words)
+
     def _clean_tags(self, potential_tags):
-        strip_words = sorted(
-            list(copy.deepcopy(SourceConsts.strip_words)), key=len, reverse=True
-        )
+        strip_words = VideoSource._strip_matcher().copy()
         tags = set()
         for i in sorted(potential_tags, key=len):
             i = i.lower().strip()
@@ -55,10 +62,9 @@ class VideoSource(Source):
 
             if len(i) >= 3:
                 tags.add(i)
-                strip_words.append(i)
+                strip_words.add(i)
                 if len(i.split(" ")) == 1 and i[-1] == "s":
-                    strip_words.append(i[:-1])
-                strip_words = sorted(strip_words, key=len, reverse=True)
+                    strip_words.add(i[:-1])
 
         for r in range(2):
             tags = self._semantically_update(tags)
@@ -66,10 +72,9 @@ class VideoSource(Source):
         return tags
 
     def _strip_words(self, words, val):
-        for j in words:
-            val = re.sub(r"\b" + j + r"\b", "", val)
-            val = re.sub(r"\s+", " ", val)
-        return val.strip()
+        if not isinstance(words, WordMatcher):
+            words = WordMatcher(words)
+        return words.strip(val)
 
     @classmethod
     @cache
@@ -83,13 +88,7 @@ class VideoSource(Source):
         return i
 
     def _add_from_text(self, text):
-        tags = set()
-        for i in SourceConsts.possible_tags:
-            if i in tags:
-                continue
-            elif re.search(r"\b" + i + r"\b", text) is not None:
-                tags.add(i)
-        return tags
+        return VideoSource._tag_matcher().findall(text)
 
     @classmethod
     @cache
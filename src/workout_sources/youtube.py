@@ -3,17 +3,20 @@ import re
 from functools import cache, cached_property
 
 import isodate
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from typing import override
 
 import src.db.workout.models as models
 from src.utils.gcp_utils import get_secret
+from src.workout_sources.exercise_normaliser import ExerciseNormaliser
 from src.workout_sources.source_consts import SourceConsts
 from src.workout_sources.video_source import VideoSource
+from src.workout_sources.youtube_fetcher import YoutubeFetcher
 
 
 class Youtube(VideoSource):
+    _fetcher = None
+
     def __init__(self, db, url, data, logger):
         super().__init__(db, url, logger)
         self._data = data
@@ -46,26 +49,34 @@ class Youtube(VideoSource):
     def api_key(cls):
         return get_secret("youtube_api_key")
 
+    @classmethod
+    def fetcher(cls):
+        if Youtube._fetcher is None:
+            Youtube._fetcher = YoutubeFetcher()
+        return Youtube._fetcher
+
+    @classmethod
+    def set_fetcher(cls, fetcher):
+        Youtube._fetcher = fetcher
+
+    @staticmethod
+    def prefetch(urls):
+        # Pulls the metadata for a whole batch of urls in as few requests as
+        # possible so that the following get_data calls are cache hits
+        Youtube.fetcher().fetch({Youtube.youtube_vid_id(url) for url in urls})
+
     @staticmethod
-    @cache
     def get_data(url):
         # https://www.googleapis.com/youtube/v3/videos?id=Mvo2snJGhtM&key=<key>&part=snippet,contentDetails
-        secret = Youtube.api_key()
-        youtube_client = build("youtube", "v3", developerKey=secret)
-
         vid_id = Youtube.youtube_vid_id(url)
-        results = (
-            youtube_client.videos()
-            .list(part="snippet,contentDetails", id=vid_id)
-            .execute()
-        )
+        results = Youtube.fetcher().fetch([vid_id])
 
-        if len(results["items"]) != 1:
+        if vid_id not in results:
             raise Exception(
                 f"Unexpectedly shaped youtube data object: {url} : {vid_id} \n {results}"
             )
 
-        return results["items"][0]
+        return results[vid_id]
 
     @override
     @classmethod
@@ -115,37 +126,14 @@ class Youtube(VideoSource):
         tags.update(self._add_from_text(self.data["snippet"]["description"]))
         return tags
 
-    @classmethod
+    @staticmethod
     @cache
+    def exercise_normaliser():
+        return ExerciseNormaliser()
+
+    @classmethod
     def _clean_exercise(cls, val):
-        # remove extra words
-        for e in SourceConsts.exercises_strip:
-            val = re.sub(r"(" + e + r")\b", "", val)
-
-        # standardise on the plural form
-        for e in SourceConsts.exercise_plurals:
-            val = re.sub(r"(" + e + r")\b", f"{e}s", val)
-
-        # standardise names (but only if they're not in the middle of a word"
-        for k, v in SourceConsts.exercise_dupes.items():
-            val = re.sub(r"(" + k + r")\b", v, val)
-
-        for k, v in SourceConsts.exercise_dupes_regex.items():
-            val = re.sub(k, v, val)
-
-        # remove any bracketed extra info - i.e. (L) or (R)
-        val = re.sub(r"\(.+\)", "", val)
-        # remove any frequencies - i.e. x3
-        val = re.sub(" x[0-9]", "", val)
-        # make sure we start with the exercise, i.e. remove bulletpoints (-, *, etc)
-        val = re.sub(r"^\W+", "", val)
-        # standardise on '+' instead of '&' in descriptions
-        val = val.replace("&", "+")
-
-        for e in SourceConsts.depluralise:
-            val = re.sub(r"(" + e + r" \+)", f"{e[:-1]} +", val)
-
-        return val.strip()
+        return Youtube.exercise_normaliser().normalise(val)
 
 
 class HeatherRobertsonYoutube(Youtube):
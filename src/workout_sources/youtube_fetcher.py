@@ -0,0 +1,149 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class YoutubeFetcher:
+    """Fetches youtube video metadata in batches of up to 50 ids per request.
+
+    The api accepts a comma separated list of ids in videos.list, so a whole
+    ingest batch only costs len(ids) / 50 round trips. A single batch is
+    fetched on the calling thread, more are spread over a thread pool that
+    lives as long as the fetcher. googleapiclient clients aren't thread safe,
+    so each thread builds one client and reuses it for every request it makes.
+    close() shuts the pool down.
+
+    Results are kept in memory for the life of the process and, if cache_path
+    is set, in a sqlite file so they survive restarts for ttl seconds.
+    """
+
+    BATCH_SIZE = 50
+    PARTS = "snippet,contentDetails"
+    DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "youtube_videos.sqlite")
+
+    def __init__(
+        self,
+        client_factory=None,
+        cache_path=DEFAULT_CACHE_PATH,
+        ttl=7 * 24 * 60 * 60,
+        max_workers=4,
+        logger=None,
+    ):
+        self._client_factory = client_factory
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.logger = logger
+        self._videos = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._db = None
+        self._pool = None
+
+    @staticmethod
+    def _build_client():
+        from googleapiclient.discovery import build
+
+        from src.workout_sources.youtube import Youtube
+
+        return build("youtube", "v3", developerKey=Youtube.api_key())
+
+    @property
+    def client(self):
+        if not hasattr(self._local, "client"):
+            factory = self._client_factory or YoutubeFetcher._build_client
+            self._local.client = factory()
+        return self._local.client
+
+    @property
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="youtube-fetcher"
+                )
+            return self._pool
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    @property
+    def _sqlite(self):
+        if self.cache_path is None:
+            return None
+        if self._db is None:
+            self._db = sqlite3.connect(self.cache_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS videos "
+                "(id TEXT PRIMARY KEY, fetched_at REAL, body TEXT)"
+            )
+        return self._db
+
+    def _read_cache(self, vid_ids):
+        if self._sqlite is None or len(vid_ids) == 0:
+            return {}
+        placeholders = ",".join("?" * len(vid_ids))
+        with self._lock:
+            rows = self._sqlite.execute(
+                f"SELECT id, body FROM videos WHERE fetched_at > ? AND id IN ({placeholders})",
+                (time.time() - self.ttl, *vid_ids),
+            ).fetchall()
+        return {vid_id: json.loads(body) for vid_id, body in rows}
+
+    def _write_cache(self, videos):
+        if self._sqlite is None or len(videos) == 0:
+            return
+        now = time.time()
+        with self._lock, self._sqlite:
+            self._sqlite.executemany(
+                "INSERT OR REPLACE INTO videos VALUES (?, ?, ?)",
+                [(k, now, json.dumps(v)) for k, v in videos.items()],
+            )
+
+    def _fetch_batch(self, vid_ids):
+        results = (
+            self.client.videos().list(part=self.PARTS, id=",".join(vid_ids)).execute()
+        )
+        return {i["id"]: i for i in results.get("items", [])}
+
+    def fetch(self, vid_ids):
+        vid_ids = set(vid_ids)
+        missing = sorted(vid_ids - self._videos.keys())
+
+        cached = self._read_cache(missing)
+        self._videos.update(cached)
+        missing = [i for i in missing if i not in cached]
+
+        if len(missing) > 0:
+            batches = [
+                missing[i : i + self.BATCH_SIZE]
+                for i in range(0, len(missing), self.BATCH_SIZE)
+            ]
+            if self.logger is not None:
+                self.logger.debug(
+                    "Fetching youtube metadata",
+                    videos=len(missing),
+                    requests=len(batches),
+                )
+
+            fetched = {}
+            if len(batches) == 1:
+                results = [self._fetch_batch(batches[0])]
+            else:
+                results = self._executor.map(self._fetch_batch, batches)
+            for res in results:
+                fetched.update(res)
+            self._write_cache(fetched)
+            self._videos.update(fetched)
+
+        return {i: self._videos[i] for i in vid_ids if i in self._videos}
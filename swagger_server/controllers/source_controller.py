@@ -6,7 +6,7 @@ from swagger_server.models.query import Query  # noqa: E501
 from swagger_server import util
 
 
-def get_sources(id=None, url=None, paginate=None, paginationId=None):  # noqa: E501
+def get_sources(id=None, url=None, includeSamples=None, paginate=None, paginationId=None, cursor=None):  # noqa: E501
     """Retrieve a specific source using its id or all if no ids are specified
 
     Returns sources # noqa: E501
@@ -15,10 +15,14 @@ def get_sources(id=None, url=None, paginate=None, paginationId=None):  # noqa: E
     :type id: List[int]
     :param url: URL of source to return
     :type url: List[int]
+    :param includeSamples: Whether to include the samples of each linked workout in return
+    :type includeSamples: bool
     :param paginate: Paginate results
     :type paginate: bool
     :param paginationId: ID of next page to return. If not set, but paginate is True, the first page will be returned (and will include the ID of the next page)
     :type paginationId: int
+    :param cursor: Keyset pagination cursor. Set to true to fetch the first page, then pass back the nextPage value of each response. Supersedes paginationId.
+    :type cursor: str
 
     :rtype: PaginatedResult
     """
@@ -0,0 +1,34 @@
+import connexion
+import six
+
+from swagger_server.models.paginated_result import PaginatedResult  # noqa: E501
+from swagger_server.models.stats_query import StatsQuery  # noqa: E501
+from swagger_server import util
+
+
+def get_stats(bucket=None):  # noqa: E501
+    """Aggregate stats over all workouts
+
+    Returns workout totals grouped by day, week, month or year # noqa: E501
+
+    :param bucket: Size of each bucket. Defaults to week
+    :type bucket: str
+
+    :rtype: PaginatedResult
+    """
+    return 'do some magic!'
+
+
+def search_stats(body):  # noqa: E501
+    """Aggregate stats over matching workouts
+
+    Returns totals for the workouts matching the given parameters, grouped by day, week, month or year # noqa: E501
+
+    :param body: Workouts to aggregate
+    :type body: dict | bytes
+
+    :rtype: PaginatedResult
+    """
+    if connexion.request.is_json:
+        body = StatsQuery.from_dict(connexion.request.get_json())  # noqa: E501
+    return 'do some magic!'
@@ -6,7 +6,7 @@ from swagger_server.models.query import Query  # noqa: E501
 from swagger_server import util
 
 
-def get_workouts(id=None, includeSamples=None, paginate=None, paginationId=None):  # noqa: E501
+def get_workouts(id=None, includeSamples=None, paginate=None, paginationId=None, cursor=None):  # noqa: E501
     """Retrieve a specific workout or all if no ids are specified
 
     Returns workouts # noqa: E501
@@ -19,6 +19,8 @@ def get_workouts(id=None, includeSamples=None, paginate=None, paginationId=None)
     :type paginate: bool
     :param paginationId: ID of next page to return. If not set, but paginate is True, the first page will be returned (and will include the ID of the next page). If this is set, it supersedes any value passed as paginate.
     :type paginationId: int
+    :param cursor: Keyset pagination cursor. Set to true to fetch the first page, then pass back the nextPage value of each response. Supersedes paginationId.
+    :type cursor: str
 
     :rtype: PaginatedResult
     """
@@ -4,6 +4,7 @@
 from __future__ import absolute_import
 # import models into model package
 from swagger_server.models.date_range import DateRange
+from swagger_server.models.downsample_method import DownsampleMethod
 from swagger_server.models.equipment import Equipment
 from swagger_server.models.equipment_type import EquipmentType
 from swagger_server.models.everything import Everything
@@ -11,11 +12,16 @@ from swagger_server.models.hr_range import HRRange
 from swagger_server.models.hr_zone import HRZone
 from swagger_server.models.hr_zone_above import HRZoneAbove
 from swagger_server.models.hr_zone_range import HRZoneRange
+from swagger_server.models.load_range import LoadRange
 from swagger_server.models.paginated_result import PaginatedResult
 from swagger_server.models.query import Query
+from swagger_server.models.samples_resolution import SamplesResolution
 from swagger_server.models.source import Source
 from swagger_server.models.source_query_params import SourceQueryParams
 from swagger_server.models.source_type import SourceType
+from swagger_server.models.stats import Stats
+from swagger_server.models.stats_bucket import StatsBucket
+from swagger_server.models.stats_query import StatsQuery
 from swagger_server.models.workout import Workout
 from swagger_server.models.workout_query_params import WorkoutQueryParams
 from swagger_server.models.zone_type import ZoneType
@@ -15,16 +15,16 @@ class PaginatedResult(Model):
     Do not edit the class manually.
     """
 
-    def __init__(self, next_page: int=None, data: List[object]=None):  # noqa: E501
+    def __init__(self, next_page: object=None, data: List[object]=None):  # noqa: E501
         """PaginatedResult - a model defined in Swagger
 
         :param next_page: The next_page of this PaginatedResult.  # noqa: E501
-        :type next_page: int
+        :type next_page: object
         :param data: The data of this PaginatedResult.  # noqa: E501
         :type data: List[object]
         """
         self.swagger_types = {
-            'next_page': int,
+            'next_page': object,
             'data': List[object]
         }
 
@@ -48,24 +48,24 @@ class PaginatedResult(Model):
         return util.deserialize_model(dikt, cls)
 
     @property
-    def next_page(self) -> int:
+    def next_page(self) -> object:
         """Gets the next_page of this PaginatedResult.
 
-        The next page id, or -1 if not paginated/there are no more pages  # noqa: E501
+        The next page id, or -1 if not paginated/there are no more pages. When paginating with a cursor this is the opaque string cursor for the next page instead, so this is either an integer or a string.  # noqa: E501
 
         :return: The next_page of this PaginatedResult.
-        :rtype: int
+        :rtype: object
         """
         return self._next_page
 
     @next_page.setter
-    def next_page(self, next_page: int):
+    def next_page(self, next_page: object):
         """Sets the next_page of this PaginatedResult.
 
-        The next page id, or -1 if not paginated/there are no more pages  # noqa: E501
+        The next page id, or -1 if not paginated/there are no more pages. When paginating with a cursor this is the opaque string cursor for the next page instead, so this is either an integer or a string.  # noqa: E501
 
         :param next_page: The next_page of this PaginatedResult.
-        :type next_page: int
+        :type next_page: object
         """
 
         self._next_page = next_page
@@ -74,7 +74,7 @@ class PaginatedResult(Model):
     def data(self) -> List[object]:
         """Gets the data of this PaginatedResult.
 
-        Will be an array of one of Source, Workout, Equipment, strings (for tags and exercises) or Everything  # noqa: E501
+        Will be an array of one of Source, Workout, Equipment, Stats, strings (for tags and exercises) or Everything  # noqa: E501
 
         :return: The data of this PaginatedResult.
         :rtype: List[object]
@@ -85,7 +85,7 @@ class PaginatedResult(Model):
     def data(self, data: List[object]):
         """Sets the data of this PaginatedResult.
 
-        Will be an array of one of Source, Workout, Equipment, strings (for tags and exercises) or Everything  # noqa: E501
+        Will be an array of one of Source, Workout, Equipment, Stats, strings (for tags and exercises) or Everything  # noqa: E501
 
         :param data: The data of this PaginatedResult.
         :type data: List[object]
@@ -17,7 +17,7 @@ class Query(Model):
     Do not edit the class manually.
     """
 
-    def __init__(self, sources_attributes: SourceQueryParams=None, workouts_attributes: WorkoutQueryParams=None, paginate: bool=None, pagination_id: int=None):  # noqa: E501
+    def __init__(self, sources_attributes: SourceQueryParams=None, workouts_attributes: WorkoutQueryParams=None, paginate: bool=None, pagination_id: int=None, cursor: str=None):  # noqa: E501
         """Query - a model defined in Swagger
 
         :param sources_attributes: The sources_attributes of this Query.  # noqa: E501
@@ -28,25 +28,30 @@ class Query(Model):
         :type paginate: bool
         :param pagination_id: The pagination_id of this Query.  # noqa: E501
         :type pagination_id: int
+        :param cursor: The cursor of this Query.  # noqa: E501
+        :type cursor: str
         """
         self.swagger_types = {
             'sources_attributes': SourceQueryParams,
             'workouts_attributes': WorkoutQueryParams,
             'paginate': bool,
-            'pagination_id': int
+            'pagination_id': int,
+            'cursor': str
         }
 
         self.attribute_map = {
             'sources_attributes': 'sourcesAttributes',
             'workouts_attributes': 'workoutsAttributes',
             'paginate': 'paginate',
-            'pagination_id': 'paginationId'
+            'pagination_id': 'paginationId',
+            'cursor': 'cursor'
         }
 
         self._sources_attributes = sources_attributes
         self._workouts_attributes = workouts_attributes
         self._paginate = paginate
         self._pagination_id = pagination_id
+        self._cursor = cursor
 
     @classmethod
     def from_dict(cls, dikt) -> 'Query':
@@ -142,3 +147,26 @@ class Query(Model):
         """
 
         self._pagination_id = pagination_id
+
+    @property
+    def cursor(self) -> str:
+        """Gets the cursor of this Query.
+
+        Set to \"true\" to start cursor based pagination, or to the nextPage value of the previous response.  # noqa: E501
+
+        :return: The cursor of this Query.
+        :rtype: str
+        """
+        return self._cursor
+
+    @cursor.setter
+    def cursor(self, cursor: str):
+        """Sets the cursor of this Query.
+
+        Set to \"true\" to start cursor based pagination, or to the nextPage value of the previous response.  # noqa: E501
+
+        :param cursor: The cursor of this Query.
+        :type cursor: str
+        """
+
+        self._cursor = cursor
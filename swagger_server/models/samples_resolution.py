@@ -0,0 +1,93 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+from datetime import date, datetime  # noqa: F401
+
+from typing import List, Dict  # noqa: F401
+
+from swagger_server.models.base_model_ import Model
+from swagger_server.models.downsample_method import DownsampleMethod
+from swagger_server import util
+
+
+class SamplesResolution(Model):
+    """NOTE: This class is auto generated by the swagger code generator program.
+
+    Do not edit the class manually.
+    """
+
+    def __init__(self, method: DownsampleMethod=None, points: int=None):  # noqa: E501
+        """SamplesResolution - a model defined in Swagger
+
+        :param method: The method of this SamplesResolution.  # noqa: E501
+        :type method: DownsampleMethod
+        :param points: The points of this SamplesResolution.  # noqa: E501
+        :type points: int
+        """
+        self.swagger_types = {
+            'method': DownsampleMethod,
+            'points': int
+        }
+
+        self.attribute_map = {
+            'method': 'method',
+            'points': 'points'
+        }
+
+        self._method = method
+        self._points = points
+
+    @classmethod
+    def from_dict(cls, dikt) -> 'SamplesResolution':
+        """Returns the dict as a model
+
+        :param dikt: A dict.
+        :type: dict
+        :return: The SamplesResolution of this SamplesResolution.  # noqa: E501
+        :rtype: SamplesResolution
+        """
+        return util.deserialize_model(dikt, cls)
+
+    @property
+    def method(self) -> DownsampleMethod:
+        """Gets the method of this SamplesResolution.
+
+
+        :return: The method of this SamplesResolution.
+        :rtype: DownsampleMethod
+        """
+        return self._method
+
+    @method.setter
+    def method(self, method: DownsampleMethod):
+        """Sets the method of this SamplesResolution.
+
+
+        :param method: The method of this SamplesResolution.
+        :type method: DownsampleMethod
+        """
+
+        self._method = method
+
+    @property
+    def points(self) -> int:
+        """Gets the points of this SamplesResolution.
+
+        Roughly how many points to return. Rounded up to 100, 300 or 1000, defaults to 300  # noqa: E501
+
+        :return: The points of this SamplesResolution.
+        :rtype: int
+        """
+        return self._points
+
+    @points.setter
+    def points(self, points: int):
+        """Sets the points of this SamplesResolution.
+
+        Roughly how many points to return. Rounded up to 100, 300 or 1000, defaults to 300  # noqa: E501
+
+        :param points: The points of this SamplesResolution.
+        :type points: int
+        """
+
+        self._points = points
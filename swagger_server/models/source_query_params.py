@@ -16,7 +16,7 @@ class SourceQueryParams(Model):
     Do not edit the class manually.
     """
 
-    def __init__(self, creator: List[str]=None, exercises: List[str]=None, tags: List[str]=None, length_min: int=None, length_max: int=None, source_type: List[SourceType]=None):  # noqa: E501
+    def __init__(self, creator: List[str]=None, exercises: List[str]=None, tags: List[str]=None, length_min: int=None, length_max: int=None, source_type: List[SourceType]=None, samples: bool=None):  # noqa: E501
         """SourceQueryParams - a model defined in Swagger
 
         :param creator: The creator of this SourceQueryParams.  # noqa: E501
@@ -31,6 +31,8 @@ class SourceQueryParams(Model):
         :type length_max: int
         :param source_type: The source_type of this SourceQueryParams.  # noqa: E501
         :type source_type: List[SourceType]
+        :param samples: The samples of this SourceQueryParams.  # noqa: E501
+        :type samples: bool
         """
         self.swagger_types = {
             'creator': List[str],
@@ -38,7 +40,8 @@ class SourceQueryParams(Model):
             'tags': List[str],
             'length_min': int,
             'length_max': int,
-            'source_type': List[SourceType]
+            'source_type': List[SourceType],
+            'samples': bool
         }
 
         self.attribute_map = {
@@ -47,7 +50,8 @@ class SourceQueryParams(Model):
             'tags': 'tags',
             'length_min': 'lengthMin',
             'length_max': 'lengthMax',
-            'source_type': 'sourceType'
+            'source_type': 'sourceType',
+            'samples': 'samples'
         }
 
         self._creator = creator
@@ -56,6 +60,7 @@ class SourceQueryParams(Model):
         self._length_min = length_min
         self._length_max = length_max
         self._source_type = source_type
+        self._samples = samples
 
     @classmethod
     def from_dict(cls, dikt) -> 'SourceQueryParams':
@@ -203,3 +208,26 @@ class SourceQueryParams(Model):
         """
 
         self._source_type = source_type
+
+    @property
+    def samples(self) -> bool:
+        """Gets the samples of this SourceQueryParams.
+
+        Whether to include the samples of each linked workout in return  # noqa: E501
+
+        :return: The samples of this SourceQueryParams.
+        :rtype: bool
+        """
+        return self._samples
+
+    @samples.setter
+    def samples(self, samples: bool):
+        """Sets the samples of this SourceQueryParams.
+
+        Whether to include the samples of each linked workout in return  # noqa: E501
+
+        :param samples: The samples of this SourceQueryParams.
+        :type samples: bool
+        """
+
+        self._samples = samples
@@ -0,0 +1,205 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+from datetime import date, datetime  # noqa: F401
+
+from typing import List, Dict  # noqa: F401
+
+from swagger_server.models.base_model_ import Model
+from swagger_server.models.hr_zone import HRZone
+from swagger_server import util
+
+
+class Stats(Model):
+    """NOTE: This class is auto generated by the swagger code generator program.
+
+    Do not edit the class manually.
+    """
+
+    def __init__(self, period: datetime=None, workouts: int=None, calories: int=None, duration: str=None, avg_hr_median: float=None, hr_zones: List[HRZone]=None):  # noqa: E501
+        """Stats - a model defined in Swagger
+
+        :param period: The period of this Stats.  # noqa: E501
+        :type period: datetime
+        :param workouts: The workouts of this Stats.  # noqa: E501
+        :type workouts: int
+        :param calories: The calories of this Stats.  # noqa: E501
+        :type calories: int
+        :param duration: The duration of this Stats.  # noqa: E501
+        :type duration: str
+        :param avg_hr_median: The avg_hr_median of this Stats.  # noqa: E501
+        :type avg_hr_median: float
+        :param hr_zones: The hr_zones of this Stats.  # noqa: E501
+        :type hr_zones: List[HRZone]
+        """
+        self.swagger_types = {
+            'period': datetime,
+            'workouts': int,
+            'calories': int,
+            'duration': str,
+            'avg_hr_median': float,
+            'hr_zones': List[HRZone]
+        }
+
+        self.attribute_map = {
+            'period': 'period',
+            'workouts': 'workouts',
+            'calories': 'calories',
+            'duration': 'duration',
+            'avg_hr_median': 'avgHRMedian',
+            'hr_zones': 'hrZones'
+        }
+
+        self._period = period
+        self._workouts = workouts
+        self._calories = calories
+        self._duration = duration
+        self._avg_hr_median = avg_hr_median
+        self._hr_zones = hr_zones
+
+    @classmethod
+    def from_dict(cls, dikt) -> 'Stats':
+        """Returns the dict as a model
+
+        :param dikt: A dict.
+        :type: dict
+        :return: The Stats of this Stats.  # noqa: E501
+        :rtype: Stats
+        """
+        return util.deserialize_model(dikt, cls)
+
+    @property
+    def period(self) -> datetime:
+        """Gets the period of this Stats.
+
+        Start of the bucket  # noqa: E501
+
+        :return: The period of this Stats.
+        :rtype: datetime
+        """
+        return self._period
+
+    @period.setter
+    def period(self, period: datetime):
+        """Sets the period of this Stats.
+
+        Start of the bucket  # noqa: E501
+
+        :param period: The period of this Stats.
+        :type period: datetime
+        """
+
+        self._period = period
+
+    @property
+    def workouts(self) -> int:
+        """Gets the workouts of this Stats.
+
+        Number of workouts in the bucket  # noqa: E501
+
+        :return: The workouts of this Stats.
+        :rtype: int
+        """
+        return self._workouts
+
+    @workouts.setter
+    def workouts(self, workouts: int):
+        """Sets the workouts of this Stats.
+
+        Number of workouts in the bucket  # noqa: E501
+
+        :param workouts: The workouts of this Stats.
+        :type workouts: int
+        """
+
+        self._workouts = workouts
+
+    @property
+    def calories(self) -> int:
+        """Gets the calories of this Stats.
+
+
+        :return: The calories of this Stats.
+        :rtype: int
+        """
+        return self._calories
+
+    @calories.setter
+    def calories(self, calories: int):
+        """Sets the calories of this Stats.
+
+
+        :param calories: The calories of this Stats.
+        :type calories: int
+        """
+
+        self._calories = calories
+
+    @property
+    def duration(self) -> str:
+        """Gets the duration of this Stats.
+
+        Total workout time in ISO 8601 format  # noqa: E501
+
+        :return: The duration of this Stats.
+        :rtype: str
+        """
+        return self._duration
+
+    @duration.setter
+    def duration(self, duration: str):
+        """Sets the duration of this Stats.
+
+        Total workout time in ISO 8601 format  # noqa: E501
+
+        :param duration: The duration of this Stats.
+        :type duration: str
+        """
+
+        self._duration = duration
+
+    @property
+    def avg_hr_median(self) -> float:
+        """Gets the avg_hr_median of this Stats.
+
+        Median of the average heart rate of each workout  # noqa: E501
+
+        :return: The avg_hr_median of this Stats.
+        :rtype: float
+        """
+        return self._avg_hr_median
+
+    @avg_hr_median.setter
+    def avg_hr_median(self, avg_hr_median: float):
+        """Sets the avg_hr_median of this Stats.
+
+        Median of the average heart rate of each workout  # noqa: E501
+
+        :param avg_hr_median: The avg_hr_median of this Stats.
+        :type avg_hr_median: float
+        """
+
+        self._avg_hr_median = avg_hr_median
+
+    @property
+    def hr_zones(self) -> List[HRZone]:
+        """Gets the hr_zones of this Stats.
+
+        Total time spent in each zone  # noqa: E501
+
+        :return: The hr_zones of this Stats.
+        :rtype: List[HRZone]
+        """
+        return self._hr_zones
+
+    @hr_zones.setter
+    def hr_zones(self, hr_zones: List[HRZone]):
+        """Sets the hr_zones of this Stats.
+
+        Total time spent in each zone  # noqa: E501
+
+        :param hr_zones: The hr_zones of this Stats.
+        :type hr_zones: List[HRZone]
+        """
+
+        self._hr_zones = hr_zones
@@ -0,0 +1,45 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+from datetime import date, datetime  # noqa: F401
+
+from typing import List, Dict  # noqa: F401
+
+from swagger_server.models.base_model_ import Model
+from swagger_server import util
+
+
+class StatsBucket(Model):
+    """NOTE: This class is auto generated by the swagger code generator program.
+
+    Do not edit the class manually.
+    """
+
+    """
+    allowed enum values
+    """
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    YEAR = "year"
+
+    def __init__(self):  # noqa: E501
+        """StatsBucket - a model defined in Swagger
+
+        """
+        self.swagger_types = {
+        }
+
+        self.attribute_map = {
+        }
+
+    @classmethod
+    def from_dict(cls, dikt) -> 'StatsBucket':
+        """Returns the dict as a model
+
+        :param dikt: A dict.
+        :type: dict
+        :return: The StatsBucket of this StatsBucket.  # noqa: E501
+        :rtype: StatsBucket
+        """
+        return util.deserialize_model(dikt, cls)
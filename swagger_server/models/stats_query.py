@@ -0,0 +1,92 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+from datetime import date, datetime  # noqa: F401
+
+from typing import List, Dict  # noqa: F401
+
+from swagger_server.models.base_model_ import Model
+from swagger_server.models.stats_bucket import StatsBucket
+from swagger_server.models.workout_query_params import WorkoutQueryParams
+from swagger_server import util
+
+
+class StatsQuery(Model):
+    """NOTE: This class is auto generated by the swagger code generator program.
+
+    Do not edit the class manually.
+    """
+
+    def __init__(self, workouts_attributes: WorkoutQueryParams=None, bucket: StatsBucket=None):  # noqa: E501
+        """StatsQuery - a model defined in Swagger
+
+        :param workouts_attributes: The workouts_attributes of this StatsQuery.  # noqa: E501
+        :type workouts_attributes: WorkoutQueryParams
+        :param bucket: The bucket of this StatsQuery.  # noqa: E501
+        :type bucket: StatsBucket
+        """
+        self.swagger_types = {
+            'workouts_attributes': WorkoutQueryParams,
+            'bucket': StatsBucket
+        }
+
+        self.attribute_map = {
+            'workouts_attributes': 'workoutsAttributes',
+            'bucket': 'bucket'
+        }
+
+        self._workouts_attributes = workouts_attributes
+        self._bucket = bucket
+
+    @classmethod
+    def from_dict(cls, dikt) -> 'StatsQuery':
+        """Returns the dict as a model
+
+        :param dikt: A dict.
+        :type: dict
+        :return: The StatsQuery of this StatsQuery.  # noqa: E501
+        :rtype: StatsQuery
+        """
+        return util.deserialize_model(dikt, cls)
+
+    @property
+    def workouts_attributes(self) -> WorkoutQueryParams:
+        """Gets the workouts_attributes of this StatsQuery.
+
+
+        :return: The workouts_attributes of this StatsQuery.
+        :rtype: WorkoutQueryParams
+        """
+        return self._workouts_attributes
+
+    @workouts_attributes.setter
+    def workouts_attributes(self, workouts_attributes: WorkoutQueryParams):
+        """Sets the workouts_attributes of this StatsQuery.
+
+
+        :param workouts_attributes: The workouts_attributes of this StatsQuery.
+        :type workouts_attributes: WorkoutQueryParams
+        """
+
+        self._workouts_attributes = workouts_attributes
+
+    @property
+    def bucket(self) -> StatsBucket:
+        """Gets the bucket of this StatsQuery.
+
+
+        :return: The bucket of this StatsQuery.
+        :rtype: StatsBucket
+        """
+        return self._bucket
+
+    @bucket.setter
+    def bucket(self, bucket: StatsBucket):
+        """Sets the bucket of this StatsQuery.
+
+
+        :param bucket: The bucket of this StatsQuery.
+        :type bucket: StatsBucket
+        """
+
+        self._bucket = bucket
@@ -11,6 +11,8 @@ from swagger_server.models.equipment import Equipment
 from swagger_server.models.hr_range import HRRange
 from swagger_server.models.hr_zone_above import HRZoneAbove
 from swagger_server.models.hr_zone_range import HRZoneRange
+from swagger_server.models.load_range import LoadRange
+from swagger_server.models.samples_resolution import SamplesResolution
 from swagger_server import util
 
 
@@ -20,7 +22,7 @@ class WorkoutQueryParams(Model):
     Do not edit the class manually.
     """
 
-    def __init__(self, date_range: DateRange=None, sport: List[str]=None, samples: bool=None, equipment: List[Equipment]=None, hr_range: HRRange=None, avg_hr_range: HRRange=None, in_hr_zone: List[HRZoneRange]=None, above_hr_zone: List[HRZoneAbove]=None):  # noqa: E501
+    def __init__(self, date_range: DateRange=None, sport: List[str]=None, samples: bool=None, samples_resolution: SamplesResolution=None, equipment: List[Equipment]=None, hr_range: HRRange=None, avg_hr_range: HRRange=None, in_hr_zone: List[HRZoneRange]=None, above_hr_zone: List[HRZoneAbove]=None, training_load_range: LoadRange=None):  # noqa: E501
         """WorkoutQueryParams - a model defined in Swagger
 
         :param date_range: The date_range of this WorkoutQueryParams.  # noqa: E501
@@ -29,6 +31,8 @@ class WorkoutQueryParams(Model):
         :type sport: List[str]
         :param samples: The samples of this WorkoutQueryParams.  # noqa: E501
         :type samples: bool
+        :param samples_resolution: The samples_resolution of this WorkoutQueryParams.  # noqa: E501
+        :type samples_resolution: SamplesResolution
         :param equipment: The equipment of this WorkoutQueryParams.  # noqa: E501
         :type equipment: List[Equipment]
         :param hr_range: The hr_range of this WorkoutQueryParams.  # noqa: E501
@@ -39,37 +43,45 @@ class WorkoutQueryParams(Model):
         :type in_hr_zone: List[HRZoneRange]
         :param above_hr_zone: The above_hr_zone of this WorkoutQueryParams.  # noqa: E501
         :type above_hr_zone: List[HRZoneAbove]
+        :param training_load_range: The training_load_range of this WorkoutQueryParams.  # noqa: E501
+        :type training_load_range: LoadRange
         """
         self.swagger_types = {
             'date_range': DateRange,
             'sport': List[str],
             'samples': bool,
+            'samples_resolution': SamplesResolution,
             'equipment': List[Equipment],
             'hr_range': HRRange,
             'avg_hr_range': HRRange,
             'in_hr_zone': List[HRZoneRange],
-            'above_hr_zone': List[HRZoneAbove]
+            'above_hr_zone': List[HRZoneAbove],
+            'training_load_range': LoadRange
         }
 
         self.attribute_map = {
             'date_range': 'dateRange',
             'sport': 'sport',
             'samples': 'samples',
+            'samples_resolution': 'samplesResolution',
             'equipment': 'equipment',
             'hr_range': 'hrRange',
             'avg_hr_range': 'avgHRRange',
             'in_hr_zone': 'inHRZone',
-            'above_hr_zone': 'aboveHRZone'
+            'above_hr_zone': 'aboveHRZone',
+            'training_load_range': 'trainingLoadRange'
         }
 
         self._date_range = date_range
         self._sport = sport
         self._samples = samples
+        self._samples_resolution = samples_resolution
         self._equipment = equipment
         self._hr_range = hr_range
         self._avg_hr_range = avg_hr_range
         self._in_hr_zone = in_hr_zone
         self._above_hr_zone = above_hr_zone
+        self._training_load_range = training_load_range
 
     @classmethod
     def from_dict(cls, dikt) -> 'WorkoutQueryParams':
@@ -149,6 +161,27 @@ class WorkoutQueryParams(Model):
 
         self._samples = samples
 
+    @property
+    def samples_resolution(self) -> SamplesResolution:
+        """Gets the samples_resolution of this WorkoutQueryParams.
+
+
+        :return: The samples_resolution of this WorkoutQueryParams.
+        :rtype: SamplesResolution
+        """
+        return self._samples_resolution
+
+    @samples_resolution.setter
+    def samples_resolution(self, samples_resolution: SamplesResolution):
+        """Sets the samples_resolution of this WorkoutQueryParams.
+
+
+        :param samples_resolution: The samples_resolution of this WorkoutQueryParams.
+        :type samples_resolution: SamplesResolution
+        """
+
+        self._samples_resolution = samples_resolution
+
     @property
     def equipment(self) -> List[Equipment]:
         """Gets the equipment of this WorkoutQueryParams.
@@ -259,3 +292,24 @@ class WorkoutQueryParams(Model):
         """
 
         self._above_hr_zone = above_hr_zone
+
+    @property
+    def training_load_range(self) -> LoadRange:
+        """Gets the training_load_range of this WorkoutQueryParams.
+
+
+        :return: The training_load_range of this WorkoutQueryParams.
+        :rtype: LoadRange
+        """
+        return self._training_load_range
+
+    @training_load_range.setter
+    def training_load_range(self, training_load_range: LoadRange):
+        """Sets the training_load_range of this WorkoutQueryParams.
+
+
+        :param training_load_range: The training_load_range of this WorkoutQueryParams.
+        :type training_load_range: LoadRange
+        """
+
+        self._training_load_range = training_load_range
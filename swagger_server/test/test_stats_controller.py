@@ -0,0 +1,46 @@
+# coding: utf-8
+
+from __future__ import absolute_import
+
+from flask import json
+from six import BytesIO
+
+from swagger_server.models.paginated_result import PaginatedResult  # noqa: E501
+from swagger_server.models.stats_query import StatsQuery  # noqa: E501
+from swagger_server.test import BaseTestCase
+
+
+class TestStatsController(BaseTestCase):
+    """StatsController integration test stubs"""
+
+    def test_get_stats(self):
+        """Test case for get_stats
+
+        Aggregate stats over all workouts
+        """
+        query_string = [('bucket', 'bucket_example')]
+        response = self.client.open(
+            '/ninas2/workout/1.0.0/stats',
+            method='GET',
+            query_string=query_string)
+        self.assert200(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
+    def test_search_stats(self):
+        """Test case for search_stats
+
+        Aggregate stats over matching workouts
+        """
+        body = StatsQuery()
+        response = self.client.open(
+            '/ninas2/workout/1.0.0/stats',
+            method='POST',
+            data=json.dumps(body),
+            content_type='application/json')
+        self.assert200(response,
+                       'Response body is : ' + response.data.decode('utf-8'))
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()